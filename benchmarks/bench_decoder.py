@@ -0,0 +1,120 @@
+"""
+Benchmark the table-driven decoder against per-field dispatch.
+
+The dispatch decode used before the decode table is reproduced here, reading
+each field through a helper and formatting from an opcode map.
+
+    python -m benchmarks.bench_decoder
+"""
+
+import timeit
+from typing import Dict, List
+
+from benchmarks.roms import mixed
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import CHIP8, decode_table, DecodeTable
+
+
+class DispatchDisassembler(Disassembler):
+    """Disassembler that dispatches on the operation of each opcode."""
+
+    OPCODES = {
+        0x6000: "LD V{}, 0x{:02x}",
+        0xA000: "LD I, lbl_0x{:04x}",
+        0xD000: "DRW V{}, V{}, 0x{:02x}",
+    }
+
+    def decode_context(self, address: int) -> None:
+        """Process opcodes in a single context with per-field reads."""
+
+        self.text: Dict[int, str] = {}
+        self.current_address = address
+
+        while self.current_address - self.STARTING_ADDRESS + 1 < len(self.rom_data):
+            opcode = self.read_opcode()
+            operation = self.read_operation(opcode)
+            text = self.OPCODES[operation]
+
+            if operation == 0x6000:
+                args = [self.read_vx(opcode), self.read_byte(opcode)]
+            elif operation == 0xA000:
+                args = [self.read_address(opcode)]
+                self.add_label(args[0])
+            else:
+                args = [self.read_vx(opcode), self.read_vy(opcode), opcode & 0xF]
+
+            self.text[self.current_address] = text.format(*args)
+            self.current_address += 2
+
+    def read_opcode(self) -> int:
+        """Read the word at the current address."""
+
+        offset = self.current_address - self.STARTING_ADDRESS
+
+        return self.rom_data[offset] << 8 | self.rom_data[offset + 1]
+
+    def read_operation(self, opcode: int) -> int:
+        """Read the upper nibble of an opcode."""
+
+        return opcode & 0xF000
+
+    def read_address(self, opcode: int) -> int:
+        """Read the address of an opcode."""
+
+        return opcode & 0xFFF
+
+    def read_byte(self, opcode: int) -> int:
+        """Read the low byte of an opcode."""
+
+        return opcode & 0xFF
+
+    def read_vx(self, opcode: int) -> int:
+        """Read the X register of an opcode."""
+
+        return (opcode & 0xF00) >> 8
+
+    def read_vy(self, opcode: int) -> int:
+        """Read the Y register of an opcode."""
+
+        return (opcode & 0xF0) >> 4
+
+
+def run(cls: type, rom_data: List[int]) -> None:
+    """Decode a ROM once with the given disassembler class."""
+
+    dasm = cls()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+
+def run_cold(rom_data: List[int]) -> None:
+    """Decode a ROM once with an empty decode table."""
+
+    dasm = Disassembler()
+    dasm.table = DecodeTable(CHIP8)
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+
+def main() -> None:
+    """Run the decoder benchmark."""
+
+    count = 1700
+    rom_data = mixed(count)
+
+    seconds = min(timeit.repeat(lambda: DecodeTable(CHIP8).precompute(), number=1))
+    print(f"{'precompute table':<20} {seconds * 1000:12.2f} ms")
+
+    decode_table().precompute()
+
+    for name, function in (
+        ("dispatch", lambda: run(DispatchDisassembler, rom_data)),
+        ("table (cold)", lambda: run_cold(rom_data)),
+        ("table (warm)", lambda: run(Disassembler, rom_data)),
+    ):
+        seconds = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"{name:<20} {count / seconds:12,.0f} words/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the structural diff of a ROM against a patched copy.
+
+    python -m benchmarks.bench_diff
+
+Time per instruction should stay flat as ROMs grow.
+"""
+
+import random
+import time
+
+from benchmarks.roms import MAX_SIZE, synthetic
+from chip8_dasm.diff import StructuralDiff
+from chip8_dasm.disassembler import Disassembler
+
+
+def decoded(rom_data: bytes) -> Disassembler:
+    """Decode a ROM."""
+
+    dasm = Disassembler()
+    dasm.rom_data = bytearray(rom_data)
+    dasm.decode()
+
+    return dasm
+
+
+def patched(rom_data: bytes, changes: int, seed: int = 0) -> bytes:
+    """Return a copy of a ROM with the low byte of a few words changed."""
+
+    rng = random.Random(seed)
+    data = bytearray(rom_data)
+
+    for _ in range(changes):
+        data[rng.randrange(1, len(data), 2)] = rng.getrandbits(8)
+
+    return bytes(data)
+
+
+def main() -> None:
+    """Run the diff benchmark."""
+
+    for size in (512, 1024, 2048, MAX_SIZE - MAX_SIZE % 2):
+        rom_data = bytes(synthetic(size, branch_density=0.2))
+        old = decoded(rom_data)
+        new = decoded(patched(rom_data, size // 128))
+        timings = []
+
+        for _ in range(5):
+            started = time.perf_counter()
+            StructuralDiff(old, new)
+            timings.append(time.perf_counter() - started)
+
+        per_instruction = min(timings) / len(old.disassembly) * 1e6
+        print(f"{size:<12}{per_instruction:10.2f} us/instruction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark write throughput and output size of each output format.
+
+    python -m benchmarks.bench_exporters
+"""
+
+from functools import partial
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from benchmarks.roms import MAX_SIZE, straight_line, synthetic
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.exporters import export, FORMATS
+from chip8_dasm.writer import Writer
+
+
+def decode(rom_data: List[int]) -> Disassembler:
+    """Decode a ROM."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    return dasm
+
+
+def write(dasm: Disassembler, path: str, form: str) -> None:
+    """Write a disassembly to a file in a format, including plain text."""
+
+    if form != "text":
+        export(dasm, path, form)
+        return
+
+    with open(path, "w") as stream:
+        Writer(dasm).write(stream)
+
+
+def timed(function: Callable[[], object], repeat: int = 5) -> float:
+    """Return the best time taken by a function over a few runs."""
+
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    return min(timings)
+
+
+def main() -> None:
+    """Run the output format benchmark."""
+
+    roms = (
+        ("mixed", synthetic(MAX_SIZE - MAX_SIZE % 2, data_ratio=0.3)),
+        ("large", straight_line(30_000)),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, rom_data in roms:
+            dasm = decode(rom_data)
+            records = sum(1 for _ in Writer(dasm).entries())
+
+            for form in ["text"] + list(FORMATS):
+                path = os.path.join(directory, f"{name}.{form}")
+                elapsed = timed(partial(write, dasm, path, form))
+                size = os.path.getsize(path)
+
+                print(
+                    f"{name:<7}{form:<8}{records / elapsed / 1e3:10.1f} k records/s"
+                    f"{size / 1024:10.1f} KiB{size / records:8.1f} bytes/record"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark decoding with insight off, recording everything, and selective.
+
+    python -m benchmarks.bench_insight
+"""
+
+import timeit
+from typing import List, Optional
+
+from benchmarks.roms import synthetic
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.insight import Insight
+
+
+def run(rom_data: List[int], insight: Optional[Insight]) -> None:
+    """Decode a ROM once."""
+
+    dasm = Disassembler(insight=insight)
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+
+def main() -> None:
+    """Run the insight benchmark."""
+
+    rom_data = synthetic(3584)
+    count = len(rom_data) // 2
+
+    # Warm the decode table so the first run is not slower than the rest.
+    run(rom_data, None)
+
+    for name, insight in (
+        ("off", None),
+        ("all", Insight()),
+        ("DXYN", Insight(operations=["DXYN"])),
+        ("0x2a0", Insight(addresses=[0x2A0])),
+    ):
+        seconds = min(
+            timeit.repeat(
+                lambda: run(rom_data, insight), number=1, repeat=10  # noqa: B023
+            )
+        )
+        print(f"insight {name:<6} {count / seconds:12,.0f} words/sec")
+
+
+if __name__ == "__main__":
+    main()
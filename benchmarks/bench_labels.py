@@ -0,0 +1,80 @@
+"""
+Micro-benchmarks for context and label bookkeeping on label-heavy ROMs.
+
+    python -m benchmarks.bench_labels
+"""
+
+import timeit
+from typing import Callable, Collection, List
+
+from benchmarks.roms import label_heavy
+from chip8_dasm.addresses import AddressSet
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.writer import Writer
+
+
+def add_list(addresses: List[int]) -> List[int]:
+    """Record addresses in a list, deduplicating by scanning it."""
+
+    result: List[int] = []
+
+    for address in addresses:
+        if address not in result:
+            result.append(address)
+
+    return result
+
+
+def add_bitmap(addresses: List[int]) -> AddressSet:
+    """Record addresses in an address set."""
+
+    result = AddressSet()
+
+    for address in addresses:
+        result.add(address)
+
+    return result
+
+
+def scan(labels: Collection[int]) -> int:
+    """Test every address of memory for a label, as the writer does."""
+
+    return sum(1 for address in range(0x200, 0x1000) if address in labels)
+
+
+def pipeline(rom_data: List[int]) -> None:
+    """Decode a ROM and render its disassembly."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+    Writer(dasm).generate_disassembly_buffer(Writer.STARTING_ADDRESS)
+
+
+def report(name: str, function: Callable[[], object]) -> None:
+    """Print the best time for a benchmark function."""
+
+    seconds = min(timeit.repeat(function, number=1, repeat=5))
+    print(f"{name:<28} {seconds * 1000:8.2f} ms")
+
+
+def main() -> None:
+    """Run the label benchmarks."""
+
+    count = 1700
+    rom_data = label_heavy(count)
+    addresses = [0x200 + (index * 2) for index in range(count)]
+
+    as_list = add_list(addresses)
+    as_bitmap = add_bitmap(addresses)
+
+    report("add (list)", lambda: add_list(addresses))
+    report("add (bitmap)", lambda: add_bitmap(addresses))
+    report("writer label scan (list)", lambda: scan(as_list))
+    report("writer label scan (bitmap)", lambda: scan(as_bitmap))
+    report("ordered labels (bitmap)", lambda: list(as_bitmap))
+    report("decode and render", lambda: pipeline(rom_data))
+
+
+if __name__ == "__main__":
+    main()
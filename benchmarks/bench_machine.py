@@ -0,0 +1,52 @@
+"""
+Benchmark the headless interpreter in instructions per second.
+
+    python -m benchmarks.bench_machine
+"""
+
+import time
+from typing import List
+
+from chip8_dasm.machine import Machine, scripted_keys
+
+# 0x200: LD V0, 0x00
+# 0x202: LD V1, 0x00
+# 0x204: LD I, 0x21c
+# 0x206: ADD V0, 0x01
+# 0x208: SE V0, 0x00
+# 0x20a: JP 0x206
+# 0x20c: CALL 0x214
+# 0x20e: ADD V1, 0x01
+# 0x210: JP 0x206
+# 0x212: SYS 0x000
+# 0x214: DRW V0, V1, 0x04
+# 0x216: SKP V1
+# 0x218: XOR V2, V0
+# 0x21a: RET
+# 0x21c: sprite data
+LOOP = bytes.fromhex(
+    "6000 6100 a21c 7001 3000 1206 2214 7101 1206 0000 d014 e19e 8203 00ee f090 90f0"
+)
+
+
+def rate(rom_data: bytes, budget: int) -> float:
+    """Return how many instructions a ROM runs per second."""
+
+    machine = Machine(rom_data, scripted_keys("1..."))
+    started = time.perf_counter()
+    steps = machine.run(budget)
+
+    return steps / (time.perf_counter() - started)
+
+
+def main() -> None:
+    """Run the interpreter benchmark."""
+
+    budget = 2_000_000
+    rates: List[float] = [rate(LOOP, budget) for _ in range(3)]
+
+    print(f"{'loop':<12}{max(rates) / 1e6:10.2f} M instructions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark patching a ROM against decoding it again from scratch.
+
+    python -m benchmarks.bench_patch
+"""
+
+from functools import partial
+import timeit
+from typing import List
+
+from benchmarks.roms import mixed
+from chip8_dasm.disassembler import Disassembler
+
+
+def decode(rom_data: List[int]) -> Disassembler:
+    """Decode a ROM."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    return dasm
+
+
+def patch(dasm: Disassembler, address: int) -> None:
+    """Flip the low bit of an operand and back again."""
+
+    value = dasm.rom_data[address - dasm.STARTING_ADDRESS]
+    dasm.patch(address, bytes([value ^ 1]))
+    dasm.patch(address, bytes([value]))
+
+
+def main() -> None:
+    """Run the patch benchmark."""
+
+    rom_data = mixed(1700)
+    dasm = decode(rom_data)
+    address = max(dasm.disassembly) + 1
+    runs = 100
+
+    full = min(timeit.repeat(partial(decode, rom_data), number=runs, repeat=3))
+    incremental = min(
+        timeit.repeat(partial(patch, dasm, address), number=runs, repeat=3)
+    )
+
+    # Each patch run decodes twice, once for each change.
+    print(f"full decode  {full / runs * 1e6:10.1f} us")
+    print(f"patch        {incremental / runs / 2 * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark memory held by the disassembly as records versus as text.
+
+    python -m benchmarks.bench_records
+"""
+
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.roms import mixed
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import listing
+
+
+def allocated(function: Callable[[], object]) -> int:
+    """Return the memory still allocated by what a function returns."""
+
+    tracemalloc.start()
+    result = function()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return size
+
+
+def decode(rom_data: List[int]) -> Disassembler:
+    """Decode a ROM."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    return dasm
+
+
+def main() -> None:
+    """Run the record benchmark."""
+
+    count = 1700
+    rom_data = mixed(count)
+    dasm = decode(rom_data)
+
+    # Warm the decode table so its entries are not counted.
+    decode(rom_data)
+
+    records = allocated(lambda: dict(dasm.disassembly))
+    text = allocated(lambda: listing(dasm.disassembly))
+
+    print(f"records {records / count:8.1f} bytes per instruction")
+    print(f"text    {text / count:8.1f} bytes per instruction")
+
+
+if __name__ == "__main__":
+    main()
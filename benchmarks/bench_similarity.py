@@ -0,0 +1,85 @@
+"""
+Benchmark ROM fingerprinting and near-duplicate grouping.
+
+    python -m benchmarks.bench_similarity
+
+Grouping time per ROM should stay flat as the corpus grows, as candidate
+pairs come from the LSH buckets rather than from comparing every pair.
+"""
+
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.roms import synthetic
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.similarity import group, MinHash, Signature
+
+ROM_SIZE = 2048
+VARIANTS = 4
+
+
+def corpus(count: int) -> List[bytes]:
+    """Build families of ROMs, each a base ROM and a few patched copies."""
+
+    rng = random.Random(0)
+    roms = []
+
+    for family in range(count // VARIANTS):
+        base = bytes(synthetic(ROM_SIZE, seed=family))
+        roms.append(base)
+
+        for _ in range(VARIANTS - 1):
+            data = bytearray(base)
+
+            for _ in range(8):
+                data[rng.randrange(1, len(data), 2)] = rng.getrandbits(8)
+
+            roms.append(bytes(data))
+
+    return roms
+
+
+def fingerprint(roms: List[bytes]) -> Dict[str, Signature]:
+    """Decode every ROM and return its signature."""
+
+    minhash = MinHash()
+    signatures = {}
+
+    for index, rom_data in enumerate(roms):
+        dasm = Disassembler()
+        dasm.rom_data = bytearray(rom_data)
+        dasm.decode()
+        signatures[f"{index:05}.ch8"] = minhash.fingerprint(dasm)
+
+    return signatures
+
+
+def main() -> None:
+    """Run the similarity benchmark."""
+
+    roms = corpus(4000)
+
+    started = time.perf_counter()
+    signatures = fingerprint(roms[:500])
+    elapsed = time.perf_counter() - started
+
+    print(f"{'fingerprint':<12}{elapsed / 500 * 1e3:10.2f} ms/ROM")
+
+    signatures.update(fingerprint(roms[500:]))
+    names = sorted(signatures)
+
+    for count in (1000, 2000, 4000):
+        subset = {name: signatures[name] for name in names[:count]}
+        started = time.perf_counter()
+        groups = group(subset, 0.8)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{f'group {count}':<12}{elapsed / count * 1e6:10.2f} us/ROM"
+            f"{len(groups):8} groups"
+        )
+
+
+if __name__ == "__main__":
+    main()
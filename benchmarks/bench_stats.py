@@ -0,0 +1,44 @@
+"""
+Benchmark decoding and rendering with statistics off and on.
+
+    python -m benchmarks.bench_stats
+"""
+
+import os
+import timeit
+from typing import List, Optional
+
+from benchmarks.roms import synthetic
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.stats import Stats
+from chip8_dasm.writer import Writer
+
+
+def run(rom_data: List[int], stats: Optional[Stats]) -> None:
+    """Decode and render a ROM once."""
+
+    dasm = Disassembler(stats=stats)
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    with open(os.devnull, "w") as devnull:
+        Writer(dasm).generate(devnull)
+
+
+def main() -> None:
+    """Run the statistics benchmark."""
+
+    rom_data = synthetic(3584, branch_density=0.2)
+    count = len(rom_data) // 2
+
+    for name, stats in (("off", None), ("on", Stats())):
+        seconds = min(
+            timeit.repeat(
+                lambda: run(rom_data, stats), number=1, repeat=20  # noqa: B023
+            )
+        )
+        print(f"stats {name:<4} {count / seconds:12,.0f} words/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmark the NumPy linear sweep against the traversal.
+
+    python -m benchmarks.bench_sweep
+"""
+
+import timeit
+from typing import List
+
+from benchmarks.roms import mixed
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.sweep import LinearSweep
+
+
+def traverse(rom_data: List[int]) -> None:
+    """Decode a ROM by following its flow of control."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+
+def main() -> None:
+    """Run the sweep benchmark."""
+
+    count = 1700
+    rom_data = mixed(count)
+    data = bytearray(rom_data)
+
+    for name, function in (
+        ("traversal", lambda: traverse(rom_data)),
+        ("sweep", lambda: LinearSweep(data)),
+        ("sweep (unaligned)", lambda: LinearSweep(data, unaligned=True)),
+        ("sweep statistics", lambda: LinearSweep(data).statistics()),
+    ):
+        seconds = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"{name:<20} {count / seconds:14,.0f} words/sec")
+
+
+if __name__ == "__main__":
+    main()
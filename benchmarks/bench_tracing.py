@@ -0,0 +1,48 @@
+"""
+Benchmark decoding throughput with tracing off and on.
+
+    python -m benchmarks.bench_tracing
+"""
+
+import timeit
+from typing import List, Optional
+
+from benchmarks.roms import straight_line
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.trace import Tracer
+
+
+def run(rom_data: List[int], level: Optional[int]) -> None:
+    """Decode a ROM once at the given trace level."""
+
+    tracer = None
+
+    if level is not None:
+        tracer = Tracer(level, sink=lambda message: None)
+
+    dasm = Disassembler(tracer=tracer)
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+
+def main() -> None:
+    """Run the tracing benchmark."""
+
+    count = 1700
+    rom_data = straight_line(count)
+
+    for name, level in (
+        ("off", None),
+        ("context", Tracer.CONTEXT),
+        ("instruction", Tracer.INSTRUCTION),
+    ):
+        seconds = min(
+            timeit.repeat(
+                lambda: run(rom_data, level), number=1, repeat=5  # noqa: B023
+            )
+        )
+        print(f"tracing {name:<12} {count / seconds:12,.0f} words/sec")
+
+
+if __name__ == "__main__":
+    main()
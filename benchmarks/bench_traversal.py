@@ -0,0 +1,73 @@
+"""
+Benchmark the context traversal of the disassembler.
+
+The recursive scheme that decode used to follow is reproduced here so that
+the worklist traversal can be compared against it on deep jump chains.
+
+    python -m benchmarks.bench_traversal
+"""
+
+import contextlib
+import io
+import sys
+import timeit
+from typing import List, Optional
+
+from benchmarks.roms import jump_chain
+from chip8_dasm.disassembler import Disassembler
+
+
+class RecursiveDisassembler(Disassembler):
+    """Disassembler that re-enters decode once per discovered context."""
+
+    def decode(self, address: Optional[int] = None) -> None:
+        """Process opcodes in ROM file, recursing for each context."""
+
+        self.decode_context(address if address is not None else self.STARTING_ADDRESS)
+
+        if len(self.current_contexts) > 0:
+            self.decode(self.current_contexts.pop())
+
+
+def run(cls: type, rom_data: List[int], traversal: str = "dfs") -> None:
+    """Decode a ROM once with the given disassembler class."""
+
+    dasm = cls(traversal=traversal)
+    dasm.seed_rom_data(rom_data)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dasm.decode()
+
+
+def main() -> None:
+    """Run the traversal benchmark."""
+
+    repeat = 5
+
+    for count in (100, 500, 900, 1500):
+        rom_data = jump_chain(count)
+
+        for name, cls, traversal in (
+            ("recursive", RecursiveDisassembler, "dfs"),
+            ("worklist dfs", Disassembler, "dfs"),
+            ("worklist bfs", Disassembler, "bfs"),
+        ):
+            try:
+                seconds = min(
+                    timeit.repeat(
+                        lambda: run(cls, rom_data, traversal),  # noqa: B023
+                        number=1,
+                        repeat=repeat,
+                    )
+                )
+                result = f"{seconds * 1000:8.2f} ms"
+            except RecursionError:
+                result = "RecursionError"
+
+            print(f"{count:5} contexts  {name:<14} {result}")
+
+    print(f"\nrecursion limit: {sys.getrecursionlimit()}")
+
+
+if __name__ == "__main__":
+    main()
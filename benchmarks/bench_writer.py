@@ -0,0 +1,59 @@
+"""
+Benchmark peak memory and time of building versus streaming a listing.
+
+    python -m benchmarks.bench_writer
+"""
+
+from functools import partial
+import os
+import time
+import tracemalloc
+from typing import Callable, TextIO, Tuple
+
+from benchmarks.roms import straight_line
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.writer import Writer
+
+
+def measure(function: Callable[[], object]) -> Tuple[float, int]:
+    """Return the time taken and peak memory allocated by a function."""
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def buffer(writer: Writer, stream: TextIO) -> None:
+    """Build the whole listing as one string before writing it."""
+
+    stream.write(writer.generate_disassembly_buffer(Writer.STARTING_ADDRESS))
+
+
+def main() -> None:
+    """Run the writer benchmark."""
+
+    for count in (1_000, 10_000, 100_000):
+        dasm = Disassembler()
+        dasm.seed_rom_data(straight_line(count))
+        dasm.decode()
+        writer = Writer(dasm)
+
+        with open(os.devnull, "w") as devnull:
+            for name, function in (
+                ("buffer", partial(buffer, writer, devnull)),
+                ("stream", partial(writer.write, devnull)),
+            ):
+                elapsed, peak = measure(function)
+                print(
+                    f"{count * 2:7} bytes  {name:<7} "
+                    f"{elapsed * 1000:9.2f} ms  {peak / 1024:9.1f} KiB peak"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Synthetic ROM builders for benchmarks."""
+
+import random
+from typing import List
+
+from chip8_dasm.disassembler import Disassembler
+
+# Operations with no effect on the flow of control, as a pattern and the
+# mask of the operand bits that are filled in at random.
+STRAIGHT = (
+    (0x6000, 0x0FFF),
+    (0x7000, 0x0FFF),
+    (0x8000, 0x0FF0),
+    (0x8004, 0x0FF0),
+    (0xC000, 0x0FFF),
+    (0xD000, 0x0FFF),
+    (0xF01E, 0x0F00),
+    (0xF033, 0x0F00),
+)
+MAX_SIZE = 0x1000 - Disassembler.STARTING_ADDRESS
+
+
+def word(value: int) -> List[int]:
+    """Split a 16-bit opcode into its two bytes."""
+
+    return [value >> 8, value & 0xFF]
+
+
+def jump_chain(count: int) -> List[int]:
+    """
+    Build a ROM made of jumps that each land on the next word.
+
+    Every instruction starts a new context, which makes this the worst case
+    for the depth of a recursive traversal.
+    """
+
+    rom_data: List[int] = []
+
+    for index in range(count):
+        target = Disassembler.STARTING_ADDRESS + (index + 1) * 2
+        rom_data += word(0x1000 | target)
+
+    return rom_data
+
+
+def straight_line(count: int) -> List[int]:
+    """
+    Build a ROM of register loads with a single context.
+
+    The loads cycle through the registers so every instruction differs.
+    """
+
+    rom_data: List[int] = []
+
+    for index in range(count):
+        rom_data += word(0x6000 | (index % 16) << 8 | index & 0xFF)
+
+    return rom_data
+
+
+def label_heavy(count: int) -> List[int]:
+    """
+    Build a ROM where every instruction references a distinct address.
+
+    Each instruction loads I with the address of the instruction after it, so
+    the number of labels grows with the size of the ROM.
+    """
+
+    rom_data: List[int] = []
+
+    for index in range(count):
+        target = Disassembler.STARTING_ADDRESS + (index + 1) * 2
+        rom_data += word(0xA000 | target)
+
+    return rom_data
+
+
+def mixed(count: int) -> List[int]:
+    """
+    Build a ROM cycling through loads, draws and I register loads.
+
+    Only operations with no effect on the flow of control are used so the
+    whole ROM is a single context.
+    """
+
+    opcodes = (0x6000, 0xA000, 0xD000, 0x6100)
+    rom_data: List[int] = []
+
+    for index in range(count):
+        rom_data += word(opcodes[index % len(opcodes)] | index & 0xFF)
+
+    return rom_data
+
+
+def synthetic(
+    size: int,
+    seed: int = 0,
+    branch_density: float = 0.1,
+    label_density: float = 0.1,
+    data_ratio: float = 0.0,
+) -> List[int]:
+    """
+    Build a random but reproducible ROM of a given size in bytes.
+
+    The branch density is the share of instructions that are calls or
+    skipped jumps back to earlier code, and the label density the share
+    that load I with an address in the ROM. Blocks of random data make up
+    roughly the data ratio of the ROM, each jumped over so that the code
+    after it is still reached. The ROM ends in a jump to itself.
+    """
+
+    if not 4 <= size <= MAX_SIZE or size % 2:
+        raise ValueError(f"ROM size must be even and from 4 to {MAX_SIZE} bytes")
+
+    rng = random.Random(seed)
+    start = Disassembler.STARTING_ADDRESS
+    count = size // 2 - 1
+    words: List[int] = []
+    code = [start]
+
+    while len(words) < count:
+        address = start + len(words) * 2
+        remaining = count - len(words)
+        choice = rng.random()
+
+        if remaining > 2 and rng.random() < data_ratio / 8:
+            length = min(rng.randint(4, 32), remaining - 1)
+            words.append(0x1000 | address + (length + 1) * 2)
+            words += [rng.getrandbits(16) for _ in range(length)]
+            continue
+
+        code.append(address)
+
+        if choice < branch_density / 2 and remaining > 1:
+            words += [0x3000 | rng.getrandbits(12), 0x1000 | rng.choice(code)]
+        elif choice < branch_density:
+            words.append(0x2000 | rng.choice(code))
+        elif choice < branch_density + label_density:
+            words.append(0xA000 | rng.randrange(start, start + size, 2))
+        else:
+            pattern, mask = rng.choice(STRAIGHT)
+            words.append(pattern | rng.getrandbits(16) & mask)
+
+    words.append(0x1000 | start + count * 2)
+
+    rom_data: List[int] = []
+
+    for value in words:
+        rom_data += word(value)
+
+    return rom_data
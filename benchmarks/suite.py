@@ -0,0 +1,291 @@
+"""
+Benchmark suite that records results to a JSON baseline.
+
+    python -m benchmarks.suite [--baseline FILE] [--update] [--repeat N]
+
+Each benchmark runs against synthetic ROMs built from a fixed seed, so runs
+on the same machine are comparable. Throughput, peak memory and latency
+percentiles are recorded for every benchmark. Each sample times enough calls
+to last a few milliseconds, so that fast benchmarks are not lost in timer
+noise, and is divided by the number of calls. When the baseline file
+exists, the results are compared against it and the run fails if the fastest
+sample of any benchmark is slower by more than the threshold. Other work on
+the machine only ever slows a sample down, so the fastest sample varies far
+less from run to run than the median does. Otherwise, or with
+--update, the results become the new baseline.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from benchmarks.roms import synthetic
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.loader import Loader
+from chip8_dasm.writer import Writer
+
+FORMAT_VERSION = 2
+DEFAULT_BASELINE = ".benchmarks/baseline.json"
+PERCENTILES = (50, 90, 99)
+MIN_SAMPLE_SECONDS = 0.005
+
+
+class Profile(NamedTuple):
+    """Parameters of the synthetic ROM a benchmark runs against."""
+
+    size: int
+    branch_density: float = 0.1
+    label_density: float = 0.1
+    data_ratio: float = 0.0
+
+
+PROFILES = {
+    "small": Profile(512),
+    "large": Profile(3584),
+    "branchy": Profile(3584, branch_density=0.4),
+    "labelled": Profile(3584, label_density=0.5),
+    "data": Profile(3584, data_ratio=0.5),
+}
+
+
+def decoded(rom_data: List[int]) -> Disassembler:
+    """Decode a ROM."""
+
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    return dasm
+
+
+def decode_case(rom_data: List[int], rom_file: str) -> Callable[[], object]:
+    """Return a function that decodes the ROM."""
+
+    return lambda: decoded(rom_data)
+
+
+def writer_case(rom_data: List[int], rom_file: str) -> Callable[[], object]:
+    """Return a function that renders the decoded ROM."""
+
+    writer = Writer(decoded(rom_data))
+
+    return lambda: writer.generate_disassembly_buffer(Writer.STARTING_ADDRESS)
+
+
+def load_case(rom_data: List[int], rom_file: str) -> Callable[[], object]:
+    """Return a function that loads the ROM from a file."""
+
+    return lambda: Loader.load(rom_file)
+
+
+CASES = {"decode": decode_case, "writer": writer_case, "load": load_case}
+
+
+def percentile(samples: List[float], rank: int) -> float:
+    """Return a percentile of samples by the nearest-rank method."""
+
+    ordered = sorted(samples)
+    index = max(0, -(-rank * len(ordered) // 100) - 1)
+
+    return ordered[index]
+
+
+def calibrate(function: Callable[[], object]) -> int:
+    """Return how many calls of a function take at least the sample time."""
+
+    loops = 1
+
+    while True:
+        started = time.perf_counter()
+
+        for _ in range(loops):
+            function()
+
+        if time.perf_counter() - started >= MIN_SAMPLE_SECONDS:
+            return loops
+
+        loops *= 2
+
+
+def sample(function: Callable[[], object], loops: int) -> float:
+    """Return the time a function takes per call, over a number of calls."""
+
+    started = time.perf_counter()
+
+    for _ in range(loops):
+        function()
+
+    return (time.perf_counter() - started) / loops
+
+
+def summarize(
+    function: Callable[[], object], words: int, loops: int, samples: List[float]
+) -> Dict:
+    """Summarize the samples of a function and measure its peak memory once."""
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "words_per_second": words / percentile(samples, 50),
+        "peak_bytes": peak,
+        "loops": loops,
+        "min_seconds": min(samples),
+    }
+
+    for rank in PERCENTILES:
+        result[f"p{rank}_seconds"] = percentile(samples, rank)
+
+    return result
+
+
+def run(repeat: int, seed: int) -> Dict:
+    """
+    Run every benchmark against every profile.
+
+    Samples are taken a round at a time, one of each benchmark per round, so
+    a burst of other work on the machine is spread across the benchmarks
+    rather than landing on every sample of one of them.
+    """
+
+    benchmarks: Dict[str, Tuple[Callable[[], object], int]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, profile in PROFILES.items():
+            rom_data = synthetic(
+                profile.size,
+                seed,
+                profile.branch_density,
+                profile.label_density,
+                profile.data_ratio,
+            )
+            rom_file = os.path.join(directory, f"{name}.ch8")
+
+            with open(rom_file, "wb") as file:
+                file.write(bytes(rom_data))
+
+            for case, build in CASES.items():
+                benchmarks[f"{case}/{name}"] = (
+                    build(rom_data, rom_file),
+                    profile.size // 2,
+                )
+
+        loops = {
+            name: calibrate(function) for name, (function, _) in benchmarks.items()
+        }
+        samples: Dict[str, List[float]] = {name: [] for name in benchmarks}
+
+        for _ in range(repeat):
+            for name, (function, _) in benchmarks.items():
+                samples[name].append(sample(function, loops[name]))
+
+        results = {
+            name: summarize(function, words, loops[name], samples[name])
+            for name, (function, words) in benchmarks.items()
+        }
+
+    return {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Return a description of each benchmark slower than the baseline."""
+
+    if (baseline["version"], baseline["seed"]) != (FORMAT_VERSION, current["seed"]):
+        raise ValueError("Baseline was recorded with a different format or seed")
+
+    regressions = []
+
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+
+        if before is None:
+            continue
+
+        ratio = result["min_seconds"] / before["min_seconds"]
+
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: fastest {ratio:.2f}x the baseline")
+
+    return regressions
+
+
+def report(current: Dict, baseline: Dict) -> None:
+    """Print the results next to the baseline, if there is one."""
+
+    print(f"{'benchmark':<18}{'words/s':>12}{'p50 us':>10}{'p99 us':>10}", end="")
+    print(f"{'peak KiB':>10}{'vs base':>9}")
+
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        change = ""
+
+        if before is not None:
+            change = f"{result['min_seconds'] / before['min_seconds']:8.2f}x"
+
+        print(
+            f"{name:<18}{result['words_per_second']:12.0f}"
+            f"{result['p50_seconds'] * 1e6:10.1f}{result['p99_seconds'] * 1e6:10.1f}"
+            f"{result['peak_bytes'] / 1024:10.1f}{change:>9}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark suite."""
+
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, type=Path)
+    parser.add_argument("--update", action="store_true", help="replace the baseline")
+    parser.add_argument("--repeat", default=50, type=int)
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument(
+        "--threshold",
+        default=0.2,
+        type=float,
+        help="slowdown allowed before a run fails",
+    )
+    args = parser.parse_args()
+
+    current = run(args.repeat, args.seed)
+    baseline = {}
+
+    if args.baseline.exists() and not args.update:
+        baseline = json.loads(args.baseline.read_text())
+
+    report(current, baseline)
+
+    if not baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    try:
+        regressions = compare(baseline, current, args.threshold)
+    except ValueError as error:
+        parser.error(f"{error}; rerun with --update")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from nox.sessions import Session
 nox.options.reuse_existing_virtualenvs = True
 nox.options.sessions = "lint", "typing", "tests"
 
-locations = "src", "tests", "noxfile.py"
+locations = "src", "tests", "benchmarks", "noxfile.py"
 
 
 @nox.session(python=["3.7", "3.8", "3.9"])
@@ -60,6 +60,15 @@ def typing(session: Session) -> Session:
     # mypy  module_name
 
 
+@nox.session(python="3.7")
+def benchmarks(session: Session) -> Session:
+    """Run the benchmark suite against the recorded baseline."""
+
+    args = session.posargs or []
+    session.run("poetry", "install", "--no-dev", external=True)
+    session.run("python", "-m", "benchmarks.suite", *args)
+
+
 # ===========================================================================
 # Nox File Helpers
 # ===========================================================================
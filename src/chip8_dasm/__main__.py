@@ -1,8 +1,8 @@
 """Entry point module for the disassembler."""
 
+import os
 import sys
-
-from chip8_dasm.cli import main
+from typing import List
 
 if sys.version_info < (3, 7):
     sys.stderr.write("\nc8dasm requires Python 3.7 or later.\n")
@@ -12,5 +12,77 @@ if sys.version_info < (3, 7):
     )
     sys.exit(1)
 
+# Names that click would take as a command rather than as a ROM file.
+COMMANDS = (
+    "disassemble",
+    "batch",
+    "diff",
+    "graph",
+    "index",
+    "search",
+    "serve",
+    "similar",
+    "sweep",
+    "xref",
+)
+
+
+def main() -> None:
+    """Entry point for the disassembler."""
+
+    if not disassemble_fast(sys.argv[1:]):
+        from chip8_dasm.cli import main as cli_main
+
+        cli_main()
+
+
+def disassemble_fast(arguments: List[str]) -> bool:
+    """
+    Disassemble a ROM without loading the command line interface.
+
+    Scripts tend to run the disassembler on one ROM at a time with no
+    options, where importing click would take longer than the disassembly
+    itself. This handles just that case, along with the --no-cache and
+    --server options, with output that is the same as the disassemble
+    command gives when it is not writing to a terminal. Returns whether the
+    arguments were handled.
+    """
+
+    options = arguments[1:]
+
+    if not arguments or options not in ([], ["--no-cache"], ["--server"]):
+        return False
+
+    rom_file = arguments[0]
+
+    if rom_file in COMMANDS or rom_file.startswith("-") or sys.stdout.isatty():
+        return False
+
+    if not os.path.isfile(rom_file):
+        return False
+
+    from chip8_dasm.disassembler import Disassembler
+    from chip8_dasm.pipeline import decode, write
+
+    print("\nCHIP-8 Disassembler\n")
+    print(f"ROM File: {os.path.basename(rom_file)}")
+
+    if options == ["--server"]:
+        from chip8_dasm.client import disassemble_remote, ServerError
+
+        try:
+            if disassemble_remote(rom_file):
+                return True
+        except ServerError as error:
+            sys.stderr.write(f"Error: {error}\n")
+            sys.exit(1)
+
+    dasm = Disassembler(rom_file)
+    decode(dasm, no_cache=options == ["--no-cache"])
+    write(dasm)
+
+    return True
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+"""Address bookkeeping for CHIP-8 memory."""
+
+from typing import Iterable, Iterator, Union
+
+
+class AddressSet:
+    """
+    Ordered, deduplicated collection of addresses.
+
+    Membership is held in a bitmap with one byte per address of the CHIP-8
+    address space, so adding and testing an address are constant time and
+    iteration always yields addresses in ascending order. Addresses outside
+    the address space are never recorded.
+    """
+
+    SIZE = 0x1000
+
+    def __init__(self, addresses: Iterable[int] = (), size: int = SIZE):
+        self.bitmap = bytearray(size)
+        self.count = 0
+
+        for address in addresses:
+            self.add(address)
+
+    def add(self, address: int) -> bool:
+        """
+        Add an address to the collection.
+
+        Returns whether the address was newly added.
+        """
+
+        if 0 <= address < len(self.bitmap) and not self.bitmap[address]:
+            self.bitmap[address] = 1
+            self.count += 1
+            return True
+
+        return False
+
+    def discard(self, address: int) -> None:
+        """Remove an address from the collection if it is present."""
+
+        if address in self:
+            self.bitmap[address] = 0
+            self.count -= 1
+
+    def clear(self) -> None:
+        """Remove all addresses from the collection."""
+
+        self.bitmap = bytearray(len(self.bitmap))
+        self.count = 0
+
+    def find(self, start: int, stop: int) -> int:
+        """Return the first address from start up to stop, or -1 if none."""
+
+        return self.bitmap.find(1, max(start, 0), stop)
+
+    def __contains__(self, address: object) -> bool:
+        """Report whether an address is in the collection."""
+
+        if not isinstance(address, int) or not 0 <= address < len(self.bitmap):
+            return False
+
+        return self.bitmap[address] == 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the addresses in ascending order."""
+
+        return members(self.bitmap)
+
+    def __len__(self) -> int:
+        """Return the number of addresses in the collection."""
+
+        return self.count
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another collection of addresses."""
+
+        if isinstance(other, AddressSet):
+            return self.bitmap == other.bitmap
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Represent the collection as its ordered addresses."""
+
+        return f"AddressSet({list(self)})"
+
+
+def members(bitmap: Union[bytes, bytearray]) -> Iterator[int]:
+    """Generate the positions of the set bytes of a bitmap, in ascending order."""
+
+    address = bitmap.find(1)
+
+    while address != -1:
+        yield address
+        address = bitmap.find(1, address + 1)
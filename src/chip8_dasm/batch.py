@@ -0,0 +1,164 @@
+"""Batch disassembly of ROM directories."""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import json
+import os
+from pathlib import Path
+import time
+from typing import List, NamedTuple, Optional
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.writer import Writer
+
+
+class BatchResult(NamedTuple):
+    """Outcome of disassembling a single ROM in a batch."""
+
+    rom_file: str
+    output_file: Optional[str]
+    instructions: int
+    labels: int
+    seconds: float
+    error: Optional[str] = None
+
+
+class Batch:
+    """
+    Disassembles every ROM found in a directory.
+
+    ROMs are discovered recursively and processed in sorted order, so results
+    are reported in the same order however many worker processes are used.
+    A ROM that fails to disassemble is reported as an error without stopping
+    the rest of the batch. When a cache directory is given, ROMs that have
+    been decoded before are not decoded again.
+    """
+
+    PATTERN = "*.ch8"
+    SUMMARY_FILE = "summary.json"
+
+    def __init__(
+        self,
+        directory: str,
+        output_dir: str,
+        jobs: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        self.directory = Path(directory)
+        self.output_dir = Path(output_dir)
+        self.jobs = jobs if jobs is not None else os.cpu_count() or 1
+        self.cache_dir = cache_dir
+
+    def discover(self) -> List[Path]:
+        """Find the ROM files in the batch directory."""
+
+        return sorted(
+            path for path in self.directory.rglob(self.PATTERN) if not path.is_dir()
+        )
+
+    def run(self) -> List[BatchResult]:
+        """Disassemble all ROMs and write the summary."""
+
+        rom_files = [str(path) for path in self.discover()]
+        output_files = [str(self.output_path(Path(path))) for path in rom_files]
+        cache_dirs = [self.cache_dir] * len(rom_files)
+
+        if self.jobs == 1 or len(rom_files) < 2:
+            results = list(map(disassemble_rom, rom_files, output_files, cache_dirs))
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                chunksize = max(1, len(rom_files) // (self.jobs * 4))
+                results = list(
+                    pool.map(
+                        disassemble_rom,
+                        rom_files,
+                        output_files,
+                        cache_dirs,
+                        chunksize=chunksize,
+                    )
+                )
+
+        # Each worker only counts what it stores itself, so the cache may
+        # have grown past its limit in between.
+        if self.cache_dir is not None:
+            DisassemblyCache(self.cache_dir).evict()
+
+        self.write_summary(results)
+
+        return results
+
+    def output_path(self, rom_file: Path) -> Path:
+        """Return where the disassembly of a ROM is written."""
+
+        relative = rom_file.relative_to(self.directory)
+
+        return self.output_dir / relative.with_suffix(".asm")
+
+    def write_summary(self, results: List[BatchResult]) -> None:
+        """Write a summary of the batch as JSON."""
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        summary = {
+            "roms": len(results),
+            "failed": sum(1 for result in results if result.error),
+            "results": [result._asdict() for result in results],
+        }
+
+        with open(self.output_dir / self.SUMMARY_FILE, "w") as stream:
+            json.dump(summary, stream, indent=2)
+
+
+def disassemble_rom(
+    rom_file: str, output_file: str, cache_dir: Optional[str] = None
+) -> BatchResult:
+    """
+    Disassemble a single ROM to a file.
+
+    This runs in worker processes, so any error is captured in the result
+    rather than raised.
+    """
+
+    started = time.perf_counter()
+
+    try:
+        dasm = Disassembler(rom_file)
+
+        if cache_dir is None:
+            dasm.decode()
+        else:
+            cache = open_cache(cache_dir)
+
+            if not cache.load(dasm):
+                dasm.decode()
+                cache.store(dasm)
+
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_file, "w") as stream:
+            Writer(dasm).generate(stream)
+    except Exception as error:
+        return BatchResult(
+            rom_file,
+            None,
+            0,
+            0,
+            time.perf_counter() - started,
+            f"{type(error).__name__}: {error}",
+        )
+
+    return BatchResult(
+        rom_file,
+        output_file,
+        len(dasm.disassembly),
+        len(dasm.labels),
+        time.perf_counter() - started,
+    )
+
+
+@lru_cache(maxsize=None)
+def open_cache(cache_dir: str) -> DisassemblyCache:
+    """Return the cache a process uses, so its size is only counted once."""
+
+    return DisassemblyCache(cache_dir)
@@ -0,0 +1,242 @@
+"""Content-addressed cache of disassembly results."""
+
+from array import array
+import hashlib
+import os
+from pathlib import Path
+import struct
+import sys
+from typing import Iterable, List, Optional
+
+from chip8_dasm import __version__
+from chip8_dasm.disassembler import Disassembler
+
+
+class DisassemblyCache:
+    """
+    Stores decoded ROMs on disk, keyed by a hash of their contents.
+
+    An entry records the addresses of the decoded instructions together with
+    the labels, contexts and visited addresses of the traversal. Instructions
+    themselves are not stored, as they are recovered from the ROM through the
+    decode table. Entries are evicted least recently used first once the cache grows
+    beyond its size limit, together with any other files stored under the same
+    key.
+
+    The cache directory is scanned for its size on the first store, and after
+    that the size is kept as a running total. It is only scanned again when
+    the total passes the limit, so storing many ROMs does not rescan the cache
+    for each one.
+    """
+
+    MAGIC = b"C8DC"
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct("<4sHIIII")
+    SUFFIX = ".c8dc"
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = MAX_BYTES):
+        self.directory = Path(directory or self.default_directory())
+        self.max_bytes = max_bytes
+        self.size: Optional[int] = None
+
+    @staticmethod
+    def default_directory() -> str:
+        """Return the cache directory to use when none is given."""
+
+        if "C8DASM_CACHE_DIR" in os.environ:
+            return os.environ["C8DASM_CACHE_DIR"]
+
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+
+        return os.path.join(base, "c8dasm")
+
+    def key(self, dasm: Disassembler) -> str:
+        """Return the cache key for the ROM of a disassembler."""
+
+        digest = hashlib.sha256()
+        digest.update(f"c8dasm {__version__} {dasm.isa.name}\0".encode())
+        digest.update(dasm.rom_data)
+
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        """Return the file that holds the entry for a key."""
+
+        return self.directory / key[:2] / (key + self.SUFFIX)
+
+    def load(self, dasm: Disassembler) -> bool:
+        """
+        Restore a disassembly from the cache.
+
+        Returns whether an entry was found. When it was, the disassembler is
+        left as if decode had been run.
+        """
+
+        path = self.path(self.key(dasm))
+
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return False
+
+        try:
+            tables = self.unpack(data)
+        except ValueError:
+            return False
+
+        instructions, labels, contexts, visited = tables
+        table = dasm.table
+        rom_data = dasm.rom_data
+        start = dasm.STARTING_ADDRESS
+
+        for address in instructions:
+            offset = address - start
+            instruction = table[rom_data[offset] << 8 | rom_data[offset + 1]]
+
+            if instruction.size == 4:
+                instruction = dasm.widen(offset, instruction)
+
+            dasm.disassembly[address] = instruction
+            dasm.add_references(address, instruction)
+
+        for address in labels:
+            dasm.labels.add(address)
+
+        for address in contexts:
+            dasm.all_contexts.add(address)
+
+        for address in visited:
+            dasm.visited.add(address)
+
+        dasm.entry = start
+
+        os.utime(path)
+
+        return True
+
+    def store(self, dasm: Disassembler) -> None:
+        """Add the disassembly of a decoded ROM to the cache."""
+
+        path = self.path(self.key(dasm))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = self.pack(dasm.disassembly, dasm.labels, dasm.all_contexts, dasm.visited)
+
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+
+        # Write to a temporary file first so that concurrent readers never
+        # see a partial entry. Only stores need tempfile, so importing it is
+        # left out of the time taken to start up and load a cached result.
+        import tempfile
+
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent)
+
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+
+        os.replace(temporary, path)
+
+        if self.size is None:
+            self.evict()
+            return
+
+        self.size += len(data) - replaced
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries beyond the size limit.
+
+        This scans the whole cache, and counts its size afresh.
+        """
+
+        entries = []
+
+        for path in self.directory.glob("*/*" + self.SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            if self.remove(path):
+                total -= size
+
+        self.size = total
+
+    def remove(self, path: Path) -> bool:
+        """Remove an entry and any other files stored under its key."""
+
+        try:
+            path.unlink()
+        except OSError:
+            return False
+
+        for sibling in path.parent.glob(path.stem + ".*"):
+            try:
+                sibling.unlink()
+            except OSError:
+                pass
+
+        return True
+
+    def pack(self, *tables: Iterable[int]) -> bytes:
+        """Serialize tables of addresses."""
+
+        arrays = [array("H", table) for table in tables]
+
+        if sys.byteorder == "big":
+            for values in arrays:
+                values.byteswap()
+
+        header = self.HEADER.pack(
+            self.MAGIC, self.FORMAT_VERSION, *(len(values) for values in arrays)
+        )
+
+        return header + b"".join(values.tobytes() for values in arrays)
+
+    def unpack(self, data: bytes) -> List["array[int]"]:
+        """Deserialize tables of addresses."""
+
+        if len(data) < self.HEADER.size:
+            raise ValueError("Cache entry is truncated")
+
+        magic, version, *counts = self.HEADER.unpack_from(data)
+
+        if magic != self.MAGIC or version != self.FORMAT_VERSION:
+            raise ValueError("Cache entry has an unknown format")
+
+        if len(data) != self.HEADER.size + 2 * sum(counts):
+            raise ValueError("Cache entry is truncated")
+
+        arrays = []
+        offset = self.HEADER.size
+
+        for count in counts:
+            end = offset + 2 * count
+            values = array("H")
+            values.frombytes(data[offset:end])
+
+            if sys.byteorder == "big":
+                values.byteswap()
+
+            arrays.append(values)
+            offset = end
+
+        return arrays
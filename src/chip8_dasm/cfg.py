@@ -0,0 +1,434 @@
+"""Control flow graph module for the disassembler."""
+
+from enum import IntEnum
+import json
+import sys
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import Flow, Instruction
+
+
+class EdgeKind(IntEnum):
+    """
+    The way control passes from one basic block to another.
+
+    A return edge leads from a block that ends in a call to the instruction
+    after the call, where the called subroutine returns to.
+    """
+
+    FALLTHROUGH = 0
+    JUMP = 1
+    SKIP = 2
+    CALL = 3
+    RETURN = 4
+
+
+class Edge(NamedTuple):
+    """Edge between the basic blocks starting at two addresses."""
+
+    source: int
+    target: int
+    kind: EdgeKind
+
+
+class Loop(NamedTuple):
+    """Natural loop, given by its header and the blocks of its body."""
+
+    header: int
+    body: FrozenSet[int]
+
+
+class BasicBlock:
+    """
+    Run of instructions that is only entered at its first instruction.
+
+    Control only leaves a block after its last instruction.
+    """
+
+    __slots__ = ("start", "addresses", "instructions")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.addresses: List[int] = []
+        self.instructions: List[Instruction] = []
+
+    @property
+    def last(self) -> int:
+        """Return the address of the last instruction."""
+
+        return self.addresses[-1]
+
+    @property
+    def end(self) -> int:
+        """Return the address just past the last instruction."""
+
+        return self.last + self.instructions[-1].size
+
+    def __len__(self) -> int:
+        """Return the number of instructions in the block."""
+
+        return len(self.addresses)
+
+    def __repr__(self) -> str:
+        """Represent the block by the addresses it spans."""
+
+        return f"<BasicBlock 0x{self.start:04x}-0x{self.end:04x}>"
+
+
+class ControlFlowGraph:
+    """
+    Basic blocks of a disassembly and the edges between them.
+
+    The graph is built in one pass over the decoded instructions. It is a
+    snapshot, so a disassembly that is patched needs a new graph. Analyses
+    are computed the first time they are asked for and kept from then on.
+    """
+
+    DOT_STYLES = {
+        EdgeKind.FALLTHROUGH: "solid",
+        EdgeKind.JUMP: "bold",
+        EdgeKind.SKIP: "dashed",
+        EdgeKind.CALL: "bold",
+        EdgeKind.RETURN: "dotted",
+    }
+
+    def __init__(self, dasm: Disassembler):
+        self.entry = dasm.entry if dasm.entry is not None else dasm.STARTING_ADDRESS
+        self.skip_target = dasm.skip_target
+        self.blocks: Dict[int, BasicBlock] = {}
+        self.owners: Dict[int, int] = {}
+        self.successors: Dict[int, List[Edge]] = {}
+        self.predecessors: Dict[int, List[Edge]] = {}
+
+        self.reachable_blocks: Optional[FrozenSet[int]] = None
+        self.postorder: Optional[List[int]] = None
+        self.idoms: Optional[Dict[int, int]] = None
+        self.natural_loops: Optional[List[Loop]] = None
+
+        self.build(dasm.disassembly)
+
+    def exits(
+        self, address: int, instruction: Instruction
+    ) -> List[Tuple[int, EdgeKind]]:
+        """Return where control may go after an instruction, and how."""
+
+        flow = instruction.flow
+        following = address + instruction.size
+
+        if flow is Flow.NEXT:
+            return [(following, EdgeKind.FALLTHROUGH)]
+
+        if flow is Flow.SKIP:
+            return [
+                (following, EdgeKind.FALLTHROUGH),
+                (self.skip_target(address), EdgeKind.SKIP),
+            ]
+
+        if flow is Flow.JUMP:
+            assert instruction.target is not None
+            return [(instruction.target, EdgeKind.JUMP)]
+
+        if flow is Flow.CALL:
+            assert instruction.target is not None
+            return [(instruction.target, EdgeKind.CALL), (following, EdgeKind.RETURN)]
+
+        return []
+
+    def build(self, disassembly: Dict[int, Instruction]) -> None:
+        """Split a disassembly into basic blocks and connect them."""
+
+        leaders = self.leaders(disassembly)
+
+        for start in sorted(leaders):
+            block = self.blocks[start] = BasicBlock(start)
+            address = start
+
+            while True:
+                instruction = disassembly[address]
+                block.addresses.append(address)
+                block.instructions.append(instruction)
+                self.owners[address] = start
+
+                if instruction.flow is not Flow.NEXT:
+                    break
+
+                address += instruction.size
+
+                if address in leaders or address not in disassembly:
+                    break
+
+        for start, block in self.blocks.items():
+            self.successors[start] = []
+            self.predecessors.setdefault(start, [])
+
+            for target, kind in self.exits(block.last, block.instructions[-1]):
+                if target in self.blocks:
+                    edge = Edge(start, target, kind)
+                    self.successors[start].append(edge)
+                    self.predecessors.setdefault(target, []).append(edge)
+
+    def leaders(self, disassembly: Dict[int, Instruction]) -> Set[int]:
+        """
+        Find the addresses that start basic blocks.
+
+        An instruction continues the block before it only when exactly one
+        instruction runs straight into it and nothing branches to it.
+        """
+
+        leaders = {self.entry} if self.entry in disassembly else set()
+        fallen_into: Dict[int, int] = {}
+
+        for address, instruction in disassembly.items():
+            if instruction.flow is Flow.NEXT:
+                following = address + instruction.size
+                fallen_into[following] = fallen_into.get(following, 0) + 1
+            else:
+                for target, _ in self.exits(address, instruction):
+                    leaders.add(target)
+
+        for address in disassembly:
+            if fallen_into.get(address) != 1:
+                leaders.add(address)
+
+        return {address for address in leaders if address in disassembly}
+
+    def block_of(self, address: int) -> Optional[BasicBlock]:
+        """Return the block holding the instruction at an address."""
+
+        start = self.owners.get(address)
+
+        return None if start is None else self.blocks[start]
+
+    def reachable(self) -> FrozenSet[int]:
+        """Return the blocks that can be reached from the entry point."""
+
+        if self.reachable_blocks is None:
+            self.reachable_blocks = frozenset(self.order())
+
+        return self.reachable_blocks
+
+    def order(self) -> List[int]:
+        """Return the reachable blocks in reverse postorder."""
+
+        if self.postorder is not None:
+            return self.postorder
+
+        postorder: List[int] = []
+
+        if self.entry in self.blocks:
+            seen = {self.entry}
+            stack = [(self.entry, iter(self.successors[self.entry]))]
+
+            while stack:
+                start, edges = stack[-1]
+
+                for edge in edges:
+                    if edge.target not in seen:
+                        seen.add(edge.target)
+                        stack.append((edge.target, iter(self.successors[edge.target])))
+                        break
+                else:
+                    stack.pop()
+                    postorder.append(start)
+
+        postorder.reverse()
+        self.postorder = postorder
+
+        return postorder
+
+    def dominators(self) -> Dict[int, int]:
+        """
+        Return the immediate dominator of each reachable block.
+
+        The entry block is its own immediate dominator. This uses the
+        iterative algorithm of Cooper, Harvey and Kennedy.
+        """
+
+        if self.idoms is not None:
+            return self.idoms
+
+        order = self.order()
+        index = {start: position for position, start in enumerate(order)}
+        idoms: Dict[int, int] = {}
+
+        if order:
+            idoms[self.entry] = self.entry
+
+        changed = True
+
+        while changed:
+            changed = False
+
+            for start in order[1:]:
+                idom = self.intersect_all(start, idoms, index)
+
+                if idoms.get(start) != idom:
+                    idoms[start] = idom
+                    changed = True
+
+        self.idoms = idoms
+
+        return idoms
+
+    def intersect_all(
+        self, start: int, idoms: Dict[int, int], index: Dict[int, int]
+    ) -> int:
+        """Find the nearest common dominator of the processed predecessors."""
+
+        result: Optional[int] = None
+
+        for edge in self.predecessors[start]:
+            other = edge.source
+
+            if other not in idoms:
+                continue
+
+            while result is not None and other != result:
+                while index[other] > index[result]:
+                    other = idoms[other]
+
+                while index[result] > index[other]:
+                    result = idoms[result]
+
+            result = other
+
+        assert result is not None
+
+        return result
+
+    def dominates(self, dominator: int, start: int) -> bool:
+        """Report whether every path from the entry to a block passes another."""
+
+        idoms = self.dominators()
+
+        if start not in idoms:
+            return False
+
+        while start != dominator:
+            if idoms[start] == start:
+                return False
+
+            start = idoms[start]
+
+        return True
+
+    def loops(self) -> List[Loop]:
+        """
+        Find the natural loops of the graph.
+
+        A loop is formed by each edge to a block that dominates its source.
+        Loops that share a header are merged.
+        """
+
+        if self.natural_loops is not None:
+            return self.natural_loops
+
+        bodies: Dict[int, Set[int]] = {}
+
+        for start in self.order():
+            for edge in self.successors[start]:
+                if self.dominates(edge.target, start):
+                    body = bodies.setdefault(edge.target, {edge.target})
+                    self.collect_body(body, start)
+
+        self.natural_loops = [
+            Loop(header, frozenset(body)) for header, body in sorted(bodies.items())
+        ]
+
+        return self.natural_loops
+
+    def collect_body(self, body: Set[int], latch: int) -> None:
+        """
+        Add the blocks that reach a latch without passing the header.
+
+        Only reachable blocks are added, as a dead block that jumps into a
+        loop is not part of it.
+        """
+
+        reachable = self.reachable()
+        pending = [latch]
+
+        while pending:
+            start = pending.pop()
+
+            if start in body:
+                continue
+
+            body.add(start)
+            pending.extend(
+                edge.source
+                for edge in self.predecessors[start]
+                if edge.source in reachable
+            )
+
+    def dot_lines(self) -> Iterator[str]:
+        """Generate the graph in the DOT language, a line at a time."""
+
+        yield "digraph cfg {\n"
+        yield '    node [shape=box, fontname="monospace"];\n'
+
+        for start, block in self.blocks.items():
+            text = "".join(
+                f"0x{address:04x}: {instruction.text}\\l"
+                for address, instruction in zip(block.addresses, block.instructions)
+            )
+            yield '    "0x{:04x}" [label="{}"];\n'.format(start, text)
+
+        for edges in self.successors.values():
+            for edge in edges:
+                yield '    "0x{:04x}" -> "0x{:04x}" [label={}, style={}];\n'.format(
+                    edge.source,
+                    edge.target,
+                    edge.kind.name.lower(),
+                    self.DOT_STYLES[edge.kind],
+                )
+
+        yield "}\n"
+
+    def json_chunks(self) -> Iterator[str]:
+        """Generate the graph as a JSON document, a block at a time."""
+
+        yield f'{{"entry": {self.entry}, "blocks": ['
+
+        for position, (start, block) in enumerate(self.blocks.items()):
+            record = {
+                "start": start,
+                "end": block.end,
+                "instructions": [
+                    [address, instruction.text]
+                    for address, instruction in zip(block.addresses, block.instructions)
+                ],
+                "successors": [
+                    {"target": edge.target, "kind": edge.kind.name.lower()}
+                    for edge in self.successors[start]
+                ],
+            }
+            yield ("\n  " if position == 0 else ",\n  ") + json.dumps(record)
+
+        yield "\n]}\n"
+
+    def write(self, stream: Optional[TextIO] = None, form: str = "dot") -> None:
+        """
+        Write the graph as DOT or JSON.
+
+        The graph goes to standard output unless a stream is provided.
+        """
+
+        if form not in ("dot", "json"):
+            raise ValueError(f"Unknown graph format: {form}")
+
+        if stream is None:
+            stream = sys.stdout
+
+        stream.writelines(self.dot_lines() if form == "dot" else self.json_chunks())
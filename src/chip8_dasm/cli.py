@@ -1,35 +1,740 @@
 """Command line interface module for the disassembler."""
 
+from contextlib import nullcontext
 import os
+from typing import ContextManager, List, Optional, TextIO, Tuple
 
 from chip8_dasm import __version__
 from chip8_dasm.disassembler import Disassembler
-from chip8_dasm.writer import Writer
+from chip8_dasm.instructions import INSTRUCTION_SETS
+from chip8_dasm.pipeline import decode, write
 import click
 
+# Everything else is imported by the commands that use it, so that starting
+# up only costs what the command line asks for.
+
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
-@click.command(context_settings=CONTEXT_SETTINGS)
+class DefaultGroup(click.Group):
+    """
+    Command group that falls back to a default command.
+
+    Anything that is not the name of a command or an option of the group
+    itself is passed to the default command, so a ROM file can be given
+    directly without naming the disassemble command.
+    """
+
+    DEFAULT_COMMAND = "disassemble"
+    GROUP_OPTIONS = ("-h", "--help", "--version")
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        """Insert the default command when no command is named."""
+
+        if not args or (
+            args[0] not in self.commands and args[0] not in self.GROUP_OPTIONS
+        ):
+            args = [self.DEFAULT_COMMAND, *args]
+
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup, context_settings=CONTEXT_SETTINGS)
 @click.version_option(version=__version__)
+def cli() -> None:
+    """Disassemble CHIP-8 ROM files.
+
+    Without a command, the arguments are passed to the disassemble command.
+    """
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
 @click.argument("rom_file", type=click.Path(exists=True))
 @click.option("-i", "--insight", is_flag=True, help="execution details")
-def cli(rom_file: str, insight: bool) -> None:
+@click.option(
+    "--insight-at",
+    multiple=True,
+    callback=lambda ctx, param, values: parse_addresses(values),
+    metavar="ADDRESS",
+    help="execution details at ADDRESS only",
+)
+@click.option(
+    "--insight-op",
+    multiple=True,
+    metavar="OPERATION",
+    help="execution details for OPERATION only, such as DXYN or DRW",
+)
+@click.option(
+    "--insight-file",
+    type=click.File("w"),
+    help="write execution details to FILE as JSON lines",
+)
+@click.option(
+    "-t",
+    "--trace",
+    type=click.Choice(["context", "instruction"]),
+    help="trace decoding to stderr",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="write disassembly to FILE",
+)
+@click.option(
+    "-f",
+    "--format",
+    "form",
+    type=click.Choice(["text", "jsonl", "binary", "sqlite"]),
+    default="text",
+    show_default=True,
+    help="disassembly format, where all but text need --output",
+)
+@click.option(
+    "--isa",
+    type=click.Choice(list(INSTRUCTION_SETS)),
+    default="chip8",
+    show_default=True,
+    help="instruction set of the ROM",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROM")
+@click.option("--mmap", "mapped", is_flag=True, help="memory-map the ROM")
+@click.option("--server", is_flag=True, help="ask a running server to disassemble")
+@click.option(
+    "--run",
+    "budget",
+    type=click.IntRange(min=1),
+    metavar="STEPS",
+    help="run the ROM for up to STEPS instructions to find more code",
+)
+@click.option(
+    "--keys",
+    default="random",
+    show_default=True,
+    metavar="SCRIPT",
+    help="keys held while running, one hex digit or dot per frame",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="random seed")
+@click.option("--stats", "show_stats", is_flag=True, help="report timings to stderr")
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, writable=True),
+    help="write cProfile statistics to FILE",
+)
+@click.option(
+    "--memory",
+    type=click.Path(dir_okay=False, writable=True),
+    help="write a tracemalloc snapshot to FILE",
+)
+def disassemble(
+    rom_file: str,
+    insight: bool,
+    insight_at: Tuple[int, ...],
+    insight_op: Tuple[str, ...],
+    insight_file: Optional[TextIO],
+    trace: Optional[str],
+    output: Optional[str],
+    form: str,
+    isa: str,
+    cache_dir: Optional[str],
+    no_cache: bool,
+    mapped: bool,
+    show_stats: bool,
+    profile: Optional[str],
+    memory: Optional[str],
+    server: bool,
+    budget: Optional[int],
+    keys: str,
+    seed: int,
+) -> None:
     """Disassemble ROM_FILE.
 
     ROM_FILE is the rom binary file to load.
     """
 
+    check_options(output, form, isa, budget)
+
     click.echo("ROM File: ", nl=False)
     click.secho(f"{os.path.basename(rom_file)}", fg="green", bold=True)
 
-    dasm = Disassembler(rom_file, insight)
-    assert isinstance(dasm.rom_data, bytearray)
+    if server:
+        local = (insight, insight_at, insight_op, insight_file, trace, show_stats)
+        changed = (profile, memory, budget, form != "text", isa != "chip8")
+
+        if any(local) or any(changed):
+            raise click.UsageError(
+                "--server cannot be used with insight, tracing, statistics, "
+                "--run, --format or --isa"
+            )
+
+        if remote(rom_file, output):
+            return
+
+    tracer = None
+    stats = None
+    explained = None
+
+    if trace is not None:
+        import logging
+
+        from chip8_dasm.trace import Tracer
+
+        logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+        tracer = Tracer.from_name(trace)
+
+    if show_stats:
+        from chip8_dasm.stats import Stats
+
+        stats = Stats()
+
+    if insight or insight_at or insight_op or insight_file:
+        from chip8_dasm.insight import Insight
+
+        explained = Insight(insight_at, insight_op, stream=insight_file)
+
+    with profiled(profile, memory):
+        dasm = Disassembler(
+            rom_file,
+            tracer=tracer,
+            mapped=mapped,
+            stats=stats,
+            insight=explained,
+            isa=isa,
+        )
+
+        # Insight and tracing report on decoding as it happens, so there is
+        # nothing to gain from a cached result when they are asked for.
+        decode(dasm, cache_dir, no_cache or explained is not None or bool(tracer))
+
+        if budget is not None:
+            execute(dasm, budget, keys, seed)
+
+        if explained is not None and insight_file is None:
+            explained.show()
+
+        write(dasm, output, form)
+
+    report(dasm)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("rom_file", type=click.Path(exists=True))
+@click.option(
+    "-f",
+    "--format",
+    "form",
+    type=click.Choice(["dot", "json"]),
+    default="dot",
+    show_default=True,
+    help="graph format",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="write graph to FILE",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROM")
+def graph(
+    rom_file: str,
+    form: str,
+    output: Optional[str],
+    cache_dir: Optional[str],
+    no_cache: bool,
+) -> None:
+    """Write the control flow graph of ROM_FILE.
+
+    The graph is made of the basic blocks of the disassembly, written as
+    DOT for Graphviz or as JSON.
+    """
+
+    from chip8_dasm.cfg import ControlFlowGraph
+
+    dasm = Disassembler(rom_file)
+    decode(dasm, cache_dir, no_cache)
+
+    flow_graph = ControlFlowGraph(dasm)
+
+    if output is None:
+        flow_graph.write(form=form)
+    else:
+        with open(output, "w") as stream:
+            flow_graph.write(stream, form)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("old_rom", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new_rom", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-a", "--all", "show_all", is_flag=True, help="list unchanged routines too"
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROMs")
+def diff(
+    old_rom: str,
+    new_rom: str,
+    show_all: bool,
+    cache_dir: Optional[str],
+    no_cache: bool,
+) -> None:
+    """Show which routines changed from OLD_ROM to NEW_ROM.
+
+    Routines are matched by their code and structure rather than by their
+    addresses, so code that has only moved is not reported. Modified
+    routines are listed with the blocks that changed.
+    """
+
+    from chip8_dasm.diff import ChangeKind, StructuralDiff
+
+    old = Disassembler(old_rom)
+    decode(old, cache_dir, no_cache)
+    new = Disassembler(new_rom)
+    decode(new, cache_dir, no_cache)
+
+    structural_diff = StructuralDiff(old, new)
+
+    for line in structural_diff.lines(show_all):
+        click.echo(line)
+
+    counts = ", ".join(
+        f"{structural_diff.count(kind)} {kind.name.lower()}"
+        for kind in (ChangeKind.MODIFIED, ChangeKind.INSERTED, ChangeKind.REMOVED)
+    )
+    click.echo(f"\n{counts}", err=True)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("rom_file", type=click.Path(exists=True))
+@click.argument(
+    "addresses",
+    nargs=-1,
+    callback=lambda ctx, param, values: parse_addresses(values),
+)
+@click.option(
+    "-r",
+    "--register",
+    "names",
+    multiple=True,
+    metavar="REGISTER",
+    help="instructions that define or use REGISTER, such as V3",
+)
+@click.option(
+    "-k",
+    "--kind",
+    type=click.Choice(["jump", "call", "load", "skip", "indirect"]),
+    help="only references of this kind",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROM")
+def xref(
+    rom_file: str,
+    addresses: Tuple[int, ...],
+    names: Tuple[str, ...],
+    kind: Optional[str],
+    cache_dir: Optional[str],
+    no_cache: bool,
+) -> None:
+    """Show cross-references in ROM_FILE.
+
+    Lists the instructions that refer to each of ADDRESSES, given in decimal
+    or with a 0x prefix, and the instructions that define and use each
+    register asked for.
+    """
+
+    from chip8_dasm.xref import CrossReferences, parse_register, XrefKind
+
+    if not addresses and not names:
+        raise click.UsageError("Give at least one address or register")
+
+    try:
+        registers = [parse_register(name) for name in names]
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--register") from error
+
+    dasm = Disassembler(rom_file)
+    decode(dasm, cache_dir, no_cache)
+
+    index = CrossReferences(dasm)
+    selected = None if kind is None else XrefKind[kind.upper()]
+
+    for address in addresses:
+        click.echo(f"\nReferences to 0x{address:04x}:")
+
+        for referrer in index.to(address, selected):
+            show_reference(dasm, referrer)
+
+    for register in registers:
+        for title, found in (("Defined", index.defined), ("Used", index.used)):
+            click.echo(f"\n{title} V{register:X}:")
+
+            for referrer in found(register):
+                show_reference(dasm, referrer)
+
+
+def show_reference(dasm: Disassembler, address: int) -> None:
+    """Print the instruction at an address of a disassembly."""
+
+    click.echo(f"  0x{address:04x}  {dasm.disassembly[address].text}")
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True),
+    default="c8dasm-output",
+    show_default=True,
+    help="write disassemblies to DIRECTORY",
+)
+@click.option("-j", "--jobs", type=click.IntRange(min=1), help="worker processes")
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROMs")
+def batch(
+    directory: str,
+    output_dir: str,
+    jobs: Optional[int],
+    cache_dir: Optional[str],
+    no_cache: bool,
+) -> None:
+    """Disassemble every ROM in DIRECTORY.
+
+    Each ROM is written to its own file under the output directory, along
+    with a summary of the batch.
+    """
+
+    from chip8_dasm.batch import Batch
+    from chip8_dasm.cache import DisassemblyCache
+
+    if not no_cache:
+        cache_dir = cache_dir or DisassemblyCache.default_directory()
+    else:
+        cache_dir = None
+
+    results = Batch(directory, output_dir, jobs, cache_dir).run()
+
+    for result in results:
+        if result.error:
+            click.secho(f"FAILED {result.rom_file}: {result.error}", fg="red")
+        else:
+            click.echo(f"ok     {result.rom_file} -> {result.output_file}")
+
+    failed = sum(1 for result in results if result.error)
+
+    click.echo(f"\n{len(results)} ROMs, {failed} failed")
+
+    if failed:
+        click.get_current_context().exit(1)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--database",
+    type=click.Path(dir_okay=False, writable=True),
+    help="keep the index in FILE",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROMs")
+def index(
+    directory: str, database: Optional[str], cache_dir: Optional[str], no_cache: bool
+) -> None:
+    """Index the code of every ROM in DIRECTORY for searching.
+
+    Only ROMs that are new or have changed since the last time are decoded,
+    and ROMs that have gone are dropped from the index.
+    """
+
+    from chip8_dasm.corpus import CorpusIndex
+
+    corpus = CorpusIndex(database, cache_dir, use_cache=not no_cache)
+    update = corpus.update(directory)
+    corpus.close()
+
+    for rom_file, error in update.errors:
+        click.secho(f"FAILED {rom_file}: {error}", fg="red")
+
+    click.echo(
+        f"{update.added} added, {update.changed} changed, "
+        f"{update.removed} removed, {update.unchanged} unchanged"
+    )
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("pattern", nargs=-1, required=True)
+@click.option(
+    "--database",
+    type=click.Path(dir_okay=False),
+    help="search the index in FILE",
+)
+@click.option("-l", "--limit", type=click.IntRange(min=1), help="show at most N")
+def search(
+    pattern: Tuple[str, ...], database: Optional[str], limit: Optional[int]
+) -> None:
+    """Search the indexed ROMs for a sequence of opcodes.
+
+    PATTERN is one or more opcodes, each four nibbles where X, Y, N or ?
+    match any value, such as 6XNN A??? DXY5.
+    """
+
+    from chip8_dasm.corpus import CorpusIndex
+
+    corpus = CorpusIndex(database)
+
+    try:
+        matches = corpus.search(" ".join(pattern), limit)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="PATTERN") from error
+    finally:
+        corpus.close()
+
+    for match in matches:
+        click.echo(f"{match.rom_file}:0x{match.address:04x}  {match.text}")
+
+    click.echo(f"\n{len(matches)} matches", err=True)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "-t",
+    "--threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=0.8,
+    show_default=True,
+    help="smallest similarity to group ROMs by",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs and their signatures in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="always decode the ROMs")
+def similar(
+    directory: str, threshold: float, cache_dir: Optional[str], no_cache: bool
+) -> None:
+    """Find groups of near-duplicate ROMs in DIRECTORY.
+
+    ROMs are compared by the code they decode to, so patched versions and
+    hacks of a ROM are grouped with it. Each ROM is listed with how similar
+    it is to the first ROM of its group.
+    """
+
+    from chip8_dasm.similarity import Fingerprinter, group
+
+    fingerprinter = Fingerprinter(cache_dir=cache_dir, use_cache=not no_cache)
+    signatures, errors = fingerprinter.fingerprint_all(directory)
+
+    for rom_file, error in errors:
+        click.secho(f"FAILED {rom_file}: {error}", fg="red")
+
+    groups = group(signatures, threshold)
+
+    for members in groups:
+        click.echo()
+
+        for member in members:
+            click.echo(f"{member.similarity:4.0%}  {member.rom_file}")
+
+    click.echo(f"\n{len(signatures)} ROMs, {len(groups)} groups", err=True)
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "-a",
+    "--address",
+    help="Unix socket path, or HOST:PORT to listen on TCP",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=30.0,
+    show_default=True,
+    help="seconds allowed for each request",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="keep decoded ROMs in DIRECTORY",
+)
+@click.option("--no-cache", is_flag=True, help="only keep ROMs in memory")
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False),
+    help="only read ROMs under DIRECTORY",
+)
+def serve(
+    address: Optional[str],
+    timeout: float,
+    cache_dir: Optional[str],
+    no_cache: bool,
+    root: Optional[str],
+) -> None:
+    """Serve disassembly requests until told to stop.
+
+    Decoded ROMs are kept in memory, so repeated requests for the same ROM
+    are answered without decoding it again. Run the disassemble command
+    with --server to use it.
+
+    Any client that can connect can have the server read any file the
+    server can read. This matters most on TCP, where every local user can
+    connect, so use --root to limit requests to a directory of ROMs.
+    """
+
+    from chip8_dasm.client import default_address
+    from chip8_dasm.server import DisassemblyServer
+
+    address = address or default_address()
+
+    click.echo(f"Serving on {address}", err=True)
+    server = DisassemblyServer(
+        address, timeout, cache_dir=cache_dir, use_cache=not no_cache, root=root
+    )
+
+    try:
+        server.run()
+    except OSError as error:
+        raise click.ClickException(str(error)) from error
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("rom_file", type=click.Path(exists=True))
+@click.option("-u", "--unaligned", is_flag=True, help="decode a word at every byte")
+@click.option("-c", "--compare", is_flag=True, help="compare with a traversal")
+def sweep(rom_file: str, unaligned: bool, compare: bool) -> None:
+    """Decode every word of ROM_FILE.
+
+    Reports how often each operation occurs and which regions do not decode
+    to any operation. This requires NumPy.
+    """
+
+    # Importing NumPy is slow, so it is only done for this command.
+    from chip8_dasm.sweep import LinearSweep
+
+    dasm = Disassembler(rom_file)
+
+    try:
+        linear = LinearSweep(dasm.rom_data, unaligned)
+    except ImportError as error:
+        raise click.ClickException(str(error)) from error
+
+    statistics = linear.statistics()
+
+    for name, count in sorted(statistics.items(), key=lambda item: -item[1]):
+        click.echo(f"{name:<8} {count:8}")
+
+    for first, last in linear.unknown_regions():
+        click.echo(f"unknown  0x{first:04x}-0x{last:04x}")
+
+    if compare:
+        dasm.decode()
+
+        for group, addresses in linear.compare(dasm).items():
+            click.echo(f"{group:<15} {len(addresses):8}")
+
+
+def remote(rom_file: str, output: Optional[str]) -> bool:
+    """Disassemble a ROM through a running server, if one can be reached."""
+
+    from chip8_dasm.client import disassemble_remote, ServerError
+
+    try:
+        return disassemble_remote(rom_file, output)
+    except ServerError as error:
+        raise click.ClickException(str(error)) from error
+
+
+def check_options(
+    output: Optional[str], form: str, isa: str, budget: Optional[int]
+) -> None:
+    """Reject options of the disassemble command that cannot go together."""
+
+    if form != "text" and output is None:
+        raise click.UsageError(f"--format {form} needs --output")
+
+    if budget is not None and isa != "chip8":
+        raise click.UsageError("--run only supports the chip8 instruction set")
+
+
+def report(dasm: Disassembler) -> None:
+    """Report the statistics of a disassembly to stderr, if it has any."""
+
+    if dasm.stats is None:
+        return
+
+    dasm.stats.classify(dasm.disassembly)
+
+    for line in dasm.stats.report():
+        click.echo(line, err=True)
+
+
+def execute(dasm: Disassembler, budget: int, keys: str, seed: int) -> None:
+    """Run a ROM and decode the code it was seen to run."""
+
+    from chip8_dasm.machine import Machine, random_keys, scripted_keys
+
+    try:
+        script = random_keys(seed) if keys == "random" else scripted_keys(keys)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--keys") from error
+
+    try:
+        machine = Machine(dasm.rom_data, script, seed)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from error
+
+    steps = machine.run(budget)
+
+    click.echo(f"Ran {steps} instructions", nl=False, err=True)
+    click.echo(f", {machine.halted}" if machine.halted else "", err=True)
+
+    dasm.seed(machine.coverage.executed_addresses(), machine.coverage.jump_targets())
+
+
+def profiled(profile: Optional[str], memory: Optional[str]) -> ContextManager:
+    """Return a context that captures profiles if any are asked for."""
+
+    if profile is None and memory is None:
+        return nullcontext()
+
+    from chip8_dasm.stats import capture
+
+    return capture(profile, memory)
+
 
-    dasm.decode()
+def parse_addresses(values: Tuple[str, ...]) -> Tuple[int, ...]:
+    """Parse addresses given in decimal or with a 0x prefix."""
 
-    writer = Writer(dasm)
-    writer.generate()
+    try:
+        return tuple(int(value, 0) for value in values)
+    except ValueError as error:
+        raise click.BadParameter(f"not an address: {error}") from error
 
 
 def main() -> None:
@@ -0,0 +1,119 @@
+"""Client module for the disassembly server."""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Optional, Tuple, Union
+
+Address = Union[str, Tuple[str, int]]
+
+TIMEOUT = 30.0
+
+
+class ServerError(Exception):
+    """Raised when the server could not carry out a request."""
+
+
+def default_address() -> str:
+    """Return the address of the server when none is given."""
+
+    if "C8DASM_SERVER" in os.environ:
+        return os.environ["C8DASM_SERVER"]
+
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(base, "c8dasm.sock")
+
+
+def parse_address(address: str) -> Address:
+    """
+    Parse the address of a server.
+
+    An address of the form HOST:PORT, or just :PORT for the local host, is a
+    TCP address. Anything else is the path of a Unix domain socket.
+    """
+
+    host, separator, port = address.rpartition(":")
+
+    if separator and port.isdigit() and os.sep not in address:
+        return (host or "127.0.0.1", int(port))
+
+    return address
+
+
+def request(
+    address: str, message: Dict[str, Any], timeout: float = TIMEOUT
+) -> Dict[str, Any]:
+    """
+    Send a request to the server and wait for the response.
+
+    Requests and responses are JSON objects, one per line. Raises OSError
+    when the server cannot be reached.
+    """
+
+    target = parse_address(address)
+    family = socket.AF_INET if isinstance(target, tuple) else socket.AF_UNIX
+
+    with socket.socket(family, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(target)
+        connection.sendall(json.dumps(message).encode() + b"\n")
+
+        with connection.makefile("rb") as stream:
+            line = stream.readline()
+
+    if not line:
+        raise ConnectionError("Server closed the connection without responding")
+
+    response: Dict[str, Any] = json.loads(line)
+
+    return response
+
+
+def disassemble(rom_file: str, address: Optional[str] = None) -> str:
+    """
+    Ask the server for the disassembly of a ROM file.
+
+    Raises OSError when the server cannot be reached, and ServerError when
+    it cannot disassemble the ROM.
+    """
+
+    message = {"command": "disassemble", "rom": os.path.abspath(rom_file)}
+    response = request(address or default_address(), message)
+
+    if not response["ok"]:
+        raise ServerError(response["error"])
+
+    output: str = response["output"]
+
+    return output
+
+
+def disassemble_remote(rom_file: str, output: Optional[str] = None) -> bool:
+    """
+    Disassemble a ROM through a running server, if there is one.
+
+    The disassembly is written to a file, or to standard output. Returns
+    whether the server could be reached. When it cannot, that is reported
+    on standard error and the ROM is left to be disassembled locally.
+    Raises ServerError when the server cannot disassemble the ROM.
+    """
+
+    address = default_address()
+
+    try:
+        text = disassemble(rom_file, address)
+    except OSError as error:
+        sys.stderr.write(f"Server at {address} is not available: {error}\n")
+        return False
+
+    if output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(output, "w") as stream:
+            stream.write(text)
+
+    return True
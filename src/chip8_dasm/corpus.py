@@ -0,0 +1,463 @@
+"""Corpus-wide code search module."""
+
+from functools import reduce
+import hashlib
+from operator import mul
+import os
+from pathlib import Path
+import sqlite3
+import string
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import zlib
+
+from chip8_dasm import __version__
+from chip8_dasm.addresses import AddressSet
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import CHIP8, decode_table, Instruction
+
+# Position of each operation in the instruction set, which is how operations
+# are named in the n-grams of the index.
+SPEC_INDEX = {spec: index for index, spec in enumerate(CHIP8)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS roms (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    data BLOB NOT NULL,
+    code BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram INTEGER NOT NULL,
+    rom INTEGER NOT NULL,
+    address INTEGER NOT NULL,
+    PRIMARY KEY (gram, rom, address)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS grams_rom ON grams (rom);
+"""
+
+Element = Tuple[int, int]
+
+
+class Match(NamedTuple):
+    """Place in a ROM where a pattern was found."""
+
+    rom_file: str
+    address: int
+    text: str
+
+
+class IndexUpdate(NamedTuple):
+    """Outcome of bringing the index up to date with a directory."""
+
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+    errors: Tuple[Tuple[str, str], ...] = ()
+
+
+class IndexedRom(NamedTuple):
+    """ROM data and decoded instruction addresses read back from the index."""
+
+    path: str
+    data: bytes
+    code: bytes
+
+
+class CorpusIndex:
+    """
+    Inverted index of operation n-grams across a corpus of ROMs.
+
+    Each decoded instruction is named by its operation, with its operands
+    left out, so that code which differs only in registers, constants and
+    addresses produces the same n-grams. Runs of instructions at
+    consecutive addresses, as they appear in a listing, are indexed as
+    single operations and as trigrams, each pointing at the ROM and
+    address where it starts.
+
+    A search pattern is a sequence of opcodes in which any nibble can be a
+    wildcard. The index narrows the search down to the places that have
+    the right operations, and only those are checked against the full
+    pattern. The ROM data and decoded addresses are kept in the index too,
+    so a search never decodes a ROM.
+
+    The index is kept in an SQLite database and is updated incrementally.
+    ROMs whose modification time and size are unchanged are not read, and
+    ROMs whose contents are unchanged are not decoded.
+    """
+
+    PATTERN = "*.ch8"
+    GRAM = 3
+    MAX_KEYS = 64
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        database: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+    ):
+        self.database = database or self.default_database()
+        self.cache = DisassemblyCache(cache_dir) if use_cache else None
+
+        Path(self.database).parent.mkdir(parents=True, exist_ok=True)
+
+        self.connection = sqlite3.connect(self.database)
+        self.connection.executescript(SCHEMA)
+        self.check_version()
+
+    @staticmethod
+    def default_database() -> str:
+        """Return the database to use when none is given."""
+
+        return os.path.join(DisassemblyCache.default_directory(), "corpus.sqlite")
+
+    def check_version(self) -> None:
+        """Empty the index if it was built by another version."""
+
+        version = f"{self.FORMAT_VERSION} {__version__}"
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+
+        if row is not None and row[0] == version:
+            return
+
+        with self.connection:
+            self.connection.execute("DELETE FROM grams")
+            self.connection.execute("DELETE FROM roms")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,)
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+
+        self.connection.close()
+
+    def update(self, directory: str) -> IndexUpdate:
+        """
+        Bring the index up to date with the ROMs in a directory.
+
+        New and changed ROMs are indexed, and ROMs that are no longer in the
+        directory are removed from the index. A ROM that cannot be read or
+        decoded is reported as an error without stopping the update.
+        """
+
+        root = Path(directory).resolve()
+        paths = sorted(path for path in root.rglob(self.PATTERN) if path.is_file())
+        counts = {"added": 0, "changed": 0, "unchanged": 0}
+        errors = []
+
+        with self.connection:
+            for path in paths:
+                try:
+                    counts[self.add(str(path))] += 1
+                except (OSError, ValueError) as error:
+                    errors.append((str(path), f"{type(error).__name__}: {error}"))
+
+            removed = self.prune(root, {str(path) for path in paths})
+
+        return IndexUpdate(
+            counts["added"],
+            counts["changed"],
+            removed,
+            counts["unchanged"],
+            tuple(errors),
+        )
+
+    def add(self, path: str) -> str:
+        """
+        Index a single ROM file, unless it is indexed already.
+
+        Returns whether the ROM was "added", "changed" or "unchanged".
+        """
+
+        status = os.stat(path)
+        row = self.connection.execute(
+            "SELECT id, mtime_ns, size, digest FROM roms WHERE path = ?", (path,)
+        ).fetchone()
+
+        if row is not None and (row[1], row[2]) == (status.st_mtime_ns, status.st_size):
+            return "unchanged"
+
+        with open(path, "rb") as file:
+            data = file.read()
+
+        digest = hashlib.sha256(data).hexdigest()
+
+        if row is not None and row[3] == digest:
+            self.connection.execute(
+                "UPDATE roms SET mtime_ns = ?, size = ? WHERE id = ?",
+                (status.st_mtime_ns, status.st_size, row[0]),
+            )
+            return "unchanged"
+
+        dasm = self.decode(data)
+
+        if row is not None:
+            self.connection.execute("DELETE FROM grams WHERE rom = ?", (row[0],))
+            self.connection.execute("DELETE FROM roms WHERE id = ?", (row[0],))
+
+        cursor = self.connection.execute(
+            "INSERT INTO roms (path, mtime_ns, size, digest, data, code) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                status.st_mtime_ns,
+                status.st_size,
+                digest,
+                data,
+                zlib.compress(bytes(AddressSet(dasm.disassembly).bitmap)),
+            ),
+        )
+        rom = cursor.lastrowid
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO grams VALUES (?, ?, ?)",
+            [(gram, rom, address) for gram, address in grams(dasm, self.GRAM)],
+        )
+
+        return "added" if row is None else "changed"
+
+    def prune(self, root: Path, present: set) -> int:
+        """Remove ROMs under a directory that are no longer there."""
+
+        prefix = str(root) + os.sep
+        rows = self.connection.execute(
+            "SELECT id, path FROM roms WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        ).fetchall()
+        removed = [rom for rom, path in rows if path not in present]
+
+        for rom in removed:
+            self.connection.execute("DELETE FROM grams WHERE rom = ?", (rom,))
+            self.connection.execute("DELETE FROM roms WHERE id = ?", (rom,))
+
+        return len(removed)
+
+    def decode(self, data: bytes) -> Disassembler:
+        """Decode a ROM, through the disk cache when there is one."""
+
+        dasm = Disassembler()
+        dasm.rom_data = bytearray(data)
+
+        if self.cache is None:
+            dasm.decode()
+        elif not self.cache.load(dasm):
+            dasm.decode()
+            self.cache.store(dasm)
+
+        return dasm
+
+    def search(self, pattern: str, limit: Optional[int] = None) -> List[Match]:
+        """
+        Find every place in the corpus where a pattern occurs.
+
+        Raises ValueError when the pattern cannot be parsed.
+        """
+
+        elements = parse_pattern(pattern)
+        roms: Dict[int, IndexedRom] = {}
+        matches = []
+
+        for rom, start in self.candidates(elements):
+            if rom not in roms:
+                roms[rom] = self.rom(rom)
+
+            if matches_at(roms[rom], start, elements):
+                matches.append(
+                    Match(roms[rom].path, start, text(roms[rom], start, elements))
+                )
+
+        matches.sort()
+
+        return matches[:limit] if limit is not None else matches
+
+    def candidates(self, elements: Sequence[Element]) -> Iterator[Tuple[int, int]]:
+        """Generate the places where a pattern may start."""
+
+        keys, offset = self.lookup(elements)
+
+        if not keys:
+            return
+
+        query = "SELECT rom, address FROM grams WHERE gram IN ({})".format(
+            ", ".join("?" * len(keys))
+        )
+
+        for rom, address in self.connection.execute(query, keys):
+            yield (rom, address - offset * 2)
+
+    def lookup(self, elements: Sequence[Element]) -> Tuple[List[int], int]:
+        """
+        Choose the n-grams to look a pattern up by, and where they fall.
+
+        Each element of the pattern allows one or more operations, and each
+        window of the pattern the length of an n-gram, as well as each single
+        element, allows every combination of them. The choice with the
+        fewest occurrences in the corpus is taken.
+        """
+
+        allowed = [operations(element) for element in elements]
+        choices = [
+            (gram_keys([operation]), offset) for offset, operation in enumerate(allowed)
+        ]
+
+        for offset, end in enumerate(range(self.GRAM, len(allowed) + 1)):
+            window = allowed[offset:end]
+
+            if reduce(mul, map(len, window)) <= self.MAX_KEYS:
+                choices.append((gram_keys(window), offset))
+
+        return min(choices, key=lambda choice: self.count(choice[0]))
+
+    def count(self, keys: Sequence[int]) -> int:
+        """Return how often any of a set of n-grams occurs in the corpus."""
+
+        if not keys:
+            return 0
+
+        query = "SELECT COUNT(*) FROM grams WHERE gram IN ({})".format(
+            ", ".join("?" * len(keys))
+        )
+
+        return int(self.connection.execute(query, keys).fetchone()[0])
+
+    def rom(self, rom: int) -> IndexedRom:
+        """Read back a ROM from the index."""
+
+        path, data, code = self.connection.execute(
+            "SELECT path, data, code FROM roms WHERE id = ?", (rom,)
+        ).fetchone()
+
+        return IndexedRom(path, data, zlib.decompress(code))
+
+
+def grams(dasm: Disassembler, length: int) -> List[Tuple[int, int]]:
+    """
+    Return the n-grams of a disassembly with the addresses they start at.
+
+    Each instruction is a unigram. Each run of instructions at consecutive
+    addresses also gives an n-gram of the given length at every position.
+    The n-gram is kept as a rolling key, so each instruction costs the same
+    however long the n-grams are. Rows come back sorted, which is the order
+    the index stores them in.
+    """
+
+    rows = []
+    modulus = 64**length
+    window = run = 0
+    expected = None
+    disassembly = dasm.disassembly
+
+    for address in sorted(disassembly):
+        instruction = disassembly[address]
+        digit = SPEC_INDEX[instruction.spec] + 1
+
+        if address != expected:
+            window = run = 0
+
+        window = (window * 64 + digit) % modulus
+        run += 1
+        expected = address + instruction.size
+
+        rows.append((digit, address))
+
+        if run >= length:
+            rows.append((window, address - (length - 1) * 2))
+
+    rows.sort()
+
+    return rows
+
+
+def gram_keys(operations: Sequence[Sequence[int]]) -> List[int]:
+    """Return the keys of every n-gram that a choice of operations can form."""
+
+    keys = [0]
+
+    for choices in operations:
+        keys = [key * 64 + index + 1 for key in keys for index in choices]
+
+    return keys
+
+
+def parse_pattern(pattern: str) -> List[Element]:
+    """
+    Parse a search pattern into the masks and values of its opcodes.
+
+    Opcodes are separated by spaces or semicolons. Each is four nibbles,
+    given as a hex digit or as one of X, Y, N or ? to match any value, so
+    conventional names such as DXYN or 8XY4 can be used as they are.
+    """
+
+    elements = []
+
+    for item in pattern.replace(";", " ").split():
+        if len(item) != 4:
+            raise ValueError(f"Opcode pattern must be four nibbles: {item}")
+
+        mask = value = 0
+
+        for character in item:
+            mask <<= 4
+            value <<= 4
+
+            if character in string.hexdigits:
+                mask |= 0xF
+                value |= int(character, 16)
+            elif character.upper() not in "XYN?":
+                raise ValueError(f"Not a nibble or wildcard: {character}")
+
+        elements.append((mask, value))
+
+    if not elements:
+        raise ValueError("Empty pattern")
+
+    return elements
+
+
+def operations(element: Element) -> List[int]:
+    """Return every operation that opcodes matching an element may decode to."""
+
+    mask, value = element
+
+    return [
+        index
+        for index, spec in enumerate(CHIP8)
+        if (spec.pattern ^ value) & spec.mask & mask == 0
+    ]
+
+
+def matches_at(rom: IndexedRom, start: int, elements: Sequence[Element]) -> bool:
+    """Check whether a pattern matches the decoded code at an address."""
+
+    for position, (mask, value) in enumerate(elements):
+        address = start + position * 2
+        offset = address - Disassembler.STARTING_ADDRESS
+
+        if not 0 <= address < len(rom.code) or not rom.code[address]:
+            return False
+
+        if (rom.data[offset] << 8 | rom.data[offset + 1]) & mask != value:
+            return False
+
+    return True
+
+
+def text(rom: IndexedRom, start: int, elements: Sequence[Element]) -> str:
+    """Render the instructions a pattern matched."""
+
+    table = decode_table()
+    instructions: List[Instruction] = []
+
+    for position in range(len(elements)):
+        offset = start + position * 2 - Disassembler.STARTING_ADDRESS
+        instructions.append(table[rom.data[offset] << 8 | rom.data[offset + 1]])
+
+    return "; ".join(instruction.text for instruction in instructions)
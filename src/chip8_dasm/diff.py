@@ -0,0 +1,415 @@
+"""Structural diff module for the disassembler."""
+
+from difflib import SequenceMatcher
+from enum import IntEnum
+from typing import (
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from chip8_dasm.cfg import BasicBlock, ControlFlowGraph, EdgeKind
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import Instruction
+
+BlockKey = Tuple[int, ...]
+
+
+class ChangeKind(IntEnum):
+    """The way a routine or a block differs between two ROMs."""
+
+    UNCHANGED = 0
+    MOVED = 1
+    MODIFIED = 2
+    INSERTED = 3
+    REMOVED = 4
+
+
+SYMBOLS = {
+    ChangeKind.UNCHANGED: "=",
+    ChangeKind.MOVED: ">",
+    ChangeKind.MODIFIED: "~",
+    ChangeKind.INSERTED: "+",
+    ChangeKind.REMOVED: "-",
+}
+
+
+class Routine(NamedTuple):
+    """
+    Code reached from the entry point or from the target of a call.
+
+    The blocks are in depth first order from the start of the routine, which
+    does not depend on where the routine is in the ROM. The shape pairs the
+    key of each block with the positions of its successors in that order, so
+    routines with equal shapes have the same code and the same structure.
+    """
+
+    start: int
+    blocks: List[BasicBlock]
+    keys: List[BlockKey]
+    shape: Tuple[Hashable, ...]
+
+    @property
+    def size(self) -> int:
+        """Return the number of instructions in the routine."""
+
+        return sum(len(block) for block in self.blocks)
+
+
+class BlockChange(NamedTuple):
+    """Difference between the blocks of two matched routines."""
+
+    kind: ChangeKind
+    old: Optional[BasicBlock]
+    new: Optional[BasicBlock]
+
+
+class RoutineChange(NamedTuple):
+    """Difference between the routines of two ROMs."""
+
+    kind: ChangeKind
+    old: Optional[Routine]
+    new: Optional[Routine]
+    blocks: Tuple[BlockChange, ...] = ()
+
+
+class StructuralDiff:
+    """
+    Alignment of the routines and basic blocks of two disassemblies.
+
+    Instructions are compared with the addresses they refer to cleared, so
+    code that has only moved compares equal. Routines with the same shape
+    are matched first. The rest are matched by how many blocks they share,
+    found through an index of block keys, and finally by their address.
+    Each step is linear in the size of the ROMs, apart from aligning the
+    blocks of routines that were modified.
+    """
+
+    MAX_SHARING = 16
+
+    def __init__(self, old: Disassembler, new: Disassembler):
+        self.old = routines(ControlFlowGraph(old))
+        self.new = routines(ControlFlowGraph(new))
+        self.changes: List[RoutineChange] = []
+
+        self.align()
+
+    def align(self) -> None:
+        """Match the routines of the two ROMs and find how they differ."""
+
+        pairs = self.match_shapes(self.old, self.new)
+        old = [routine for routine in self.old if routine.start not in pairs]
+        matched = set(pairs.values())
+        new = [routine for routine in self.new if routine.start not in matched]
+
+        similar = self.match_blocks(old, new)
+        similar.update(self.match_addresses(old, new, similar))
+        pairs.update(similar)
+
+        by_start = {routine.start: routine for routine in self.new}
+
+        for routine in self.old:
+            if routine.start not in pairs:
+                self.changes.append(RoutineChange(ChangeKind.REMOVED, routine, None))
+                continue
+
+            other = by_start[pairs[routine.start]]
+
+            if routine.shape == other.shape:
+                kind = ChangeKind.UNCHANGED
+                if routine.start != other.start:
+                    kind = ChangeKind.MOVED
+                self.changes.append(RoutineChange(kind, routine, other))
+            else:
+                self.changes.append(
+                    RoutineChange(
+                        ChangeKind.MODIFIED,
+                        routine,
+                        other,
+                        align_blocks(routine, other),
+                    )
+                )
+
+        matched = set(pairs.values())
+
+        for routine in self.new:
+            if routine.start not in matched:
+                self.changes.append(RoutineChange(ChangeKind.INSERTED, None, routine))
+
+    @staticmethod
+    def match_shapes(old: List[Routine], new: List[Routine]) -> Dict[int, int]:
+        """Pair routines with equal shapes, in the order of their addresses."""
+
+        shapes: Dict[Tuple[Hashable, ...], List[int]] = {}
+
+        for routine in reversed(new):
+            shapes.setdefault(routine.shape, []).append(routine.start)
+
+        pairs = {}
+
+        for routine in old:
+            starts = shapes.get(routine.shape)
+
+            if starts:
+                pairs[routine.start] = starts.pop()
+
+        return pairs
+
+    def match_blocks(self, old: List[Routine], new: List[Routine]) -> Dict[int, int]:
+        """
+        Pair routines by the number of block keys they share.
+
+        Keys that are in many routines, such as a lone return, say little
+        about which routines belong together and are left out.
+        """
+
+        owners: Dict[BlockKey, Set[int]] = {}
+
+        for routine in new:
+            for key in routine.keys:
+                owners.setdefault(key, set()).add(routine.start)
+
+        scores = []
+
+        for routine in old:
+            counts: Dict[int, int] = {}
+
+            for key in set(routine.keys):
+                starts = owners.get(key, ())
+
+                if len(starts) <= self.MAX_SHARING:
+                    for start in starts:
+                        counts[start] = counts.get(start, 0) + 1
+
+            for start, count in counts.items():
+                distance = abs(start - routine.start)
+                scores.append((-count, distance, routine.start, start))
+
+        pairs: Dict[int, int] = {}
+        taken: Set[int] = set()
+
+        for _, _, old_start, new_start in sorted(scores):
+            if old_start not in pairs and new_start not in taken:
+                pairs[old_start] = new_start
+                taken.add(new_start)
+
+        return pairs
+
+    @staticmethod
+    def match_addresses(
+        old: List[Routine], new: List[Routine], pairs: Dict[int, int]
+    ) -> Dict[int, int]:
+        """Pair the routines left over that start at the same address."""
+
+        taken = set(pairs.values())
+        free = {routine.start for routine in new if routine.start not in taken}
+
+        return {
+            routine.start: routine.start
+            for routine in old
+            if routine.start not in pairs and routine.start in free
+        }
+
+    def count(self, kind: ChangeKind) -> int:
+        """Return how many routines changed in a given way."""
+
+        return sum(1 for change in self.changes if change.kind is kind)
+
+    def lines(self, unchanged: bool = False) -> Iterator[str]:
+        """
+        Generate a report of the changes, a line at a time.
+
+        Routines that have not changed, or have only moved, are left out
+        unless asked for.
+        """
+
+        for change in self.changes:
+            if change.kind <= ChangeKind.MOVED and not unchanged:
+                continue
+
+            yield routine_line(change)
+
+            for block in change.blocks:
+                if block.kind is not ChangeKind.UNCHANGED:
+                    yield block_line(block)
+
+
+def routines(cfg: ControlFlowGraph) -> List[Routine]:
+    """
+    Split a control flow graph into routines.
+
+    Routines start at the entry point and at the targets of calls. Each
+    block belongs to a single routine, so a routine ends where it runs into
+    the start of another one or into blocks an earlier routine has taken.
+    Blocks that no routine reaches, such as code only reached by BNNN, start
+    routines of their own.
+    """
+
+    starts = {cfg.entry} if cfg.entry in cfg.blocks else set()
+
+    for edges in cfg.successors.values():
+        starts.update(edge.target for edge in edges if edge.kind is EdgeKind.CALL)
+
+    claimed = set(starts)
+    result = [walk(cfg, start, claimed) for start in sorted(starts)]
+
+    for start in sorted(cfg.blocks):
+        if start not in claimed:
+            claimed.add(start)
+            result.append(walk(cfg, start, claimed))
+
+    result.sort(key=lambda routine: routine.start)
+
+    return result
+
+
+def walk(cfg: ControlFlowGraph, start: int, claimed: Set[int]) -> Routine:
+    """
+    Collect the blocks of the routine at an address, in depth first order.
+
+    The blocks are added to those claimed, and blocks claimed already are
+    left out.
+    """
+
+    order: List[int] = []
+    positions: Dict[int, int] = {}
+    pending = [start]
+
+    while pending:
+        address = pending.pop()
+
+        if address in positions or (address in claimed and address != start):
+            continue
+
+        positions[address] = len(order)
+        order.append(address)
+        claimed.add(address)
+
+        edges = cfg.successors[address]
+        pending.extend(
+            edge.target for edge in reversed(edges) if edge.kind is not EdgeKind.CALL
+        )
+
+    blocks = [cfg.blocks[address] for address in order]
+    keys = [block_key(block) for block in blocks]
+    shape = tuple(
+        (
+            key,
+            tuple(
+                positions.get(edge.target, -1)
+                for edge in cfg.successors[block.start]
+                if edge.kind is not EdgeKind.CALL
+            ),
+        )
+        for key, block in zip(keys, blocks)
+    )
+
+    return Routine(start, blocks, keys, shape)
+
+
+def block_key(block: BasicBlock) -> BlockKey:
+    """Return the opcodes of a block, with the addresses they refer to cleared."""
+
+    return tuple(normalize(instruction) for instruction in block.instructions)
+
+
+def normalize(instruction: Instruction) -> int:
+    """Return the opcode of an instruction without its target address."""
+
+    if instruction.size == 4:
+        return instruction.opcode & 0xFFFF0000
+
+    if instruction.target is not None:
+        return instruction.opcode & 0xF000
+
+    return instruction.opcode
+
+
+def align_blocks(old: Routine, new: Routine) -> Tuple[BlockChange, ...]:
+    """
+    Align the blocks of two versions of a routine.
+
+    Runs of blocks that were replaced are paired up in order as modified
+    blocks, and whatever is left over is removed or inserted.
+    """
+
+    matcher = SequenceMatcher(None, old.keys, new.keys, autojunk=False)
+    changes: List[BlockChange] = []
+
+    for tag, old_first, old_end, new_first, new_end in matcher.get_opcodes():
+        old_blocks = old.blocks[old_first:old_end]
+        new_blocks = new.blocks[new_first:new_end]
+
+        if tag == "equal":
+            changes.extend(
+                BlockChange(ChangeKind.UNCHANGED, first, second)
+                for first, second in zip(old_blocks, new_blocks)
+            )
+            continue
+
+        paired = min(len(old_blocks), len(new_blocks))
+        changes.extend(
+            BlockChange(ChangeKind.MODIFIED, first, second)
+            for first, second in zip(old_blocks, new_blocks)
+        )
+        changes.extend(
+            BlockChange(ChangeKind.REMOVED, block, None)
+            for block in old_blocks[paired:]
+        )
+        changes.extend(
+            BlockChange(ChangeKind.INSERTED, None, block)
+            for block in new_blocks[paired:]
+        )
+
+    return tuple(changes)
+
+
+def routine_line(change: RoutineChange) -> str:
+    """Describe how a routine changed."""
+
+    symbol = SYMBOLS[change.kind]
+    name = change.kind.name.lower()
+
+    if change.old is None:
+        assert change.new is not None
+        return f"{symbol} {name:<9} 0x{change.new.start:04x}{summary(change.new)}"
+
+    if change.new is None:
+        return f"{symbol} {name:<9} 0x{change.old.start:04x}{summary(change.old)}"
+
+    text = f"{symbol} {name:<9} 0x{change.old.start:04x} -> 0x{change.new.start:04x}"
+
+    if change.blocks:
+        changed = sum(
+            1 for block in change.blocks if block.kind is not ChangeKind.UNCHANGED
+        )
+        text += f"  ({changed} of {len(change.blocks)} blocks)"
+
+    return text
+
+
+def block_line(change: BlockChange) -> str:
+    """Describe how a block of a modified routine changed."""
+
+    block = change.new if change.new is not None else change.old
+    assert block is not None
+
+    if change.old is not None and change.new is not None:
+        where = f"0x{change.old.start:04x} -> 0x{change.new.start:04x}"
+    else:
+        where = f"0x{block.start:04x}"
+
+    text = "; ".join(instruction.text for instruction in block.instructions)
+
+    return f"    {SYMBOLS[change.kind]} {where}  {text}"
+
+
+def summary(routine: Routine) -> str:
+    """Describe the size of a routine."""
+
+    return f"  ({len(routine.blocks)} blocks, {routine.size} instructions)"
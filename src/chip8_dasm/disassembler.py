@@ -1,232 +1,508 @@
 """Core disassembly module."""
 
-from typing import Dict, List, Tuple, Union
-
-from chip8_dasm.insight import Insight
-from chip8_dasm.loader import Loader
-import click
+from collections import deque
+from itertools import chain
+import time
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+)
+
+from chip8_dasm.addresses import AddressSet
+from chip8_dasm.instructions import Flow, Instruction, INSTRUCTION_SETS
+from chip8_dasm.loader import Loader, RomData
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chip8_dasm.insight import Insight
+    from chip8_dasm.stats import Stats
+    from chip8_dasm.trace import Tracer
 
 
 class Disassembler:
     """Reads the binary data from a ROM file."""
 
     STARTING_ADDRESS = 0x200
+    TRAVERSAL_ORDERS = ("dfs", "bfs")
+    FALLTHROUGH = (Flow.NEXT, Flow.SKIP, Flow.CALL)
+
+    def __init__(
+        self,
+        rom_file: Optional[str] = None,
+        display_insight: bool = False,
+        traversal: str = "dfs",
+        tracer: Optional["Tracer"] = None,
+        mapped: bool = False,
+        stats: Optional["Stats"] = None,
+        insight: Optional["Insight"] = None,
+        isa: str = "chip8",
+    ):
+        if traversal not in self.TRAVERSAL_ORDERS:
+            raise ValueError(f"Unknown traversal order: {traversal}")
+
+        if isa not in INSTRUCTION_SETS:
+            raise ValueError(f"Unknown instruction set: {isa}")
 
-    def __init__(self, rom_file: str = None, display_insight: bool = False):
         self.rom_file = rom_file
-        self.insight = None
-        self.disassembly: Dict[int, str] = {}
-        self.all_contexts: List[int] = []
-        self.labels: List[int] = []
-        self.current_contexts: List[int] = []
-        self.opcodes = {
-            0x1000: "JP lbl_0x{:04x}",
-            0x3000: "SE V{}, 0x{:02x}",
-            0x6000: "LD V{}, 0x{:02x}",
-            0xA000: "LD I, lbl_0x{:04x}",
-            0xD000: "DRW V{}, V{}, 0x{:02x}",
-        }
-
-        if display_insight is True:
+        self.insight = insight
+        self.traversal = traversal
+        self.tracer = tracer
+        self.stats = stats
+        self.isa = INSTRUCTION_SETS[isa]
+        self.disassembly: Dict[int, Instruction] = {}
+        self.all_contexts = AddressSet(size=self.isa.memory_size)
+        self.labels = AddressSet(size=self.isa.memory_size)
+        self.current_contexts: Deque[int] = deque()
+        self.visited = AddressSet(size=self.isa.memory_size)
+        self.references: Dict[int, Set[int]] = {}
+        self.entry: Optional[int] = None
+        self.table = self.isa.table
+        self.long = self.isa.long
+
+        if display_insight is True and insight is None:
+            from chip8_dasm.insight import Insight
+
             self.insight = Insight()
 
+        self.rom_data: RomData = bytearray()
+
         if rom_file is not None:
-            self.rom_data = Loader.load(rom_file)
+            started = time.perf_counter()
+            self.rom_data = Loader.map(rom_file) if mapped else Loader.load(rom_file)
+
+            if self.stats is not None:
+                self.stats.record("load", time.perf_counter() - started)
 
         self.current_address = self.STARTING_ADDRESS
 
-    def decode(self, address: int = None) -> None:
-        """Process opcodes in ROM file."""
+    def decode(self, address: Optional[int] = None) -> None:
+        """
+        Process opcodes in ROM file.
 
-        self.current_address = address if address else self.STARTING_ADDRESS
-        context_change = False
+        Decoding is driven by an explicit worklist of contexts rather than by
+        recursion, so the number of contexts a ROM can have is not bounded by
+        the interpreter stack. Contexts are taken from the end of the worklist
+        for depth-first order and from the front for breadth-first order.
+        """
 
-        while not context_change:
-            if self.current_address - self.STARTING_ADDRESS + 1 > len(self.rom_data):
-                self.context_change = True
-                break
+        start = address if address is not None else self.STARTING_ADDRESS
+
+        if self.entry is None:
+            self.entry = start
+
+        self.add_context(start)
+        self.traverse()
+
+    def seed(self, addresses: Iterable[int], targets: Iterable[int] = ()) -> None:
+        """
+        Decode from addresses known to hold code, such as ones seen to run.
+
+        Static traversal cannot follow computed jumps, so code that is only
+        reached through them is missed. Each address that has not been
+        decoded yet starts a new context, and each target is labelled.
+        """
+
+        for target in targets:
+            self.add_label(target)
+
+        for address in addresses:
+            if address not in self.visited:
+                self.add_context(address)
+
+        self.traverse()
+
+    def traverse(self) -> None:
+        """Decode contexts until the worklist is empty."""
+
+        take = (
+            self.current_contexts.pop
+            if self.traversal == "dfs"
+            else self.current_contexts.popleft
+        )
+
+        if self.stats is not None:
+            self.traverse_measured(take, self.stats)
+            return
+
+        while self.current_contexts:
+            self.decode_context(take())
+
+    def traverse_measured(self, take: Callable[[], int], stats: "Stats") -> None:
+        """Decode contexts until the worklist is empty, timing each of them."""
+
+        decoded = len(self.disassembly)
+        labels = len(self.labels)
+
+        with stats.timer("decode"):
+            while self.current_contexts:
+                started = time.perf_counter()
+                self.decode_context(take())
+                stats.record("context", time.perf_counter() - started)
+
+        stats.count("instructions", len(self.disassembly) - decoded)
+        stats.count("labels", len(self.labels) - labels)
+
+    def decode_context(self, address: int) -> None:
+        """
+        Process opcodes in a single context.
+
+        A context is decoded linearly until an operation changes the flow of
+        control, the end of the ROM is reached, or an address that has already
+        been decoded is reached. Opcodes are read as words from views of the
+        ROM data at even and odd alignment, and each word is decoded with a
+        single lookup in the decode table.
+        """
+
+        self.current_address = address
 
-            print(
-                f"Current Address: {self.current_address} ({hex(self.current_address)})"
+        if self.tracer:
+            self.tracer.context(
+                address, self.all_contexts, self.current_contexts, self.labels
             )
 
-            opcode = self.read_opcode()
-            assert isinstance(opcode, int)
+        table = self.table.native()
+        words = (Loader.words(self.rom_data, 0), Loader.words(self.rom_data, 1))
+        start = self.STARTING_ADDRESS
+        end = start + len(self.rom_data) - 1
+        long = self.long
 
-            operation = self.read_operation(opcode)
-            assert isinstance(operation, int)
+        while start <= address < end:
+            offset = address - start
+            instruction = table[words[offset & 1][offset >> 1]]
 
-            if self.insight:
-                self.insight.execution_context(opcode, operation)
+            if long and instruction.size == 4:
+                if address + 3 > end:
+                    break
 
-            if operation == 0x1000:
-                # 1NNN: Jumps to address NNN.
-                # This jump doesn't remember its origin, so no stack interaction
-                # is required. However, it is worth having this recognized as a
-                # context change with a label.
-                context_change = True
+                instruction = self.widen(offset, instruction)
 
-                address = self.read_address(opcode)
-                assert isinstance(address, int)
+            if not self.visited.add(address):
+                break
 
-                self.add_to_disassembly(operation, address)
-                self.add_label(address)
-                self.add_context(address)
+            self.current_address = address
 
-            elif operation == 0x3000:
-                # 3XNN: Skips the next instruction if VX equals NN.
+            if self.insight is not None:
+                self.explain(instruction)
 
-                vx = self.read_vx(opcode)
-                byte = self.read_byte(opcode)
-                self.add_to_disassembly(operation, vx, byte)
+            context_change = self.decode_instruction(instruction)
 
-                next_address = self.current_address + 4
-                self.add_context(next_address)
+            if self.tracer:
+                self.tracer.instruction(
+                    self.current_address,
+                    self.all_contexts,
+                    self.current_contexts,
+                    self.labels,
+                )
 
-            elif operation == 0x6000:
-                # 6XNN: Sets VX to NN.
-                vx = self.read_vx(opcode)
-                byte = self.read_byte(opcode)
-                self.add_to_disassembly(operation, vx, byte)
+            if context_change:
+                break
 
-            elif operation == 0xA000:
-                # ANNN: Sets I to the address NNN.
-                address = self.read_address(opcode)
-                assert isinstance(address, int)
+            address += instruction.size
 
-                self.add_to_disassembly(operation, address)
-                self.add_label(address)
+    def widen(self, offset: int, prefix: Instruction) -> Instruction:
+        """Decode a four byte instruction from the first word of it."""
+
+        rom_data = self.rom_data
+
+        return self.table.wide(prefix, rom_data[offset + 2] << 8 | rom_data[offset + 3])
+
+    def skip_target(self, address: int) -> int:
+        """
+        Return where a skip at an address carries on when it skips.
+
+        A skip passes over the whole of the next instruction, which is four
+        bytes long when it is the long form of LD I on XO-CHIP.
+        """
 
-            elif operation == 0xD000:
-                # DXYN: Draws a sprite at coordinate (VX, VY).
-                vx = self.read_vx(opcode)
-                vy = self.read_vy(opcode)
-                nibble = opcode & 0xF  # 15
-                self.add_to_disassembly(operation, vx, vy, nibble)
-            else:
-                print("Unknown opcode: 0x{:04x}".format(opcode))
-                context_change = True
+        if self.long:
+            offset = address + 2 - self.STARTING_ADDRESS
+            rom_data = self.rom_data
 
-            self.current_address += 2
+            if 0 <= offset < len(rom_data) - 1:
+                word = rom_data[offset] << 8 | rom_data[offset + 1]
 
-            print(f"\nAll Contexts: {self.all_contexts}")
-            print(f"Current Contexts: {self.current_contexts}")
-            print(f"Labels: {self.labels}\n")
+                if self.table[word].size == 4:
+                    return address + 6
 
-        if len(self.current_contexts) > 0:
-            self.decode(self.current_contexts.pop())
+        return address + 4
 
-    def add_to_disassembly(
-        self, operation: int, *args: Union[int, Tuple[int, ...]]
-    ) -> None:
+    def decode_instruction(self, instruction: Instruction) -> bool:
         """
-        Write disassembly data.
+        Process a single instruction at the current address.
 
-        Information regarding the current address and the operation found at
-        that address is written to a data structure.
+        Returns whether the instruction changes the context of the
+        disassembly. Jumps end a context and start a new one at their target.
+        Calls start a new context at their target but, as the routine is
+        expected to return, decoding carries on after them. Skips may pass
+        over the next instruction, so the one after that is a new context.
         """
 
-        try:
-            self.disassembly[self.current_address] = self.opcodes[operation].format(
-                *args
-            )
-        except KeyError as key_error:
-            click.secho(
-                f"\nThe key '{hex(key_error.args[0])}' is not "
-                "part of the opcode dictionary.\n",
-                fg="red",
-                bold=True,
-            )
+        flow = instruction.flow
+
+        if flow is Flow.INVALID:
+            if self.tracer:
+                self.tracer.unknown(self.current_address, instruction.opcode)
+
+            return True
+
+        self.disassembly[self.current_address] = instruction
+
+        target = instruction.target
+
+        if target is not None or flow is Flow.SKIP:
+            self.add_references(self.current_address, instruction)
+
+        if target is not None:
+            self.add_label(target)
+
+        if flow is Flow.NEXT:
+            return False
+
+        if flow is Flow.SKIP:
+            self.add_context(self.skip_target(self.current_address))
+            return False
+
+        if flow is Flow.CALL or flow is Flow.JUMP:
+            assert target is not None
+            self.add_context(target)
+
+        return flow is not Flow.CALL
+
+    def explain(self, instruction: Instruction) -> None:
+        """Provide insight into how an instruction was decoded."""
+
+        assert self.insight is not None
+
+        self.insight.record(self.current_address, instruction)
 
     def add_context(self, address: int) -> None:
         """
-        Add an address context to a list of contexts.
+        Add an address context to the set of contexts.
 
-        The focus here is that each jump or call to a routine
+        The focus here is that each jump or call to a routine, as well as the
+        instruction following a skip, is a place where decoding has to start
+        again. New contexts are queued on the worklist used by decode.
         """
 
-        if address not in self.all_contexts:
+        if self.all_contexts.add(address):
             self.current_contexts.append(address)
-            self.all_contexts.append(address)
 
-    def add_label(self, address: int) -> None:
+    def add_references(self, address: int, instruction: Instruction) -> None:
+        """Record the addresses that an instruction refers to."""
+
+        for reference in self.referenced(address, instruction):
+            self.references.setdefault(reference, set()).add(address)
+
+    def referenced(self, address: int, instruction: Instruction) -> List[int]:
         """
-        Add label to the disassembled operation.
+        Return the addresses that an instruction refers to.
 
-        Any operation that leads to a jump or a call, and thus a context
-        change, can be provided a label that shows what address is being
-        referenced.
+        These are the address an instruction labels, if any, and the address
+        after the instruction a skip may pass over.
         """
 
-        self.labels.append(address)
+        result = []
+
+        if instruction.target is not None:
+            result.append(instruction.target)
+
+        if instruction.flow is Flow.SKIP:
+            result.append(self.skip_target(address))
 
-    def read_opcode(self) -> int:
+        return result
+
+    def patch(self, address: int, data: bytes) -> None:
         """
-        Read individual opcode from binary data.
+        Change bytes of the ROM and update the disassembly to match.
 
-        Each opcode is two bytes and so has to be read in as a word.
+        Only instructions that overlap the changed bytes are decoded again,
+        followed by whatever code they now lead to. Code that can no longer
+        be reached is removed, along with the labels and contexts it
+        contributed. Everything else is kept as it was.
         """
 
-        offset = self.current_address - self.STARTING_ADDRESS
+        offset = address - self.STARTING_ADDRESS
+        end = offset + len(data)
+
+        if offset < 0 or end > len(self.rom_data):
+            raise ValueError("Patch does not fit within the ROM")
+
+        if not isinstance(self.rom_data, bytearray):
+            self.rom_data = bytearray(self.rom_data)
 
-        if self.insight:
-            self.insight.opcode(self.rom_data, offset)
+        self.rom_data[offset:end] = data
 
-        return self.rom_data[offset] << 8 | self.rom_data[offset + 1]
+        first = address - 3 if self.long else address - 1
+        stale = [
+            start
+            for start in range(first, address + len(data))
+            if start in self.visited
+        ]
 
-    def read_operation(self, opcode: int) -> int:
+        affected = self.remove(stale)
+
+        for start in stale:
+            if start == self.entry or any(self.jumps_into(start)):
+                self.add_context(start)
+            elif any(self.falls_into(start)):
+                self.current_contexts.append(start)
+
+        self.traverse()
+        self.remove(self.unreachable(affected))
+
+    def remove(self, addresses: Iterable[int]) -> Set[int]:
         """
-        Read the upper nibble / msb of an opcode.
+        Remove decoded instructions from the disassembly.
 
-        An opocde encodes an operation and relevant data into a number. The
-        most significant byte, or upper nibble, contains the operation.
+        The labels and contexts that only these instructions referred to are
+        removed with them. Returns the addresses the instructions led to.
         """
 
-        if self.insight:
-            self.insight.operation(opcode)
+        affected = set()
+
+        for address in addresses:
+            self.visited.discard(address)
+            self.all_contexts.discard(address)
+
+            instruction = self.disassembly.pop(address, None)
+
+            if instruction is None:
+                continue
+
+            for reference in self.referenced(address, instruction):
+                self.remove_reference(reference, address)
 
-        return opcode & 0xF000
+            affected.update(self.successors(address, instruction))
 
-    def read_address(self, opcode: int) -> int:
-        """Read an individual address from the opcode."""
+        return affected
 
-        if self.insight:
-            self.insight.address(opcode)
+    def remove_reference(self, reference: int, address: int) -> None:
+        """Forget that an instruction refers to an address."""
 
-        return opcode & 0xFFF
+        referrers = self.references.get(reference, set())
+        referrers.discard(address)
 
-    def read_byte(self, opcode: int) -> int:
-        """Read an individual set of 8 bits."""
+        if not referrers:
+            self.references.pop(reference, None)
 
-        # 0xff = 255
+        if not any(self.disassembly[item].target == reference for item in referrers):
+            self.labels.discard(reference)
 
-        return opcode & 0xFF
+        if reference != self.entry and not any(self.jumps_into(reference)):
+            self.all_contexts.discard(reference)
 
-    def read_vx(self, opcode: int) -> int:
+    def unreachable(self, addresses: Iterable[int]) -> List[int]:
         """
-        Read the value from a register.
+        Find decoded code that can no longer be reached from the addresses.
 
-        The CHIP-8 has a series of 8-bit registers that arereferred to as Vx
-        and Vy, where x or y is a hexadecimal digit.
+        The region of code the addresses lead to is collected first. Any part
+        of the region that is entered from outside of it, or that is the
+        entry point, is still reachable, as is everything it leads to. The
+        rest of the region is unreachable, even where it refers to itself.
         """
 
-        if self.insight:
-            self.insight.vx(opcode)
+        region: Set[int] = set()
+        pending = list(addresses)
 
-        return (opcode & 0xF00) >> 8
+        while pending:
+            address = pending.pop()
 
-    def read_vy(self, opcode: int) -> int:
-        """
-        Read the value from a register.
+            if address in region or address not in self.visited:
+                continue
+
+            region.add(address)
+            pending.extend(self.successors(address))
+
+        pending = [address for address in region if self.entered(address, region)]
+        reachable = set(pending)
+
+        while pending:
+            for successor in self.successors(pending.pop()):
+                if successor in region and successor not in reachable:
+                    reachable.add(successor)
+                    pending.append(successor)
+
+        return sorted(region - reachable)
+
+    def entered(self, address: int, region: Set[int]) -> bool:
+        """Report whether an address is reached from outside of a region."""
 
-        The CHIP-8 has a series of 8-bit registers that arereferred to as Vx
-        and Vy, where x or y is a hexadecimal digit.
+        if address == self.entry:
+            return True
+
+        for item in chain(self.jumps_into(address), self.falls_into(address)):
+            if item not in region:
+                return True
+
+        return False
+
+    def successors(
+        self, address: int, instruction: Optional[Instruction] = None
+    ) -> List[int]:
+        """Return the addresses that decoding continues at after an address."""
+
+        if instruction is None:
+            instruction = self.disassembly.get(address)
+
+            if instruction is None:
+                return []
+
+        result = self.branches(address, instruction)
+
+        if instruction.flow in self.FALLTHROUGH:
+            result.append(address + instruction.size)
+
+        return result
+
+    def branches(self, address: int, instruction: Instruction) -> List[int]:
+        """Return the contexts that an instruction starts."""
+
+        flow = instruction.flow
+
+        if flow is Flow.SKIP:
+            return [self.skip_target(address)]
+
+        if flow is Flow.JUMP or flow is Flow.CALL:
+            assert instruction.target is not None
+            return [instruction.target]
+
+        return []
+
+    def jumps_into(self, address: int) -> Iterator[int]:
+        """Generate the addresses of decoded jumps, calls and skips to an address."""
+
+        for referrer in self.references.get(address, ()):
+            if address in self.branches(referrer, self.disassembly[referrer]):
+                yield referrer
+
+    def falls_into(self, address: int) -> Iterator[int]:
+        """Generate the address of a decoded instruction that runs into an address."""
+
+        for previous in (address - 2, address - 4):
+            instruction = self.disassembly.get(previous)
+
+            if instruction is None or instruction.flow not in self.FALLTHROUGH:
+                continue
+
+            if previous + instruction.size == address:
+                yield previous
+
+    def add_label(self, address: int) -> None:
         """
+        Add label to the disassembled operation.
 
-        if self.insight:
-            self.insight.vy(opcode)
+        Any operation that leads to a jump or a call, and thus a context
+        change, can be provided a label that shows what address is being
+        referenced. Each address is labelled once.
+        """
 
-        return (opcode & 0xF0) >> 4
+        self.labels.add(address)
 
     def seed_rom_data(self, rom_data: list) -> None:
         """Seed ROM data.
@@ -0,0 +1,381 @@
+"""Machine-readable output formats for disassemblies."""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import sqlite3
+import struct
+from typing import BinaryIO, Dict, Iterator, NamedTuple, TextIO, Tuple, Type
+
+from chip8_dasm import __version__
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.regions import Region
+from chip8_dasm.writer import Entry, Writer
+from chip8_dasm.xref import CrossReferences
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE listing (
+    address INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    bytes BLOB NOT NULL,
+    opcode INTEGER,
+    mnemonic TEXT,
+    text TEXT,
+    target INTEGER
+);
+CREATE TABLE labels (address INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE xrefs (
+    target INTEGER NOT NULL,
+    source INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (target, source)
+) WITHOUT ROWID;
+CREATE INDEX xrefs_source ON xrefs (source);
+"""
+
+
+class BinaryRecord(NamedTuple):
+    """Line of a listing read back from the binary format."""
+
+    address: int
+    region: Region
+    labelled: bool
+    data: bytes
+
+
+class Exporter(ABC):
+    """
+    Writes a disassembly to a file in a format meant for other programs.
+
+    Exporters walk the same entries as the text listing, so each record
+    matches a line of it: an instruction, or a run of bytes that are not
+    instructions, split where the region changes or a label falls.
+    """
+
+    BATCH_SIZE = 1024
+
+    def __init__(self, dasm: Disassembler):
+        self.dasm = dasm
+        self.writer = Writer(dasm)
+
+    @abstractmethod
+    def export(self, path: str) -> None:
+        """Write the disassembly to a file, replacing what it held."""
+
+    def kind(self, entry: Entry) -> str:
+        """Return whether an entry is code, data or unknown."""
+
+        if entry.instruction is not None:
+            return "code"
+
+        assert self.writer.regions is not None
+        return Region(self.writer.regions.kinds[entry.address]).name.lower()
+
+    def data(self, entry: Entry) -> bytes:
+        """Return the bytes of the ROM that an entry covers."""
+
+        start = self.writer.STARTING_ADDRESS
+        first = entry.address - start
+        last = entry.end - start
+
+        return bytes(self.dasm.rom_data[first:last])
+
+
+class JsonLinesExporter(Exporter):
+    """
+    Writes a JSON object per line of the listing.
+
+    Instructions carry their opcode, text and target, and other runs of
+    bytes carry the bytes in hex. Objects are written in batches as they
+    are made, so the whole export is never held in memory.
+    """
+
+    CODE_LINE = '{{"address": {}, "kind": "code", "label": {}, {}}}\n'
+    DATA_LINE = '{{"address": {}, "kind": "{}", "label": {}, "bytes": "{}"}}\n'
+
+    def export(self, path: str) -> None:
+        """Write the disassembly to a JSON Lines file."""
+
+        with open(path, "w") as stream:
+            self.write(stream)
+
+    def write(self, stream: TextIO) -> None:
+        """Write JSON Lines to a text stream."""
+
+        batch = []
+
+        for line in self.lines():
+            batch.append(line)
+
+            if len(batch) == self.BATCH_SIZE:
+                stream.write("".join(batch))
+                batch.clear()
+
+        stream.write("".join(batch))
+
+    def lines(self) -> Iterator[str]:
+        """
+        Generate the JSON Lines, one at a time.
+
+        The fields of an instruction only depend on its opcode, so they are
+        encoded once per opcode and reused.
+        """
+
+        labels = self.dasm.labels
+        fields: Dict[int, str] = {}
+
+        for entry in self.writer.entries():
+            address = entry.address
+            label = '"{}"'.format(label_name(address)) if address in labels else "null"
+            instruction = entry.instruction
+
+            if instruction is None:
+                yield self.DATA_LINE.format(
+                    address, self.kind(entry), label, self.data(entry).hex()
+                )
+                continue
+
+            encoded = fields.get(instruction.opcode)
+
+            if encoded is None:
+                encoded = fields[instruction.opcode] = json.dumps(
+                    {
+                        "opcode": instruction.opcode,
+                        "text": instruction.text,
+                        "target": instruction.target,
+                    }
+                )[1:-1]
+
+            yield self.CODE_LINE.format(address, label, encoded)
+
+
+class BinaryExporter(Exporter):
+    """
+    Writes a compact stream of binary records.
+
+    The file starts with a header giving the format version, the starting
+    address and the entry point. Each record is the address, a byte of
+    flags and the number of bytes, followed by the bytes themselves as they
+    are in the ROM. The low bits of the flags hold the region, and the top
+    bit is set when the address is labelled. Instruction text is left out,
+    as it follows from the opcode.
+    """
+
+    MAGIC = b"C8DL"
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct("<4sHHH")
+    RECORD = struct.Struct("<HBB")
+    LABELLED = 0x80
+
+    def export(self, path: str) -> None:
+        """Write the disassembly to a binary file."""
+
+        with open(path, "wb") as stream:
+            self.write(stream)
+
+    def write(self, stream: BinaryIO) -> None:
+        """
+        Write the header and records to a binary stream.
+
+        Raises ValueError when the ROM runs past the 16-bit addresses that
+        records hold.
+        """
+
+        dasm = self.dasm
+
+        if self.writer.end_rom_file() > 0x10000:
+            raise ValueError("ROM is too large for 16-bit addresses")
+
+        entry = dasm.entry if dasm.entry is not None else dasm.STARTING_ADDRESS
+        stream.write(
+            self.HEADER.pack(
+                self.MAGIC, self.FORMAT_VERSION, self.writer.STARTING_ADDRESS, entry
+            )
+        )
+
+        batch = bytearray()
+        count = 0
+
+        for record in self.records():
+            batch += record
+            count += 1
+
+            if count == self.BATCH_SIZE:
+                stream.write(batch)
+                batch.clear()
+                count = 0
+
+        stream.write(batch)
+
+    def records(self) -> Iterator[bytes]:
+        """Generate the records, one at a time."""
+
+        labels = self.dasm.labels
+        rom_data = self.dasm.rom_data
+        start = self.writer.STARTING_ADDRESS
+        pack = self.RECORD.pack
+
+        for entry in self.writer.entries():
+            assert self.writer.regions is not None
+
+            address = entry.address
+            flags = self.writer.regions.kinds[address]
+
+            if entry.instruction is not None:
+                flags = Region.CODE
+
+            if address in labels:
+                flags |= self.LABELLED
+
+            first = address - start
+            last = entry.end - start
+            yield pack(address, flags, last - first) + rom_data[first:last]
+
+
+class SqliteExporter(Exporter):
+    """
+    Writes a SQLite database of the listing, labels and cross-references.
+
+    The listing table has a row per line of the listing, keyed by address.
+    The xrefs table records each instruction that refers to an address,
+    with the kind of reference, and is indexed both ways.
+    """
+
+    def export(self, path: str) -> None:
+        """Write the disassembly to a new database file."""
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        connection = sqlite3.connect(path)
+
+        try:
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.executescript(SCHEMA)
+
+            with connection:
+                self.fill(connection)
+        finally:
+            connection.close()
+
+    def fill(self, connection: sqlite3.Connection) -> None:
+        """Insert the rows of every table."""
+
+        dasm = self.dasm
+        entry = dasm.entry if dasm.entry is not None else dasm.STARTING_ADDRESS
+        meta = {
+            "version": __version__,
+            "starting_address": self.writer.STARTING_ADDRESS,
+            "entry": entry,
+            "size": len(dasm.rom_data),
+        }
+
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            ((key, str(value)) for key, value in meta.items()),
+        )
+        connection.executemany(
+            "INSERT INTO listing VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.rows()
+        )
+        connection.executemany(
+            "INSERT INTO labels VALUES (?, ?)",
+            ((address, label_name(address)) for address in dasm.labels),
+        )
+        connection.executemany("INSERT INTO xrefs VALUES (?, ?, ?)", self.xrefs())
+
+    def rows(self) -> Iterator[Tuple[object, ...]]:
+        """Generate the rows of the listing table."""
+
+        for entry in self.writer.entries():
+            data = self.data(entry)
+            instruction = entry.instruction
+
+            if instruction is None:
+                yield (entry.address, self.kind(entry), len(data), data) + (None,) * 4
+            else:
+                yield (
+                    entry.address,
+                    "code",
+                    len(data),
+                    data,
+                    instruction.opcode,
+                    instruction.mnemonic,
+                    instruction.text,
+                    instruction.target,
+                )
+
+    def xrefs(self) -> Iterator[Tuple[int, int, str]]:
+        """Generate the rows of the xrefs table."""
+
+        for target, kinds in CrossReferences(self.dasm).referrers.items():
+            for kind, sources in kinds.items():
+                for source in sources:
+                    yield (target, source, kind.name.lower())
+
+
+FORMATS: Dict[str, Type[Exporter]] = {
+    "jsonl": JsonLinesExporter,
+    "binary": BinaryExporter,
+    "sqlite": SqliteExporter,
+}
+
+
+def export(dasm: Disassembler, path: str, form: str) -> None:
+    """
+    Write a disassembly to a file in one of the formats.
+
+    Raises ValueError when the format is not known.
+    """
+
+    exporter = FORMATS.get(form)
+
+    if exporter is None:
+        raise ValueError(f"Unknown output format: {form}")
+
+    exporter(dasm).export(path)
+
+
+def read_binary(data: bytes) -> Tuple[int, Iterator[BinaryRecord]]:
+    """
+    Read a binary export back, returning its entry point and records.
+
+    Raises ValueError when the data is not in the binary format.
+    """
+
+    header = BinaryExporter.HEADER
+    record = BinaryExporter.RECORD
+
+    if len(data) < header.size:
+        raise ValueError("Binary export is too short")
+
+    magic, version, _, entry = header.unpack_from(data)
+
+    if magic != BinaryExporter.MAGIC or version != BinaryExporter.FORMAT_VERSION:
+        raise ValueError("Not a binary export of a known version")
+
+    return entry, records(data, header.size, record)
+
+
+def records(data: bytes, offset: int, record: struct.Struct) -> Iterator[BinaryRecord]:
+    """Generate the records of a binary export from an offset."""
+
+    while offset < len(data):
+        address, flags, length = record.unpack_from(data, offset)
+        offset += record.size
+        end = offset + length
+        yield BinaryRecord(
+            address,
+            Region(flags & ~BinaryExporter.LABELLED),
+            bool(flags & BinaryExporter.LABELLED),
+            data[offset:end],
+        )
+        offset = end
+
+
+def label_name(address: int) -> str:
+    """Return the name the listing gives the label at an address."""
+
+    return "lbl_0x{:04x}".format(address)
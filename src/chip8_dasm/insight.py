@@ -1,208 +1,201 @@
 """Insight module for disassembly processing."""
 
+from collections import deque
+from functools import lru_cache
+import json
+from typing import (
+    Deque,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from chip8_dasm.instructions import Instruction, OpcodeSpec
 import click
 
+# Bits of an opcode that hold each field, along with the operation itself.
+MASKS = {
+    "operation": 0xF000,
+    "x": 0x0F00,
+    "y": 0x00F0,
+    "n": 0x000F,
+    "nn": 0x00FF,
+    "nnn": 0x0FFF,
+    "nnnn": 0xFFFF,
+    "opcode": 0xFFFF,
+}
 
-class Insight:
-    """Provides insight into disassembly operations."""
-
-    def execution_context(self, opcode: int, operation: int) -> None:
-        """Provide context for current decoding operation."""
+SHIFTS = {"x": 8, "y": 4}
 
-        click.secho("\n== DECODING ==", fg="green", bold=True)
-        click.secho(f"\tOpcode: {hex(opcode)}")
-        click.secho(f"\tOperation: {hex(operation)}")
 
-    def opcode(self, data: bytearray, offset: int) -> None:
-        """Provide binary breakdown of opcode processing."""
+class InsightEvent(NamedTuple):
+    """
+    Record of how the opcode at an address was decoded.
 
-        counter = len(self.binary(data[offset] << 8)[2:])
-        tabber = "\t\t" if counter < 16 else "\t"
+    Each field is given as its name, the mask that selects it from the
+    opcode, and its value.
+    """
 
-        click.secho("\nOpcode", fg="cyan", bold=True)
+    address: int
+    opcode: int
+    name: str
+    text: str
+    fields: Tuple[Tuple[str, int, int], ...]
 
-        click.secho(
-            f"{self.binary(data[offset])[2:].rjust(counter, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
-        click.echo(f"{tabber}Address offset\n")
-
-        click.secho(
-            f"{self.binary(data[offset] << 8)[2:]}", fg="yellow", bold=True, nl=False
-        )
-        click.echo(f"{tabber}Address offset (shifted 8)")
 
-        click.secho(
-            f"{self.binary(data[offset + 1])[2:].rjust(counter, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
-        click.echo(f"{tabber}Address offset (+ 1)")
+class Insight:
+    """
+    Provides insight into disassembly operations.
 
-        click.echo("-" * counter)
+    Decoding is recorded as compact events rather than printed as it
+    happens. Only the most recent events are kept, in a ring buffer of
+    fixed capacity, and nothing is rendered as text until the events are
+    shown. Events can be limited to selected addresses and operations, and
+    can also be streamed to a file as JSON lines, one event per line.
+    """
 
-        click.secho(
-            f"{self.binary(data[offset] << 8 | data[offset + 1])[2:]}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+    CAPACITY = 1024
 
-        full_value = data[offset] << 8 | data[offset + 1]
+    def __init__(
+        self,
+        addresses: Iterable[int] = (),
+        operations: Iterable[str] = (),
+        capacity: int = CAPACITY,
+        stream: Optional[TextIO] = None,
+    ):
+        self.addresses: Set[int] = set(addresses)
+        self.operations = {operation.upper() for operation in operations}
+        self.events: Deque[InsightEvent] = deque(maxlen=capacity)
+        self.stream = stream
+        self.recorded = 0
 
-        click.secho(f"{tabber}{full_value} ({hex(full_value)})")
+    def selects(self, address: int, instruction: Instruction) -> bool:
+        """Report whether the decoding of an instruction is to be recorded."""
 
-    def operation(self, opcode: int) -> None:
-        """Provide binary breakdown of operation bits from opcode."""
+        if self.addresses and address not in self.addresses:
+            return False
 
-        click.secho("\nOperation", fg="cyan", bold=True)
+        if self.operations:
+            name = operation_name(instruction.spec)
+            return name in self.operations or instruction.mnemonic in self.operations
 
-        click.secho(
-            f"{self.binary(opcode)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
-        click.echo("\topcode")
+        return True
 
-        click.secho(f"{self.binary(0xf000)[2:]}", fg="yellow", bold=True, nl=False)
-        click.echo("\t0xF000")
+    def record(self, address: int, instruction: Instruction) -> None:
+        """Record how the instruction at an address was decoded."""
 
-        click.echo("----------------\topcode & 0xF000")
+        if not self.selects(address, instruction):
+            return
 
-        click.secho(
-            f"{self.binary(opcode & 0xf000)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
+        opcode = instruction.opcode
+        names = ("operation",) + tuple(
+            field for field in instruction.spec.fields if field != "opcode"
         )
-
-        value = opcode & 0xF000
-
-        click.echo(f"\t{value} ({hex(value)})")
-
-    def address(self, opcode: int) -> None:
-        """Provide binary breakdown of address from opcode."""
-
-        click.secho("\nAddress", fg="cyan", bold=True)
-
-        # 0xfff = 4095
-
-        click.secho(
-            f"{self.binary(opcode)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
+        masks = tuple(field_mask(name, instruction.size) for name in names)
+        event = InsightEvent(
+            address,
+            opcode,
+            operation_name(instruction.spec),
+            instruction.text,
+            tuple(
+                (name, mask, (opcode & mask) >> SHIFTS.get(name, 0))
+                for name, mask in zip(names, masks)
+            ),
         )
-        click.echo("\topcode")
 
-        click.secho(
-            f"{self.binary(0xfff)[2:].rjust(16, ' ')}", fg="yellow", bold=True, nl=False
-        )
-        click.echo("\t0xFFF")
+        self.events.append(event)
+        self.recorded += 1
 
-        click.echo("----------------\topcode & 0xFFF")
+        if self.stream is not None:
+            self.stream.write(json.dumps(event._asdict()) + "\n")
 
-        click.secho(
-            f"{self.binary(opcode & 0xfff)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+    @property
+    def dropped(self) -> int:
+        """Return how many recorded events no longer fit in the buffer."""
 
-        value = opcode & 0xFFF
+        return self.recorded - len(self.events)
 
-        click.echo(f"\t{value} ({hex(value)})")
+    def show(self) -> None:
+        """Print the events that are kept."""
 
-    def vx(self, opcode: int) -> None:
-        """Provide binary breakdown of register."""
+        if self.dropped:
+            click.secho(f"\n{self.dropped} earlier events not kept", fg="red")
 
-        click.secho("\nvx", fg="cyan", bold=True)
+        for event in self.events:
+            for line in self.render(event):
+                click.echo(line)
 
-        # 0xf00 = 3840
+    def render(self, event: InsightEvent) -> Iterator[str]:
+        """Generate a binary breakdown of an event, a line at a time."""
 
-        click.secho(
-            f"{self.binary(opcode)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
+        yield click.style(f"\n== DECODING 0x{event.address:04x} ==", fg="green")
+        yield (
+            f"\tOpcode: 0x{event.opcode:04x}  "
+            f"{click.style(event.name, fg='cyan')}  {event.text}"
         )
-        click.echo("\topcode")
 
-        click.secho(
-            f"{self.binary(0xf00)[2:].rjust(16, ' ')}", fg="yellow", bold=True, nl=False
-        )
-        click.echo("\t0xF00")
-
-        click.echo("----------------\topcode & 0xF00")
+        length = 32 if event.opcode > 0xFFFF else 16
+        opcode = click.style(self.binary(event.opcode, length)[2:], fg="yellow")
 
-        click.secho(
-            f"{self.binary(opcode & 0xf00)[2:].rjust(16, ' ')}\n",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+        for name, mask, value in event.fields:
+            shift = SHIFTS.get(name, 0)
+            shifted = f" >> {shift}" if shift else ""
 
-        click.echo("----------------\t(opcode & 0xF00) >> 8")
+            yield (
+                f"\t{name:<10}{opcode} & "
+                f"{self.binary(mask, length)[2:]}{shifted:5} = {value} ({hex(value)})"
+            )
 
-        click.secho(
-            f"{self.binary((opcode & 0xf00) >> 8)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+    @staticmethod
+    def binary(value: int, length: int = 8) -> str:
+        """Convert an integer value into a binary representation."""
 
-        value = (opcode & 0xF00) >> 8
+        return format(value, "#0{}b".format(length + 2))
 
-        click.echo(f"\t{value} ({hex(value)})")
 
-    def vy(self, opcode: int) -> None:
-        """Provide binary breakdown of register."""
+def field_mask(name: str, size: int) -> int:
+    """
+    Return the bits of an opcode that hold a field.
 
-        click.secho("\nvy", fg="cyan", bold=True)
+    The opcode of a four-byte instruction is its first word followed by its
+    second, so the fields of the first word move up by 16 bits.
+    """
 
-        # 0xf0 = 240
+    mask = MASKS[name]
 
-        click.secho(
-            f"{self.binary(opcode)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
-        click.echo("\topcode")
+    if size == 4 and name != "nnnn":
+        mask <<= 16
 
-        click.secho(
-            f"{self.binary(0xf0)[2:].rjust(16, ' ')}", fg="yellow", bold=True, nl=False
-        )
-        click.echo("\t0xF0")
+    return mask
 
-        click.echo("----------------\topcode & 0xF0")
 
-        click.secho(
-            f"{self.binary(opcode & 0xf0)[2:].rjust(16, ' ')}\n",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+@lru_cache(maxsize=None)
+def operation_name(spec: OpcodeSpec) -> str:
+    """
+    Return the conventional name of an operation, such as DXYN or 8XY4.
 
-        click.echo("----------------\t(opcode & 0xF0) >> 4")
+    Digits are the fixed bits of the opcode and letters name its fields.
+    """
 
-        click.secho(
-            f"{self.binary((opcode & 0xf0) >> 4)[2:].rjust(16, ' ')}",
-            fg="yellow",
-            bold=True,
-            nl=False,
-        )
+    if spec.mask == 0:
+        return "UNKNOWN"
 
-        value = (opcode & 0xF0) >> 4
+    name = ""
 
-        click.echo(f"\t{value} ({hex(value)})")
+    for position in range(4):
+        shift = 12 - position * 4
 
-    @staticmethod
-    def binary(value: int, length: int = 8) -> str:
-        """Convert an integer value into a binary representation."""
+        if spec.mask >> shift & 0xF == 0xF:
+            name += "{:X}".format(spec.pattern >> shift & 0xF)
+        elif position == 1 and "x" in spec.fields:
+            name += "X"
+        elif position == 2 and "y" in spec.fields:
+            name += "Y"
+        else:
+            name += "N"
 
-        return format(value, "#0{}b".format(length + 2))
+    return name
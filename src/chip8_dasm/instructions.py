@@ -0,0 +1,428 @@
+"""Instruction set module for the disassembler."""
+
+from enum import IntEnum
+from functools import lru_cache
+import sys
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+
+class Flow(IntEnum):
+    """Effect an instruction has on the flow of control."""
+
+    NEXT = 0
+    SKIP = 1
+    JUMP = 2
+    CALL = 3
+    RETURN = 4
+    INDIRECT = 5
+    INVALID = 6
+
+
+class OpcodeSpec(NamedTuple):
+    """
+    Description of a single operation of the instruction set.
+
+    An opcode matches the specification when the bits selected by the mask
+    are equal to the pattern. The fields name the parts of the opcode that
+    are operands, in the order the mnemonic format expects them.
+
+    The registers an operation writes and reads are given by the field that
+    holds the register number ("x" or "y"), a fixed register as a hex digit
+    ("0" or "f"), "0-x" for every register from V0 up to VX, or "x-y" for
+    every register from VX to VY.
+
+    Operations are two bytes long, apart from ones that take the word after
+    their opcode as an operand, which are four.
+    """
+
+    mask: int
+    pattern: int
+    mnemonic: str
+    fields: Tuple[str, ...]
+    flow: Flow
+    labelled: bool = False
+    defines: Tuple[str, ...] = ()
+    uses: Tuple[str, ...] = ()
+    size: int = 2
+
+
+FIELDS = {
+    "x": lambda opcode: (opcode & 0xF00) >> 8,
+    "y": lambda opcode: (opcode & 0xF0) >> 4,
+    "n": lambda opcode: opcode & 0xF,
+    "nn": lambda opcode: opcode & 0xFF,
+    "nnn": lambda opcode: opcode & 0xFFF,
+    "nnnn": lambda opcode: opcode & 0xFFFF,
+}
+
+# More specific masks come first so that, for example, 00E0 is matched
+# before the general 0NNN.
+CHIP8 = (
+    OpcodeSpec(0xFFFF, 0x00E0, "CLS", (), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0x00EE, "RET", (), Flow.RETURN),
+    OpcodeSpec(0xF000, 0x0000, "SYS 0x{:03x}", ("nnn",), Flow.NEXT),
+    OpcodeSpec(0xF000, 0x1000, "JP lbl_0x{:04x}", ("nnn",), Flow.JUMP, True),
+    OpcodeSpec(0xF000, 0x2000, "CALL lbl_0x{:04x}", ("nnn",), Flow.CALL, True),
+    OpcodeSpec(0xF000, 0x3000, "SE V{}, 0x{:02x}", ("x", "nn"), Flow.SKIP, uses=("x",)),
+    OpcodeSpec(
+        0xF000, 0x4000, "SNE V{}, 0x{:02x}", ("x", "nn"), Flow.SKIP, uses=("x",)
+    ),
+    OpcodeSpec(0xF00F, 0x5000, "SE V{}, V{}", ("x", "y"), Flow.SKIP, uses=("x", "y")),
+    OpcodeSpec(
+        0xF000, 0x6000, "LD V{}, 0x{:02x}", ("x", "nn"), Flow.NEXT, defines=("x",)
+    ),
+    OpcodeSpec(
+        0xF000,
+        0x7000,
+        "ADD V{}, 0x{:02x}",
+        ("x", "nn"),
+        Flow.NEXT,
+        defines=("x",),
+        uses=("x",),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8000,
+        "LD V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x",),
+        uses=("y",),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8001,
+        "OR V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x",),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8002,
+        "AND V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x",),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8003,
+        "XOR V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x",),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8004,
+        "ADD V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x", "f"),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8005,
+        "SUB V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x", "f"),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8006,
+        "SHR V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x", "f"),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x8007,
+        "SUBN V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x", "f"),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(
+        0xF00F,
+        0x800E,
+        "SHL V{}, V{}",
+        ("x", "y"),
+        Flow.NEXT,
+        defines=("x", "f"),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(0xF00F, 0x9000, "SNE V{}, V{}", ("x", "y"), Flow.SKIP, uses=("x", "y")),
+    OpcodeSpec(0xF000, 0xA000, "LD I, lbl_0x{:04x}", ("nnn",), Flow.NEXT, True),
+    OpcodeSpec(
+        0xF000,
+        0xB000,
+        "JP V0, lbl_0x{:04x}",
+        ("nnn",),
+        Flow.INDIRECT,
+        True,
+        uses=("0",),
+    ),
+    OpcodeSpec(
+        0xF000, 0xC000, "RND V{}, 0x{:02x}", ("x", "nn"), Flow.NEXT, defines=("x",)
+    ),
+    OpcodeSpec(
+        0xF000,
+        0xD000,
+        "DRW V{}, V{}, 0x{:02x}",
+        ("x", "y", "n"),
+        Flow.NEXT,
+        defines=("f",),
+        uses=("x", "y"),
+    ),
+    OpcodeSpec(0xF0FF, 0xE09E, "SKP V{}", ("x",), Flow.SKIP, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xE0A1, "SKNP V{}", ("x",), Flow.SKIP, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF007, "LD V{}, DT", ("x",), Flow.NEXT, defines=("x",)),
+    OpcodeSpec(0xF0FF, 0xF00A, "LD V{}, K", ("x",), Flow.NEXT, defines=("x",)),
+    OpcodeSpec(0xF0FF, 0xF015, "LD DT, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF018, "LD ST, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF01E, "ADD I, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF029, "LD F, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF033, "LD B, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF055, "LD [I], V{}", ("x",), Flow.NEXT, uses=("0-x",)),
+    OpcodeSpec(0xF0FF, 0xF065, "LD V{}, [I]", ("x",), Flow.NEXT, defines=("0-x",)),
+)
+
+# SUPER-CHIP 1.1 adds scrolling, a high resolution mode, a large font and
+# flag registers that persist.
+SCHIP = (
+    OpcodeSpec(0xFFF0, 0x00C0, "SCD 0x{:x}", ("n",), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0x00FB, "SCR", (), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0x00FC, "SCL", (), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0x00FD, "EXIT", (), Flow.RETURN),
+    OpcodeSpec(0xFFFF, 0x00FE, "LOW", (), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0x00FF, "HIGH", (), Flow.NEXT),
+    OpcodeSpec(0xF0FF, 0xF030, "LD HF, V{}", ("x",), Flow.NEXT, uses=("x",)),
+    OpcodeSpec(0xF0FF, 0xF075, "LD R, V{}", ("x",), Flow.NEXT, uses=("0-x",)),
+    OpcodeSpec(0xF0FF, 0xF085, "LD V{}, R", ("x",), Flow.NEXT, defines=("0-x",)),
+) + CHIP8
+
+# XO-CHIP adds to SUPER-CHIP bit planes, audio, register ranges and a long
+# form of LD I whose address is the word that follows, for 64 KiB of memory.
+XOCHIP = (
+    OpcodeSpec(0xFFF0, 0x00D0, "SCU 0x{:x}", ("n",), Flow.NEXT),
+    OpcodeSpec(0xF00F, 0x5002, "LD [I], V{}-V{}", ("x", "y"), Flow.NEXT, uses=("x-y",)),
+    OpcodeSpec(
+        0xF00F, 0x5003, "LD V{}-V{}, [I]", ("x", "y"), Flow.NEXT, defines=("x-y",)
+    ),
+    OpcodeSpec(
+        0xFFFF,
+        0xF000,
+        "LD I, long lbl_0x{:04x}",
+        ("nnnn",),
+        Flow.NEXT,
+        True,
+        size=4,
+    ),
+    OpcodeSpec(0xF0FF, 0xF001, "PLANE 0x{:x}", ("x",), Flow.NEXT),
+    OpcodeSpec(0xFFFF, 0xF002, "AUDIO", (), Flow.NEXT),
+    OpcodeSpec(0xF0FF, 0xF03A, "PITCH V{}", ("x",), Flow.NEXT, uses=("x",)),
+) + SCHIP
+
+UNKNOWN = OpcodeSpec(0x0000, 0x0000, "0x{:04x}", ("opcode",), Flow.INVALID)
+
+
+class Instruction:
+    """
+    Decoded form of a single opcode.
+
+    Instructions only depend on the opcode, not on where it appears in the
+    ROM, so one instance is shared by every occurrence of an opcode. Nothing
+    is rendered as text until it is asked for.
+    """
+
+    __slots__ = ("opcode", "spec", "operands", "size", "flow", "target")
+
+    def __init__(self, opcode: int, spec: OpcodeSpec):
+        self.opcode = opcode
+        self.spec = spec
+        self.operands = tuple(
+            opcode if field == "opcode" else FIELDS[field](opcode)
+            for field in spec.fields
+        )
+        self.size = spec.size
+        self.flow = spec.flow
+        self.target: Optional[int] = None
+
+        if spec.labelled:
+            self.target = opcode & (0xFFFF if spec.size == 4 else 0xFFF)
+
+    @property
+    def mnemonic(self) -> str:
+        """Return the name of the operation."""
+
+        return self.spec.mnemonic.split(" ", 1)[0]
+
+    @property
+    def text(self) -> str:
+        """Render the instruction as assembly text."""
+
+        return self.spec.mnemonic.format(*self.operands)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare instructions by opcode and specification."""
+
+        if isinstance(other, Instruction):
+            return self.opcode == other.opcode and self.spec == other.spec
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash instructions by opcode and specification."""
+
+        return hash((self.opcode, self.spec))
+
+    def __repr__(self) -> str:
+        """Represent the instruction by its opcode and text."""
+
+        return f"<Instruction 0x{self.opcode:04x} {self.text}>"
+
+
+class DecodeTable(Dict[int, Instruction]):
+    """
+    Lookup table from every 16-bit opcode to its decoded instruction.
+
+    Entries are built the first time an opcode is looked up and are kept
+    from then on, so decoding a word is a single index once the table is
+    warm. The whole table can be built up front with precompute.
+    """
+
+    def __init__(self, specs: Tuple[OpcodeSpec, ...]):
+        super().__init__()
+        self.specs = specs
+        self.swapped: Optional[SwappedDecodeTable] = None
+        self.long: Dict[int, Instruction] = {}
+
+    def __missing__(self, opcode: int) -> Instruction:
+        """Decode an opcode that has not been looked up before."""
+
+        instruction = self[opcode] = Instruction(opcode, self.match(opcode))
+
+        return instruction
+
+    def match(self, opcode: int) -> OpcodeSpec:
+        """Find the specification that an opcode belongs to."""
+
+        for spec in self.specs:
+            if opcode & spec.mask == spec.pattern:
+                return spec
+
+        return UNKNOWN
+
+    def wide(self, prefix: Instruction, operand: int) -> Instruction:
+        """
+        Decode a four byte instruction from its opcode and the word after it.
+
+        The table holds the first word of such an instruction with the
+        specification it belongs to. The whole instruction is built from
+        that the first time it is seen and is kept from then on.
+        """
+
+        opcode = prefix.opcode << 16 | operand
+        instruction = self.long.get(opcode)
+
+        if instruction is None:
+            instruction = self.long[opcode] = Instruction(opcode, prefix.spec)
+
+        return instruction
+
+    def precompute(self) -> "DecodeTable":
+        """Decode every possible opcode."""
+
+        for opcode in range(0x10000):
+            self[opcode]
+
+        return self
+
+    def native(self) -> Dict[int, Instruction]:
+        """
+        Return a table indexed by words in native byte order.
+
+        This allows words read from a native view of ROM data to be decoded
+        without reordering their bytes first. On big-endian machines this is
+        the table itself.
+        """
+
+        if sys.byteorder == "big":
+            return self
+
+        if self.swapped is None:
+            self.swapped = SwappedDecodeTable(self)
+
+        return self.swapped
+
+
+class SwappedDecodeTable(Dict[int, Instruction]):
+    """Decode table indexed by words with their bytes swapped."""
+
+    def __init__(self, table: DecodeTable):
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, word: int) -> Instruction:
+        """Decode a word that has not been looked up before."""
+
+        instruction = self[word] = self.table[(word & 0xFF) << 8 | word >> 8]
+
+        return instruction
+
+
+class InstructionSet(NamedTuple):
+    """
+    Variant of CHIP-8, given by its operations and the memory they address.
+
+    Each variant has its own decode table, which is built once per run and
+    shared by every ROM decoded with it. Variants with large sprites draw a
+    16x16 sprite of 32 bytes for DXY0, where CHIP-8 draws nothing.
+    """
+
+    name: str
+    specs: Tuple[OpcodeSpec, ...]
+    memory_size: int = 0x1000
+    large_sprites: bool = False
+
+    @property
+    def long(self) -> bool:
+        """Report whether any operation is longer than two bytes."""
+
+        return any(spec.size > 2 for spec in self.specs)
+
+    @property
+    def table(self) -> DecodeTable:
+        """Return the decode table of the variant."""
+
+        return decode_table(self.specs)
+
+
+INSTRUCTION_SETS = {
+    "chip8": InstructionSet("chip8", CHIP8),
+    "schip": InstructionSet("schip", SCHIP, large_sprites=True),
+    "xochip": InstructionSet("xochip", XOCHIP, 0x10000, large_sprites=True),
+}
+
+
+def listing(disassembly: Mapping[int, Instruction]) -> Dict[int, str]:
+    """Render each instruction of a disassembly as assembly text."""
+
+    return {address: instruction.text for address, instruction in disassembly.items()}
+
+
+@lru_cache(maxsize=None)
+def decode_table(specs: Tuple[OpcodeSpec, ...] = CHIP8) -> DecodeTable:
+    """Return the shared decode table for an instruction set."""
+
+    return DecodeTable(specs)
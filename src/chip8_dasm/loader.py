@@ -1,5 +1,11 @@
 """Loader implementation for CHIP-8 ROM files."""
 
+import mmap
+import os
+from typing import Union
+
+RomData = Union[bytearray, memoryview]
+
 
 class Loader:
     """Simple abstraction for a file loader."""
@@ -10,3 +16,34 @@ class Loader:
 
         with open(rom_file, mode="rb") as file:
             return bytearray(file.read())
+
+    @staticmethod
+    def map(rom_file: str) -> memoryview:
+        """
+        Memory-map binary data from ROM file.
+
+        The data is exposed as a read-only view of the mapping, so nothing is
+        copied until a byte is actually read. The mapping stays open for as
+        long as the view is referenced.
+        """
+
+        with open(rom_file, mode="rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b"")
+
+            return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def words(data: RomData, offset: int = 0) -> memoryview:
+        """
+        View binary data as 16-bit words starting at an offset.
+
+        The view shares memory with the data and holds the words in the
+        native byte order of the machine. CHIP-8 words are big-endian, so on
+        little-endian machines each word is read with its bytes swapped. A
+        trailing odd byte is not part of the view.
+        """
+
+        view = memoryview(data)[offset:]
+
+        return view[: len(view) & ~1].cast("H")
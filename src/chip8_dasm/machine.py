@@ -0,0 +1,649 @@
+"""Headless CHIP-8 interpreter module."""
+
+import random
+from typing import Callable, Dict, List, Optional, Sequence
+
+from chip8_dasm.addresses import members
+from chip8_dasm.instructions import decode_table, Flow
+
+Handler = Callable[[int], int]
+Keys = Callable[[int], int]
+
+FONT_ADDRESS = 0x50
+FONT = bytes(
+    [
+        *(0xF0, 0x90, 0x90, 0x90, 0xF0, 0x20, 0x60, 0x20, 0x20, 0x70),
+        *(0xF0, 0x10, 0xF0, 0x80, 0xF0, 0xF0, 0x10, 0xF0, 0x10, 0xF0),
+        *(0x90, 0x90, 0xF0, 0x10, 0x10, 0xF0, 0x80, 0xF0, 0x10, 0xF0),
+        *(0xF0, 0x80, 0xF0, 0x90, 0xF0, 0xF0, 0x10, 0x20, 0x40, 0x40),
+        *(0xF0, 0x90, 0xF0, 0x90, 0xF0, 0xF0, 0x90, 0xF0, 0x10, 0xF0),
+        *(0xF0, 0x90, 0xF0, 0x90, 0x90, 0xE0, 0x90, 0xE0, 0x90, 0xE0),
+        *(0xF0, 0x80, 0x80, 0x80, 0xF0, 0xE0, 0x90, 0x90, 0x90, 0xE0),
+        *(0xF0, 0x80, 0xF0, 0x80, 0xF0, 0xF0, 0x80, 0xF0, 0x80, 0x80),
+    ]
+)
+FONT_END = FONT_ADDRESS + len(FONT)
+
+
+class Halt(Exception):
+    """Raised by an instruction that stops the machine."""
+
+
+class Coverage:
+    """
+    Addresses a machine executed and the targets of the jumps it took.
+
+    Both are bitmaps with one byte per address, so recording an address as
+    it executes is a single store.
+    """
+
+    SIZE = 0x1000
+
+    def __init__(self) -> None:
+        self.executed = bytearray(self.SIZE)
+        self.targets = bytearray(self.SIZE)
+
+    def executed_addresses(self) -> List[int]:
+        """Return the addresses that were executed, in ascending order."""
+
+        return list(members(self.executed))
+
+    def jump_targets(self) -> List[int]:
+        """Return the addresses that jumps and calls went to."""
+
+        return list(members(self.targets))
+
+
+class Machine:
+    """
+    Headless CHIP-8 interpreter.
+
+    The machine has no display or sound output. Sprites are still drawn to
+    an internal framebuffer, as programs branch on collisions, and timers
+    count down once every STEPS_PER_FRAME instructions rather than against
+    a clock, so a run is deterministic for a given seed and input script.
+    Instructions behave as they did on the COSMAC VIP: shifts read VY, and
+    FX55 and FX65 leave I pointing past the registers they store or load.
+
+    Each opcode is compiled to a small function the first time it runs, and
+    each address holds the function for the opcode found there once it has
+    run, so executing an instruction is a list index and a call. An address
+    is only looked at when it first runs, which is when it is recorded in
+    the coverage, along with the target of every jump and call, including
+    computed BNNN jumps. Instructions that write to memory send the
+    addresses they write back to be looked at again.
+    """
+
+    STARTING_ADDRESS = 0x200
+    MEMORY_SIZE = 0x1000
+    STEPS_PER_FRAME = 10
+    STACK_DEPTH = 16
+
+    def __init__(
+        self, rom_data: Sequence[int], keys: Optional[Keys] = None, seed: int = 0
+    ):
+        start = self.STARTING_ADDRESS
+        end = start + len(rom_data)
+
+        if end > self.MEMORY_SIZE:
+            raise ValueError("ROM does not fit in memory")
+
+        self.memory = bytearray(self.MEMORY_SIZE)
+        self.memory[FONT_ADDRESS:FONT_END] = FONT
+        self.memory[start:end] = bytes(rom_data)
+        self.registers = bytearray(16)
+        self.index = 0
+        self.pc = self.STARTING_ADDRESS
+        self.stack: List[int] = []
+        self.delay = 0
+        self.sound = 0
+        self.display = [0] * 32
+        self.keys = keys if keys is not None else random_keys(seed)
+        self.pressed = 0
+        self.random = random.Random(seed)
+        self.coverage = Coverage()
+        self.steps = 0
+        self.frames = 0
+        self.halted: Optional[str] = None
+        self.handlers = HandlerTable(self)
+        self.code: List[Handler] = [self.first_run] * self.MEMORY_SIZE
+
+    def run(self, budget: int) -> int:
+        """
+        Execute up to a number of instructions.
+
+        Stops early when the machine halts, with the reason left in halted.
+        Returns the number of instructions executed.
+        """
+
+        code = self.code
+        frame = self.STEPS_PER_FRAME
+        started = self.steps
+        end = started + budget
+        pc = self.pc
+
+        while self.halted is None and self.steps < end:
+            chunk = min(frame - self.steps % frame, end - self.steps)
+            step = 0
+
+            # The step an instruction halts at is the number completed.
+            try:
+                for step in range(chunk):  # noqa: B007
+                    pc = code[pc](pc)
+            except Halt as reason:
+                self.halted = str(reason)
+            except IndexError:
+                self.halted = f"Ran off the end of memory at 0x{pc:04x}"
+            else:
+                step = chunk
+
+            self.steps += step
+
+            if self.steps % frame == 0:
+                self.tick()
+
+        self.pc = pc
+
+        return self.steps - started
+
+    def first_run(self, pc: int) -> int:
+        """Run the instruction at an address for the first time."""
+
+        self.coverage.executed[pc] = 1
+
+        handler = self.handlers[self.memory[pc] << 8 | self.memory[pc + 1]]
+        self.code[pc] = handler
+
+        return handler(pc)
+
+    def written(self, first: int, end: int) -> None:
+        """Forget the instructions that overlap bytes written to memory."""
+
+        for address in range(max(first - 1, 0), end):
+            self.code[address] = self.first_run
+
+    def tick(self) -> None:
+        """Count down the timers and read the keys for the next frame."""
+
+        if self.delay:
+            self.delay -= 1
+
+        if self.sound:
+            self.sound -= 1
+
+        self.frames += 1
+        self.pressed = self.keys(self.frames)
+
+
+class HandlerTable(Dict[int, Handler]):
+    """Table of compiled instructions, filled in as opcodes first run."""
+
+    def __init__(self, machine: Machine):
+        super().__init__()
+        self.machine = machine
+
+    def __missing__(self, opcode: int) -> Handler:
+        """Compile an opcode that has not run before."""
+
+        spec = decode_table()[opcode].spec
+
+        if spec.flow is Flow.INVALID:
+            handler = halt(f"Unknown opcode 0x{opcode:04x}")
+        else:
+            handler = BUILDERS[spec.pattern](self.machine, opcode)
+
+        self[opcode] = handler
+
+        return handler
+
+
+def random_keys(seed: int = 0, rate: float = 0.25) -> Keys:
+    """
+    Return an input script that presses a random key in some frames.
+
+    In each frame a single key is held with the given probability.
+    """
+
+    generator = random.Random(seed)
+
+    def keys(frame: int) -> int:
+        if generator.random() < rate:
+            return 1 << generator.randrange(16)
+
+        return 0
+
+    return keys
+
+
+def scripted_keys(script: str) -> Keys:
+    """
+    Return an input script that plays back a string, one frame per character.
+
+    Each character is the hex digit of the key held in that frame, or a dot
+    when no key is held. The script repeats once it runs out.
+    """
+
+    masks = [0 if key == "." else 1 << int(key, 16) for key in script] or [0]
+
+    def keys(frame: int) -> int:
+        return masks[frame % len(masks)]
+
+    return keys
+
+
+def halt(reason: str) -> Handler:
+    """Build an instruction that stops the machine."""
+
+    def stop(pc: int) -> int:
+        raise Halt(f"{reason} at 0x{pc:04x}")
+
+    return stop
+
+
+def build_sys(machine: Machine, opcode: int) -> Handler:
+    """0NNN: machine code routines are not run."""
+
+    return lambda pc: pc + 2
+
+
+def build_cls(machine: Machine, opcode: int) -> Handler:
+    """00E0: clear the display."""
+
+    display = machine.display
+
+    def cls(pc: int) -> int:
+        display[:] = [0] * 32
+        return pc + 2
+
+    return cls
+
+
+def build_ret(machine: Machine, opcode: int) -> Handler:
+    """00EE: return from a subroutine."""
+
+    stack = machine.stack
+
+    def ret(pc: int) -> int:
+        if not stack:
+            raise Halt(f"Return with an empty stack at 0x{pc:04x}")
+
+        return stack.pop()
+
+    return ret
+
+
+def build_jp(machine: Machine, opcode: int) -> Handler:
+    """1NNN: jump, halting on a jump to itself."""
+
+    target = opcode & 0xFFF
+    machine.coverage.targets[target] = 1
+
+    def jp(pc: int) -> int:
+        if pc == target:
+            raise Halt(f"Endless loop at 0x{pc:04x}")
+
+        return target
+
+    return jp
+
+
+def build_call(machine: Machine, opcode: int) -> Handler:
+    """2NNN: call a subroutine."""
+
+    target = opcode & 0xFFF
+    stack = machine.stack
+    depth = machine.STACK_DEPTH
+    machine.coverage.targets[target] = 1
+
+    def call(pc: int) -> int:
+        if len(stack) >= depth:
+            raise Halt(f"Stack overflow at 0x{pc:04x}")
+
+        stack.append(pc + 2)
+        return target
+
+    return call
+
+
+def build_se_byte(machine: Machine, opcode: int) -> Handler:
+    """3XNN: skip if VX equals NN."""
+
+    v, x, nn = machine.registers, opcode >> 8 & 0xF, opcode & 0xFF
+
+    return lambda pc: pc + 4 if v[x] == nn else pc + 2
+
+
+def build_sne_byte(machine: Machine, opcode: int) -> Handler:
+    """4XNN: skip if VX does not equal NN."""
+
+    v, x, nn = machine.registers, opcode >> 8 & 0xF, opcode & 0xFF
+
+    return lambda pc: pc + 4 if v[x] != nn else pc + 2
+
+
+def build_se(machine: Machine, opcode: int) -> Handler:
+    """5XY0: skip if VX equals VY."""
+
+    v, x, y = machine.registers, opcode >> 8 & 0xF, opcode >> 4 & 0xF
+
+    return lambda pc: pc + 4 if v[x] == v[y] else pc + 2
+
+
+def build_sne(machine: Machine, opcode: int) -> Handler:
+    """9XY0: skip if VX does not equal VY."""
+
+    v, x, y = machine.registers, opcode >> 8 & 0xF, opcode >> 4 & 0xF
+
+    return lambda pc: pc + 4 if v[x] != v[y] else pc + 2
+
+
+def build_ld_byte(machine: Machine, opcode: int) -> Handler:
+    """6XNN: load NN into VX."""
+
+    v, x, nn = machine.registers, opcode >> 8 & 0xF, opcode & 0xFF
+
+    def ld(pc: int) -> int:
+        v[x] = nn
+        return pc + 2
+
+    return ld
+
+
+def build_add_byte(machine: Machine, opcode: int) -> Handler:
+    """7XNN: add NN to VX without a carry."""
+
+    v, x, nn = machine.registers, opcode >> 8 & 0xF, opcode & 0xFF
+
+    def add(pc: int) -> int:
+        v[x] = v[x] + nn & 0xFF
+        return pc + 2
+
+    return add
+
+
+def build_alu(
+    operation: Callable[[int, int], int],
+) -> Callable[[Machine, int], Handler]:
+    """Build an 8XYN instruction that sets VX from VX and VY."""
+
+    def build(machine: Machine, opcode: int) -> Handler:
+        v, x, y = machine.registers, opcode >> 8 & 0xF, opcode >> 4 & 0xF
+
+        def alu(pc: int) -> int:
+            v[x] = operation(v[x], v[y])
+            return pc + 2
+
+        return alu
+
+    return build
+
+
+def build_flagged(
+    operation: Callable[[int, int], int], flag: Callable[[int, int], int]
+) -> Callable[[Machine, int], Handler]:
+    """Build an 8XYN instruction that also sets VF, after VX is set."""
+
+    def build(machine: Machine, opcode: int) -> Handler:
+        v, x, y = machine.registers, opcode >> 8 & 0xF, opcode >> 4 & 0xF
+
+        def alu(pc: int) -> int:
+            vx, vy = v[x], v[y]
+            v[x] = operation(vx, vy) & 0xFF
+            v[15] = flag(vx, vy)
+            return pc + 2
+
+        return alu
+
+    return build
+
+
+def build_ld_index(machine: Machine, opcode: int) -> Handler:
+    """ANNN: load NNN into I."""
+
+    nnn = opcode & 0xFFF
+
+    def ld(pc: int) -> int:
+        machine.index = nnn
+        return pc + 2
+
+    return ld
+
+
+def build_jp_indirect(machine: Machine, opcode: int) -> Handler:
+    """BNNN: jump to NNN plus V0."""
+
+    v, nnn, targets = machine.registers, opcode & 0xFFF, machine.coverage.targets
+
+    def jp(pc: int) -> int:
+        target = nnn + v[0] & 0xFFF
+        targets[target] = 1
+        return target
+
+    return jp
+
+
+def build_rnd(machine: Machine, opcode: int) -> Handler:
+    """CXNN: load a random byte masked with NN into VX."""
+
+    v, x, nn = machine.registers, opcode >> 8 & 0xF, opcode & 0xFF
+    bits = machine.random.getrandbits
+
+    def rnd(pc: int) -> int:
+        v[x] = bits(8) & nn
+        return pc + 2
+
+    return rnd
+
+
+def build_drw(machine: Machine, opcode: int) -> Handler:
+    """DXYN: draw N rows of a sprite at I, setting VF on a collision."""
+
+    v, x, y, n = machine.registers, opcode >> 8 & 0xF, opcode >> 4 & 0xF, opcode & 0xF
+    memory, display = machine.memory, machine.display
+
+    def drw(pc: int) -> int:
+        column, top, index = v[x] & 63, v[y] & 31, machine.index
+        collision = 0
+
+        for row in range(min(n, 32 - top)):
+            bits = memory[index + row & 0xFFF] << 56 >> column
+            line = display[top + row]
+            collision |= line & bits
+            display[top + row] = line ^ bits
+
+        v[15] = 1 if collision else 0
+        return pc + 2
+
+    return drw
+
+
+def build_skp(machine: Machine, opcode: int) -> Handler:
+    """EX9E: skip if the key in VX is held."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    return lambda pc: pc + 4 if machine.pressed >> (v[x] & 0xF) & 1 else pc + 2
+
+
+def build_sknp(machine: Machine, opcode: int) -> Handler:
+    """EXA1: skip if the key in VX is not held."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    return lambda pc: pc + 2 if machine.pressed >> (v[x] & 0xF) & 1 else pc + 4
+
+
+def build_ld_delay(machine: Machine, opcode: int) -> Handler:
+    """FX07: load the delay timer into VX."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def ld(pc: int) -> int:
+        v[x] = machine.delay
+        return pc + 2
+
+    return ld
+
+
+def build_ld_key(machine: Machine, opcode: int) -> Handler:
+    """FX0A: wait for a key and load it into VX."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def ld(pc: int) -> int:
+        pressed = machine.pressed
+
+        if not pressed:
+            return pc
+
+        v[x] = (pressed & -pressed).bit_length() - 1
+        return pc + 2
+
+    return ld
+
+
+def build_set_delay(machine: Machine, opcode: int) -> Handler:
+    """FX15: set the delay timer to VX."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def ld(pc: int) -> int:
+        machine.delay = v[x]
+        return pc + 2
+
+    return ld
+
+
+def build_set_sound(machine: Machine, opcode: int) -> Handler:
+    """FX18: set the sound timer to VX."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def ld(pc: int) -> int:
+        machine.sound = v[x]
+        return pc + 2
+
+    return ld
+
+
+def build_add_index(machine: Machine, opcode: int) -> Handler:
+    """FX1E: add VX to I."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def add(pc: int) -> int:
+        machine.index = machine.index + v[x] & 0xFFF
+        return pc + 2
+
+    return add
+
+
+def build_ld_font(machine: Machine, opcode: int) -> Handler:
+    """FX29: point I at the font character for VX."""
+
+    v, x = machine.registers, opcode >> 8 & 0xF
+
+    def ld(pc: int) -> int:
+        machine.index = FONT_ADDRESS + (v[x] & 0xF) * 5
+        return pc + 2
+
+    return ld
+
+
+def build_ld_bcd(machine: Machine, opcode: int) -> Handler:
+    """FX33: store the decimal digits of VX at I."""
+
+    v, x, memory = machine.registers, opcode >> 8 & 0xF, machine.memory
+
+    def ld(pc: int) -> int:
+        value, index = v[x], machine.index
+
+        if index + 3 > len(memory):
+            raise Halt(f"Store past the end of memory at 0x{pc:04x}")
+
+        memory[index] = value // 100
+        memory[index + 1] = value // 10 % 10
+        memory[index + 2] = value % 10
+        machine.written(index, index + 3)
+        return pc + 2
+
+    return ld
+
+
+def build_store(machine: Machine, opcode: int) -> Handler:
+    """FX55: store V0 to VX at I."""
+
+    v, count, memory = machine.registers, (opcode >> 8 & 0xF) + 1, machine.memory
+
+    def ld(pc: int) -> int:
+        index = machine.index
+        end = index + count
+
+        if end > len(memory):
+            raise Halt(f"Store past the end of memory at 0x{pc:04x}")
+
+        memory[index:end] = v[:count]
+        machine.written(index, end)
+        machine.index = end & 0xFFF
+        return pc + 2
+
+    return ld
+
+
+def build_load(machine: Machine, opcode: int) -> Handler:
+    """FX65: load V0 to VX from I."""
+
+    v, count, memory = machine.registers, (opcode >> 8 & 0xF) + 1, machine.memory
+
+    def ld(pc: int) -> int:
+        index = machine.index
+        end = index + count
+
+        if end > len(memory):
+            raise Halt(f"Load past the end of memory at 0x{pc:04x}")
+
+        v[:count] = memory[index:end]
+        machine.index = end & 0xFFF
+        return pc + 2
+
+    return ld
+
+
+# Builders for each operation, keyed by the pattern of its specification.
+BUILDERS: Dict[int, Callable[[Machine, int], Handler]] = {
+    0x00E0: build_cls,
+    0x00EE: build_ret,
+    0x0000: build_sys,
+    0x1000: build_jp,
+    0x2000: build_call,
+    0x3000: build_se_byte,
+    0x4000: build_sne_byte,
+    0x5000: build_se,
+    0x6000: build_ld_byte,
+    0x7000: build_add_byte,
+    0x8000: build_alu(lambda vx, vy: vy),
+    0x8001: build_alu(lambda vx, vy: vx | vy),
+    0x8002: build_alu(lambda vx, vy: vx & vy),
+    0x8003: build_alu(lambda vx, vy: vx ^ vy),
+    0x8004: build_flagged(lambda vx, vy: vx + vy, lambda vx, vy: vx + vy >> 8),
+    0x8005: build_flagged(lambda vx, vy: vx - vy, lambda vx, vy: int(vx >= vy)),
+    0x8006: build_flagged(lambda vx, vy: vy >> 1, lambda vx, vy: vy & 1),
+    0x8007: build_flagged(lambda vx, vy: vy - vx, lambda vx, vy: int(vy >= vx)),
+    0x800E: build_flagged(lambda vx, vy: vy << 1, lambda vx, vy: vy >> 7),
+    0x9000: build_sne,
+    0xA000: build_ld_index,
+    0xB000: build_jp_indirect,
+    0xC000: build_rnd,
+    0xD000: build_drw,
+    0xE09E: build_skp,
+    0xE0A1: build_sknp,
+    0xF007: build_ld_delay,
+    0xF00A: build_ld_key,
+    0xF015: build_set_delay,
+    0xF018: build_set_sound,
+    0xF01E: build_add_index,
+    0xF029: build_ld_font,
+    0xF033: build_ld_bcd,
+    0xF055: build_store,
+    0xF065: build_load,
+}
@@ -0,0 +1,52 @@
+"""Decoding and writing steps shared by the entry points."""
+
+import time
+from typing import Optional
+
+from chip8_dasm.disassembler import Disassembler
+
+# The fast path of the entry point runs these steps as well as the command
+# line interface, so nothing here may import click or logging.
+
+
+def decode(
+    dasm: Disassembler, cache_dir: Optional[str] = None, no_cache: bool = False
+) -> None:
+    """Decode a ROM, through the cache unless told otherwise."""
+
+    if no_cache:
+        dasm.decode()
+        return
+
+    from chip8_dasm.cache import DisassemblyCache
+
+    cache = DisassemblyCache(cache_dir)
+    started = time.perf_counter()
+
+    if cache.load(dasm):
+        if dasm.stats is not None:
+            dasm.stats.record("cache", time.perf_counter() - started)
+    else:
+        dasm.decode()
+        cache.store(dasm)
+
+
+def write(dasm: Disassembler, output: Optional[str] = None, form: str = "text") -> None:
+    """Write a disassembly to a file, or to standard output."""
+
+    if form != "text":
+        from chip8_dasm.exporters import export
+
+        assert output is not None
+        export(dasm, output, form)
+        return
+
+    from chip8_dasm.writer import Writer
+
+    writer = Writer(dasm)
+
+    if output is None:
+        writer.generate()
+    else:
+        with open(output, "w") as stream:
+            writer.generate(stream)
@@ -0,0 +1,181 @@
+"""Code and data region module for disassembly analysis."""
+
+from enum import IntEnum
+from typing import Mapping, Optional, Tuple, TYPE_CHECKING
+
+from chip8_dasm.instructions import Flow, Instruction
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chip8_dasm.disassembler import Disassembler
+
+
+class Region(IntEnum):
+    """What the byte at an address holds."""
+
+    UNKNOWN = 0
+    CODE = 1
+    DATA = 2
+
+
+CODE = bytes([Region.CODE]) * 4
+
+# Values of a region map other than each region, used to find where a run
+# of that region ends.
+OTHERS = {
+    region: [bytes([other]) for other in Region if other != region] for region in Region
+}
+
+
+class RegionMap:
+    """
+    Classification of every address as code, data or unknown.
+
+    The map holds one byte per address of the CHIP-8 address space, so the
+    region of an address is a single index and the end of a run of one
+    region is found with a search over the bytes rather than a loop.
+    """
+
+    SIZE = 0x1000
+
+    def __init__(self, size: int = SIZE):
+        self.kinds = bytearray(size)
+
+    def __getitem__(self, address: int) -> Region:
+        """Return the region of an address."""
+
+        if not 0 <= address < len(self.kinds):
+            return Region.UNKNOWN
+
+        return Region(self.kinds[address])
+
+    def mark_code(self, disassembly: Mapping[int, Instruction]) -> None:
+        """Mark the bytes of every decoded instruction as code."""
+
+        kinds = self.kinds
+        limit = len(kinds)
+
+        for address, instruction in disassembly.items():
+            end = min(address + instruction.size, limit)
+            kinds[address:end] = CODE[: end - address]
+
+    def mark_data(self, first: int, length: int) -> None:
+        """
+        Mark addresses as data.
+
+        Only unknown addresses are marked, so code always wins.
+        """
+
+        kinds = self.kinds
+
+        for address in range(max(first, 0), min(first + length, len(kinds))):
+            if kinds[address] == Region.UNKNOWN:
+                kinds[address] = Region.DATA
+
+    def run_end(self, address: int, stop: int) -> int:
+        """Return where the run of the region at an address ends."""
+
+        ends = [stop]
+
+        for other in OTHERS[self[address]]:
+            found = self.kinds.find(other, address, stop)
+
+            if found != -1:
+                ends.append(found)
+
+        return min(ends)
+
+    def count(self, region: Region, start: int = 0, stop: Optional[int] = None) -> int:
+        """Count the addresses of a region, by default over the whole map."""
+
+        if stop is None:
+            stop = len(self.kinds)
+
+        return self.kinds.count(bytes([region]), start, stop)
+
+
+def classify(dasm: "Disassembler") -> RegionMap:
+    """
+    Classify the addresses of a disassembly as code, data or unknown.
+
+    Every decoded instruction is code. Data is found from the I register:
+    each LD I, NNN that was decoded marks the bytes at NNN that the
+    instructions following it read through I, such as the rows of a sprite
+    drawn by DXYN. Anything else is unknown. The map grows to cover ROMs
+    that run past the end of memory.
+    """
+
+    regions = RegionMap(max(RegionMap.SIZE, dasm.STARTING_ADDRESS + len(dasm.rom_data)))
+    regions.mark_code(dasm.disassembly)
+
+    for address, instruction in dasm.disassembly.items():
+        if instruction.flow is Flow.NEXT and instruction.target is not None:
+            length = data_length(dasm, address + instruction.size)
+
+            if length:
+                regions.mark_data(instruction.target, length)
+
+    return regions
+
+
+def data_length(dasm: "Disassembler", address: int) -> int:
+    """
+    Return how many bytes are read through I by the code at an address.
+
+    Instructions are followed for as long as they run straight on and leave
+    I alone. Skips are followed too, as either way the next instructions
+    use the same I.
+    """
+
+    length = 0
+    instruction = dasm.disassembly.get(address)
+
+    large_sprites = dasm.isa.large_sprites
+
+    while instruction is not None and instruction.flow in (Flow.NEXT, Flow.SKIP):
+        read, changes = access(instruction, large_sprites)
+
+        if read is not None and read > length:
+            length = read
+
+        if changes:
+            break
+
+        address += instruction.size
+        instruction = dasm.disassembly.get(address)
+
+    return length
+
+
+def access(
+    instruction: Instruction, large_sprites: bool = False
+) -> Tuple[Optional[int], bool]:
+    """
+    Return how many bytes an instruction reads through I, if any.
+
+    Also returns whether the instruction points I somewhere else, after
+    which the following instructions no longer read the same data. With
+    large sprites, DXY0 reads a 16x16 sprite.
+    """
+
+    if instruction.size == 4:
+        return (None, True)
+
+    opcode = instruction.opcode
+    operation = opcode & 0xF0FF
+
+    if opcode & 0xF000 == 0xD000:
+        height = opcode & 0xF
+        return (32 if large_sprites and height == 0 else height, False)
+
+    if operation == 0xF033:
+        return (3, False)
+
+    if operation in (0xF055, 0xF065):
+        return (((opcode & 0xF00) >> 8) + 1, True)
+
+    if opcode & 0xF00E == 0x5002:
+        return (abs(((opcode & 0xF00) >> 8) - ((opcode & 0xF0) >> 4)) + 1, False)
+
+    changes = opcode & 0xF000 == 0xA000 or operation in (0xF01E, 0xF029, 0xF030)
+
+    return (None, changes)
@@ -0,0 +1,331 @@
+"""Disassembly server module."""
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import io
+import json
+import os
+import socket
+import stat
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.client import parse_address, TIMEOUT
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import decode_table
+from chip8_dasm.writer import Writer
+
+
+class Entry:
+    """Disassembly of a ROM file held by the server."""
+
+    __slots__ = ("stamp", "digest", "dasm", "listing")
+
+    def __init__(self, stamp: Tuple[int, int], digest: str, dasm: Disassembler):
+        self.stamp = stamp
+        self.digest = digest
+        self.dasm = dasm
+        self.listing: Optional[str] = None
+
+
+class DisassemblyServer:
+    """
+    Serves disassembly requests, keeping decoded ROMs in memory.
+
+    Requests are JSON objects, one per line, naming a command and the ROM
+    file it applies to. Each connection is served concurrently, with the
+    decoding itself done on worker threads and bounded by a timeout.
+
+    ROMs are held in memory, most recently used first, and are decoded
+    again only when their contents change. A ROM is checked by its
+    modification time and size, and then by a hash of its contents when
+    those have changed. Decoding goes through the disk cache when one is
+    given, so a restarted server starts warm.
+
+    The server reads whatever files the ROM paths in requests name, so any
+    client that can connect can have it read any file it has access to.
+    Given a root directory, it only reads files under that directory.
+    """
+
+    MAX_ENTRIES = 64
+
+    def __init__(
+        self,
+        address: str,
+        timeout: float = TIMEOUT,
+        max_entries: int = MAX_ENTRIES,
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+        root: Optional[str] = None,
+    ):
+        self.address = address
+        self.root = None if root is None else os.path.realpath(root)
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.cache = DisassemblyCache(cache_dir) if use_cache else None
+        self.entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.stopped: Optional[asyncio.Event] = None
+
+    def run(self) -> None:
+        """Serve requests until a shutdown request is received."""
+
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """
+        Listen on the address and serve requests.
+
+        Raises OSError when the address is a path that is not a socket, or is
+        the socket of a server that is still running.
+        """
+
+        target = parse_address(self.address)
+        self.stopped = asyncio.Event()
+
+        # Decoding every opcode up front means requests never pay for it.
+        decode_table().precompute()
+
+        if isinstance(target, tuple):
+            server = await asyncio.start_server(self.handle, *target)
+        else:
+            remove_stale_socket(target)
+            server = await asyncio.start_unix_server(self.handle, target)
+
+        self.ready.set()
+
+        async with server:
+            await self.stopped.wait()
+
+        if not isinstance(target, tuple) and os.path.exists(target):
+            os.unlink(target)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of a connection."""
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+                if self.stopped is not None and self.stopped.is_set():
+                    break
+        finally:
+            writer.close()
+
+    async def respond(self, line: bytes) -> Dict[str, Any]:
+        """Answer a single request."""
+
+        try:
+            message = json.loads(line)
+            command = message["command"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "Malformed request"}
+
+        if command == "ping":
+            return {"ok": True}
+
+        if command == "status":
+            return self.status()
+
+        if command == "shutdown":
+            assert self.stopped is not None
+            self.stopped.set()
+            return {"ok": True}
+
+        if command not in ("disassemble", "lookup"):
+            return {"ok": False, "error": f"Unknown command: {command}"}
+
+        return await self.offload(command, message)
+
+    async def offload(self, command: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a disassemble or lookup request on a worker thread, with a timeout."""
+
+        timeout = self.request_timeout(message)
+
+        if timeout is None:
+            return {
+                "ok": False,
+                "error": f"Timeout must be a number of seconds up to {self.timeout}",
+            }
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, self.execute, command, message), timeout
+            )
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"Timed out after {timeout} seconds"}
+        except Exception as error:
+            # A request that fails in an unexpected way still gets a response,
+            # rather than leaving the client with a dropped connection.
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+    def request_timeout(self, message: Dict[str, Any]) -> Optional[float]:
+        """
+        Return the timeout a request asks for, or None if it is not allowed.
+
+        A worker thread is not stopped when its request times out, so a
+        request may shorten the limit of the server but not raise or remove
+        it.
+        """
+
+        value = message.get("timeout", self.timeout)
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+
+        return value if 0 < value <= self.timeout else None
+
+    def execute(self, command: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a disassemble or lookup request on a worker thread."""
+
+        rom_file = message.get("rom")
+        address = message.get("address", 0)
+
+        if rom_file is None:
+            return {"ok": False, "error": "No ROM file given"}
+
+        if not isinstance(rom_file, str):
+            return {"ok": False, "error": "ROM file must be a string"}
+
+        if not isinstance(address, int) or isinstance(address, bool):
+            return {"ok": False, "error": "Address must be an integer"}
+
+        try:
+            entry = self.entry(rom_file)
+        except OSError as error:
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+        if command == "disassemble":
+            return {"ok": True, "output": self.listing(entry)}
+
+        instruction = entry.dasm.disassembly.get(address)
+
+        return {
+            "ok": True,
+            "address": address,
+            "instruction": None if instruction is None else instruction.text,
+            "label": address in entry.dasm.labels,
+        }
+
+    def entry(self, rom_file: str) -> Entry:
+        """
+        Return the disassembly of a ROM file, decoding it if it changed.
+
+        Raises PermissionError when the file is outside the root directory.
+        """
+
+        path = os.path.realpath(rom_file)
+
+        if self.root is not None and os.path.commonpath([self.root, path]) != self.root:
+            raise PermissionError(f"{rom_file} is outside {self.root}")
+
+        status = os.stat(path)
+        stamp = (status.st_mtime_ns, status.st_size)
+
+        with self.lock:
+            entry = self.entries.get(path)
+
+            if entry is not None and entry.stamp == stamp:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        with open(path, "rb") as file:
+            rom_data = file.read()
+
+        digest = hashlib.sha256(rom_data).hexdigest()
+        changed = entry is None or entry.digest != digest
+
+        if entry is None or changed:
+            entry = Entry(stamp, digest, self.decode(rom_data))
+        else:
+            entry.stamp = stamp
+
+        with self.lock:
+            if changed:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            self.entries[path] = entry
+            self.entries.move_to_end(path)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        return entry
+
+    def decode(self, rom_data: bytes) -> Disassembler:
+        """Decode a ROM, through the disk cache when there is one."""
+
+        dasm = Disassembler()
+        dasm.rom_data = bytearray(rom_data)
+
+        if self.cache is None:
+            dasm.decode()
+        elif not self.cache.load(dasm):
+            dasm.decode()
+            self.cache.store(dasm)
+
+        return dasm
+
+    @staticmethod
+    def listing(entry: Entry) -> str:
+        """Return the rendered disassembly of an entry."""
+
+        if entry.listing is None:
+            stream = io.StringIO()
+            Writer(entry.dasm).write(stream)
+            entry.listing = stream.getvalue()
+
+        return entry.listing
+
+    def status(self) -> Dict[str, Any]:
+        """Report on the ROMs held by the server."""
+
+        with self.lock:
+            roms = list(self.entries)
+
+        return {"ok": True, "roms": roms, "hits": self.hits, "misses": self.misses}
+
+
+def remove_stale_socket(path: str) -> None:
+    """
+    Remove a Unix domain socket left behind by a server that has stopped.
+
+    Raises OSError when something other than a socket is at the path, or a
+    server is still listening on it.
+    """
+
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+
+    raise FileExistsError(f"A server is already listening on {path}")
@@ -0,0 +1,421 @@
+"""ROM similarity module based on MinHash signatures."""
+
+from array import array
+from functools import lru_cache
+import os
+from pathlib import Path
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import Instruction
+
+MASK64 = (1 << 64) - 1
+
+Signature = Tuple[int, ...]
+
+
+class Similar(NamedTuple):
+    """ROM in a group of near-duplicates, with its similarity to the first."""
+
+    rom_file: str
+    similarity: float
+
+
+class MinHash:
+    """
+    MinHash signatures of ROMs over shingles of their decoded instructions.
+
+    Instructions are normalized by dropping their address and byte operands,
+    so code that has been moved or has different constants still shares
+    shingles. A shingle is a run of consecutive instructions, as they appear
+    in a listing.
+
+    Signatures use one permutation hashing: each shingle is hashed once and
+    lands in one of the bins of the signature, which keeps the smallest hash
+    it sees. Empty bins borrow from the next bin that is not empty. This
+    makes a signature linear in the size of the ROM rather than in the size
+    of the ROM times the number of hash functions. The fraction of bins two
+    signatures agree on estimates the Jaccard similarity of their shingles.
+
+    A ROM with no shingles, such as one that is all data, has an empty
+    signature, which is not similar to any other.
+    """
+
+    SHINGLE = 4
+    BINS = 128
+
+    def __init__(self, shingle: int = SHINGLE, bins: int = BINS):
+        self.shingle = shingle
+        self.bins = bins
+        self.empty = MASK64 // bins
+        self.offset = self.empty + 1
+
+    def shingles(self, dasm: Disassembler) -> Set[int]:
+        """Return the shingles of a disassembly, packed into integers."""
+
+        result = set()
+        modulus = 1 << 16 * self.shingle
+        value = run = 0
+        expected = None
+        disassembly = dasm.disassembly
+
+        for address in sorted(disassembly):
+            instruction = disassembly[address]
+
+            if address != expected:
+                if 0 < run < self.shingle:
+                    result.add(value)
+
+                value = run = 0
+
+            value = (value << 16 | token(instruction)) % modulus
+            run += 1
+            expected = address + instruction.size
+
+            if run >= self.shingle:
+                result.add(value)
+
+        if 0 < run < self.shingle:
+            result.add(value)
+
+        return result
+
+    def signature(self, shingles: Iterable[int]) -> Signature:
+        """Return the MinHash signature of a set of shingles."""
+
+        bins = self.bins
+        values = [self.empty] * bins
+
+        for shingle in shingles:
+            hashed = mix(shingle)
+            slot = hashed % bins
+            value = hashed // bins
+
+            if value < values[slot]:
+                values[slot] = value
+
+        return self.densify(values)
+
+    def densify(self, values: List[int]) -> Signature:
+        """Fill each empty bin from the next bin that is not empty."""
+
+        filled = [index for index, value in enumerate(values) if value != self.empty]
+
+        if not filled:
+            return ()
+
+        if len(filled) == self.bins:
+            return tuple(values)
+
+        result = list(values)
+
+        for index in range(self.bins):
+            if values[index] != self.empty:
+                continue
+
+            distance = 1
+
+            while values[(index + distance) % self.bins] == self.empty:
+                distance += 1
+
+            source = values[(index + distance) % self.bins]
+            result[index] = source + distance * self.offset
+
+        return tuple(result)
+
+    def fingerprint(self, dasm: Disassembler) -> Signature:
+        """Return the signature of a decoded ROM."""
+
+        return self.signature(self.shingles(dasm))
+
+
+class SignatureCache:
+    """
+    Stores signatures next to the cached disassembly of each ROM.
+
+    A signature is kept in the same directory as the disassembly cache
+    entry, under the same hash of the ROM, so it is found without decoding
+    the ROM and is evicted along with the entry.
+    """
+
+    MAGIC = b"C8MH"
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct("<4sHHH")
+    SUFFIX = ".c8mh"
+
+    def __init__(self, cache: DisassemblyCache, minhash: MinHash):
+        self.cache = cache
+        self.minhash = minhash
+
+    def path(self, dasm: Disassembler) -> Path:
+        """Return the file that holds the signature of a ROM."""
+
+        return self.cache.path(self.cache.key(dasm)).with_suffix(self.SUFFIX)
+
+    def load(self, dasm: Disassembler) -> Optional[Signature]:
+        """Return the stored signature of a ROM, if there is one."""
+
+        try:
+            data = self.path(dasm).read_bytes()
+        except OSError:
+            return None
+
+        header = (
+            self.MAGIC,
+            self.FORMAT_VERSION,
+            self.minhash.shingle,
+            self.minhash.bins,
+        )
+
+        if len(data) not in (
+            self.HEADER.size,
+            self.HEADER.size + 8 * self.minhash.bins,
+        ):
+            return None
+
+        if self.HEADER.unpack_from(data) != header:
+            return None
+
+        values = array("Q")
+        start = self.HEADER.size
+        values.frombytes(data[start:])
+
+        if sys.byteorder == "big":
+            values.byteswap()
+
+        return tuple(values)
+
+    def store(self, dasm: Disassembler, signature: Signature) -> None:
+        """Store the signature of a ROM."""
+
+        path = self.path(dasm)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        values = array("Q", signature)
+
+        if sys.byteorder == "big":
+            values.byteswap()
+
+        header = self.HEADER.pack(
+            self.MAGIC, self.FORMAT_VERSION, self.minhash.shingle, self.minhash.bins
+        )
+        import tempfile
+
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent)
+
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(header + values.tobytes())
+
+        os.replace(temporary, path)
+
+
+class Fingerprinter:
+    """
+    Computes the signatures of ROM files, through the caches when allowed.
+
+    With caching, a ROM whose signature is stored is not decoded at all, and
+    one that is decoded goes through the disassembly cache.
+    """
+
+    PATTERN = "*.ch8"
+
+    def __init__(
+        self,
+        minhash: Optional[MinHash] = None,
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+    ):
+        self.minhash = minhash or MinHash()
+        self.cache = DisassemblyCache(cache_dir) if use_cache else None
+        self.signatures = (
+            SignatureCache(self.cache, self.minhash) if self.cache else None
+        )
+
+    def fingerprint(self, path: str) -> Signature:
+        """Return the signature of a ROM file."""
+
+        dasm = Disassembler()
+
+        with open(path, "rb") as file:
+            dasm.rom_data = bytearray(file.read())
+
+        if self.cache is None or self.signatures is None:
+            dasm.decode()
+            return self.minhash.fingerprint(dasm)
+
+        signature = self.signatures.load(dasm)
+
+        if signature is None:
+            if not self.cache.load(dasm):
+                dasm.decode()
+                self.cache.store(dasm)
+
+            signature = self.minhash.fingerprint(dasm)
+            self.signatures.store(dasm, signature)
+
+        return signature
+
+    def fingerprint_all(
+        self, directory: str
+    ) -> Tuple[Dict[str, Signature], List[Tuple[str, str]]]:
+        """
+        Return the signatures of every ROM in a directory.
+
+        A ROM that cannot be read or decoded is reported as an error, as a
+        pair of its path and the reason, without stopping the others.
+        """
+
+        signatures = {}
+        errors = []
+
+        for path in sorted(Path(directory).rglob(self.PATTERN)):
+            if not path.is_file():
+                continue
+
+            try:
+                signatures[str(path)] = self.fingerprint(str(path))
+            except (OSError, ValueError) as error:
+                errors.append((str(path), f"{type(error).__name__}: {error}"))
+
+        return signatures, errors
+
+
+class LshIndex:
+    """
+    Buckets signatures so that similar ones are likely to share a bucket.
+
+    A signature is split into bands of rows, and each band is a bucket key.
+    Two signatures become candidates when any of their bands are equal, so
+    finding candidates is linear in the number of signatures rather than
+    quadratic. With 32 bands of 4 rows, signatures that are half similar
+    are candidates about 87% of the time, and ones that are 80% similar
+    almost always are.
+    """
+
+    BANDS = 32
+
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self.buckets: Dict[Tuple[int, Signature], List[int]] = {}
+
+    def add(self, item: int, signature: Signature) -> None:
+        """Put a signature in its buckets."""
+
+        rows = len(signature) // self.bands
+
+        for band in range(self.bands):
+            start = band * rows
+            end = start + rows
+            key = (band, signature[start:end])
+            self.buckets.setdefault(key, []).append(item)
+
+    def candidates(self) -> Iterator[Tuple[int, int]]:
+        """Generate the pairs of items that share a bucket, each pair once."""
+
+        seen: Set[Tuple[int, int]] = set()
+
+        for items in self.buckets.values():
+            for position, first in enumerate(items, 1):
+                for second in items[position:]:
+                    pair = (first, second) if first < second else (second, first)
+
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+
+    if not first:
+        return 0.0
+
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def group(
+    signatures: Dict[str, Signature], threshold: float, bands: int = LshIndex.BANDS
+) -> List[List[Similar]]:
+    """
+    Group ROMs whose signatures are at least as similar as a threshold.
+
+    Candidate pairs come from the LSH buckets and are kept when their
+    signatures agree closely enough. Groups are the connected sets of kept
+    pairs, listed with the similarity of each ROM to the first one. ROMs
+    with empty signatures are left out.
+    """
+
+    names = sorted(signatures)
+    index = LshIndex(bands)
+    parents = list(range(len(names)))
+
+    for item, name in enumerate(names):
+        if signatures[name]:
+            index.add(item, signatures[name])
+
+    for first, second in index.candidates():
+        if similarity(signatures[names[first]], signatures[names[second]]) >= threshold:
+            parents[find(parents, second)] = find(parents, first)
+
+    members: Dict[int, List[int]] = {}
+
+    for item in range(len(names)):
+        members.setdefault(find(parents, item), []).append(item)
+
+    groups = []
+
+    for items in members.values():
+        if len(items) < 2:
+            continue
+
+        base = signatures[names[items[0]]]
+        groups.append(
+            [
+                Similar(names[item], similarity(base, signatures[names[item]]))
+                for item in items
+            ]
+        )
+
+    return groups
+
+
+def find(parents: List[int], item: int) -> int:
+    """Find the representative of an item, halving the path to it."""
+
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+
+    return item
+
+
+@lru_cache(maxsize=None)
+def token(instruction: Instruction) -> int:
+    """Return an opcode with its address and byte operands cleared."""
+
+    fields = instruction.spec.fields
+
+    if "nnnn" in fields:
+        return instruction.opcode >> 16
+
+    mask = 0xFFFF
+
+    if "nnn" in fields:
+        mask &= 0xF000
+
+    if "nn" in fields:
+        mask &= 0xFF00
+
+    return instruction.opcode & mask
+
+
+def mix(value: int) -> int:
+    """Hash a 64-bit value, with a finalizer that is the same everywhere."""
+
+    value = (value ^ value >> 30) * 0xBF58476D1CE4E5B9 & MASK64
+    value = (value ^ value >> 27) * 0x94D049BB133111EB & MASK64
+
+    return value ^ value >> 31
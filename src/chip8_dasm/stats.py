@@ -0,0 +1,148 @@
+"""Instrumentation module for disassembly processing."""
+
+from contextlib import contextmanager
+import cProfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Union
+
+from chip8_dasm.instructions import Instruction
+
+Hook = Callable[[str, float], None]
+
+
+class Timer:
+    """Running total of the times recorded for a phase."""
+
+    __slots__ = ("count", "total", "longest")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one more measurement."""
+
+        self.count += 1
+        self.total += seconds
+
+        if seconds > self.longest:
+            self.longest = seconds
+
+
+class Stats:
+    """
+    Collects counters and timers for the phases of a disassembly.
+
+    Statistics are opt-in. Nothing is measured unless a Stats instance is
+    handed to the disassembler, and the disassembler only checks for one
+    once per phase, so there is no cost per instruction when they are not
+    asked for. Hooks are called with the name of a phase and the seconds it
+    took each time a timer is recorded.
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, Timer] = {}
+        self.hooks: List[Hook] = []
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call a function each time a phase is timed."""
+
+        self.hooks.append(hook)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a measurement to a timer."""
+
+        timer = self.timers.get(name)
+
+        if timer is None:
+            timer = self.timers[name] = Timer()
+
+        timer.add(seconds)
+
+        for hook in self.hooks:
+            hook(name, seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the body of a with statement."""
+
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def classify(self, disassembly: Mapping[int, Instruction]) -> None:
+        """Count the decoded instructions by operation."""
+
+        for instruction in disassembly.values():
+            self.count(f"op.{instruction.mnemonic}")
+
+    def as_dict(self) -> Dict[str, Dict[str, Union[int, Dict[str, float]]]]:
+        """Return the statistics as plain data."""
+
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {
+                    "count": timer.count,
+                    "total": timer.total,
+                    "longest": timer.longest,
+                }
+                for name, timer in self.timers.items()
+            },
+        }
+
+    def report(self) -> Iterator[str]:
+        """Generate the lines of a readable report."""
+
+        for name, timer in self.timers.items():
+            yield (
+                f"{name:<16}{timer.count:8} x {timer.total * 1e3:10.3f} ms"
+                f"   longest {timer.longest * 1e3:8.3f} ms"
+            )
+
+        for name, value in sorted(self.counters.items()):
+            yield f"{name:<16}{value:8}"
+
+
+@contextmanager
+def capture(
+    profile_file: Optional[str] = None, memory_file: Optional[str] = None
+) -> Iterator[None]:
+    """
+    Profile the body of a with statement.
+
+    When a profile file is given, cProfile statistics are written to it in
+    the format read by pstats. When a memory file is given, a tracemalloc
+    snapshot is written to it, which Snapshot.load reads back.
+    """
+
+    profiler = cProfile.Profile() if profile_file else None
+
+    if memory_file:
+        tracemalloc.start()
+
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            assert profile_file is not None
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+
+        if memory_file:
+            tracemalloc.take_snapshot().dump(memory_file)
+            tracemalloc.stop()
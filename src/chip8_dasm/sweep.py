@@ -0,0 +1,146 @@
+"""Linear-sweep disassembly module."""
+
+from typing import Dict, List, Tuple
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import CHIP8, decode_table, Instruction, OpcodeSpec
+from chip8_dasm.loader import RomData
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+
+class LinearSweep:
+    """
+    Decodes every word of a ROM at once.
+
+    Unlike the traversal performed by the disassembler, a linear sweep does
+    not follow the flow of control. Every aligned word is decoded, along with
+    every unaligned word when asked for, using array operations over the
+    whole ROM. This requires NumPy.
+    """
+
+    STARTING_ADDRESS = Disassembler.STARTING_ADDRESS
+    UNKNOWN = -1
+
+    def __init__(
+        self,
+        rom_data: RomData,
+        unaligned: bool = False,
+        specs: Tuple[OpcodeSpec, ...] = CHIP8,
+    ):
+        if np is None:
+            raise ImportError(
+                "Linear sweep requires NumPy. Install chip8-dasm[sweep] to use it."
+            )
+
+        self.specs = specs
+        self.unaligned = unaligned
+
+        data = np.frombuffer(rom_data, dtype=np.uint8)
+        step = 1 if unaligned else 2
+        offsets = np.arange(0, max(len(data) - 1, 0), step)
+
+        self.addresses = offsets + self.STARTING_ADDRESS
+        self.opcodes = data[offsets].astype(np.uint16) << 8 | data[offsets + 1]
+        self.operation = self.opcodes >> 12
+        self.x = self.opcodes >> 8 & 0xF
+        self.y = self.opcodes >> 4 & 0xF
+        self.n = self.opcodes & 0xF
+        self.nn = self.opcodes & 0xFF
+        self.nnn = self.opcodes & 0xFFF
+        self.kinds = self.classify()
+
+    def classify(self) -> "np.ndarray":
+        """
+        Find the index of the specification that each word matches.
+
+        Words that match no specification are marked as unknown. The
+        specifications are applied in reverse so that, as with the decode
+        table, the first matching specification wins.
+        """
+
+        kinds = np.full(len(self.opcodes), self.UNKNOWN, dtype=np.int16)
+
+        for index in range(len(self.specs) - 1, -1, -1):
+            spec = self.specs[index]
+            kinds[self.opcodes & spec.mask == spec.pattern] = index
+
+        return kinds
+
+    def statistics(self) -> Dict[str, int]:
+        """Count the words decoded as each operation."""
+
+        counts = np.bincount(self.kinds + 1, minlength=len(self.specs) + 1)
+        result = {"unknown": int(counts[0])}
+
+        for index, spec in enumerate(self.specs):
+            if counts[index + 1]:
+                name = spec.mnemonic.split(" ", 1)[0]
+                result[name] = result.get(name, 0) + int(counts[index + 1])
+
+        return result
+
+    def unknown_regions(self, minimum: int = 2) -> List[Tuple[int, int]]:
+        """
+        Find runs of words that do not decode to any operation.
+
+        Such runs are a strong hint of data rather than code. Each region is
+        given as the address of its first word and the address just past its
+        last word.
+        """
+
+        unknown = np.concatenate(([0], self.kinds == self.UNKNOWN, [0])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(unknown))
+        step = 1 if self.unaligned else 2
+        regions = []
+
+        for first, last in zip(edges[::2], edges[1::2]):
+            if last - first >= minimum:
+                regions.append(
+                    (int(self.addresses[first]), int(self.addresses[last - 1]) + step)
+                )
+
+        return regions
+
+    def disassembly(self) -> Dict[int, Instruction]:
+        """Return decoded words in the same form as the disassembler."""
+
+        table = decode_table(self.specs)
+        known = self.kinds != self.UNKNOWN
+
+        return {
+            int(address): table[int(opcode)]
+            for address, opcode in zip(self.addresses[known], self.opcodes[known])
+        }
+
+    def compare(self, dasm: Disassembler) -> Dict[str, List[int]]:
+        """
+        Compare the sweep with the result of a traversal.
+
+        Addresses are grouped by whether both agree on the instruction, both
+        decoded something different, or only one of them decoded the address.
+        """
+
+        sweep = self.disassembly()
+        traversal = dasm.disassembly
+        result: Dict[str, List[int]] = {
+            "agree": [],
+            "differ": [],
+            "sweep_only": [],
+            "traversal_only": [],
+        }
+
+        for address in sorted(set(sweep) | set(traversal)):
+            if address not in traversal:
+                result["sweep_only"].append(address)
+            elif address not in sweep:
+                result["traversal_only"].append(address)
+            elif sweep[address] == traversal[address]:
+                result["agree"].append(address)
+            else:
+                result["differ"].append(address)
+
+        return result
@@ -0,0 +1,94 @@
+"""Tracing module for disassembly processing."""
+
+from typing import Callable, Iterable, Optional
+
+Sink = Callable[[str], None]
+
+
+class Tracer:
+    """
+    Reports on the progress of a disassembly.
+
+    A tracer is only consulted when it is enabled, so nothing is formatted
+    during a decode that does not ask for a trace. Messages go to a sink,
+    which by default is the module logger at debug level, but can be any
+    callable that accepts a string.
+    """
+
+    OFF = 0
+    CONTEXT = 1
+    INSTRUCTION = 2
+
+    LEVELS = {"off": OFF, "context": CONTEXT, "instruction": INSTRUCTION}
+
+    def __init__(self, level: int = INSTRUCTION, sink: Optional[Sink] = None):
+        self.level = level
+        self.sink = sink if sink is not None else self.default_sink()
+
+    @staticmethod
+    def default_sink() -> Sink:
+        """Return the debug level of the module logger."""
+
+        # Importing logging takes a noticeable part of startup, so it is
+        # only done once a tracer is made.
+        import logging
+
+        return logging.getLogger(__name__).debug
+
+    def __bool__(self) -> bool:
+        """Report whether the tracer is enabled."""
+
+        return self.level > self.OFF
+
+    @staticmethod
+    def from_name(name: str, sink: Optional[Sink] = None) -> "Tracer":
+        """Create a tracer from the name of a level."""
+
+        try:
+            return Tracer(Tracer.LEVELS[name], sink)
+        except KeyError:
+            raise ValueError(f"Unknown trace level: {name}") from None
+
+    def context(
+        self,
+        address: int,
+        all_contexts: Iterable[int],
+        current_contexts: Iterable[int],
+        labels: Iterable[int],
+    ) -> None:
+        """Report the start of a context along with the traversal state."""
+
+        self.sink(f"Context: {address} ({hex(address)})")
+        self.state(all_contexts, current_contexts, labels)
+
+    def instruction(
+        self,
+        address: int,
+        all_contexts: Iterable[int],
+        current_contexts: Iterable[int],
+        labels: Iterable[int],
+    ) -> None:
+        """Report an instruction along with the traversal state."""
+
+        if self.level < self.INSTRUCTION:
+            return
+
+        self.sink(f"Current Address: {address} ({hex(address)})")
+        self.state(all_contexts, current_contexts, labels)
+
+    def unknown(self, address: int, opcode: int) -> None:
+        """Report an opcode that could not be decoded."""
+
+        self.sink("Unknown opcode: 0x{:04x} at {}".format(opcode, hex(address)))
+
+    def state(
+        self,
+        all_contexts: Iterable[int],
+        current_contexts: Iterable[int],
+        labels: Iterable[int],
+    ) -> None:
+        """Report the contexts and labels found so far."""
+
+        self.sink(f"All Contexts: {list(all_contexts)}")
+        self.sink(f"Current Contexts: {list(current_contexts)}")
+        self.sink(f"Labels: {list(labels)}")
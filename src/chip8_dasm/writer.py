@@ -1,37 +1,133 @@
 """Writer implementation for CHIP-8 ROM disassemebly."""
 
-from typing import Tuple
+from itertools import islice
+import sys
+from typing import Dict, Iterator, NamedTuple, Optional, TextIO, Tuple, TYPE_CHECKING
 
 from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import Instruction
+from chip8_dasm.regions import classify, Region, RegionMap
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chip8_dasm.stats import Stats
+
+HEX_BYTES = tuple("0x{:02x}".format(byte) for byte in range(256))
+
+
+class Entry(NamedTuple):
+    """Instruction, or run of bytes that are not instructions, in a listing."""
+
+    address: int
+    end: int
+    instruction: Optional[Instruction]
 
 
 class Writer:
     """Simple abstraction for a disassembly writer."""
 
     STARTING_ADDRESS = 0x200
+    BATCH_SIZE = 1024
+    DATA_WIDTH = 8
 
     def __init__(self, dasm: Disassembler):
         self.dasm = dasm
+        self.rendered: Dict[int, str] = {}
+        self.regions: Optional[RegionMap] = None
+
+    def generate(self, stream: Optional[TextIO] = None) -> None:
+        """
+        Write out disassembly information.
 
-    def generate(self) -> None:
-        """Write out disassembly information."""
+        The disassembly goes to standard output unless a stream is provided.
+        """
 
-        dasm_output = self.generate_disassembly_buffer(self.STARTING_ADDRESS)
+        if stream is None:
+            self.write(sys.stdout)
+            sys.stdout.write("\n")
+        else:
+            self.write(stream)
 
-        print(dasm_output)
+    def write(self, stream: TextIO, address: int = STARTING_ADDRESS) -> None:
+        """
+        Write disassembly lines to a text stream.
 
-    def generate_disassembly_buffer(self, address: int) -> str:
-        """Create buffer structure for disassembly data."""
+        Lines are written in fixed-size batches as they are generated, so the
+        complete listing is never held in memory.
+        """
+
+        stats = self.dasm.stats
+
+        if stats is not None:
+            with stats.timer("render"):
+                self.write_batches(stream, address, stats)
+            return
+
+        self.write_batches(stream, address)
 
-        dasm_buffer = "start:\n"
+    def write_batches(
+        self, stream: TextIO, address: int, stats: Optional["Stats"] = None
+    ) -> None:
+        """Write disassembly lines in batches, counting them when asked to."""
+
+        lines = self.lines(address)
+        batch = "".join(islice(lines, self.BATCH_SIZE))
+
+        while batch:
+            stream.write(batch)
+
+            if stats is not None:
+                stats.count("lines", batch.count("\n"))
+
+            batch = "".join(islice(lines, self.BATCH_SIZE))
+
+    def lines(self, address: int = STARTING_ADDRESS) -> Iterator[str]:
+        """Generate the lines of the disassembly, one at a time."""
+
+        yield "start:\n"
+
+        self.regions = classify(self.dasm)
+        end = self.end_rom_file()
+
+        while address < end:
+            label = self.generate_labels(address)
+
+            if label:
+                yield label
+
+            yield self.generate_addresses(address)
 
-        while address < self.end_rom_file():
-            dasm_buffer += self.generate_labels(address)
-            dasm_buffer += self.generate_addresses(address)
             line, address = self.generate_instructions(address)
-            dasm_buffer += line
 
-        return dasm_buffer
+            if line:
+                yield line
+
+    def entries(self, address: int = STARTING_ADDRESS) -> Iterator[Entry]:
+        """
+        Generate what the lines of the disassembly hold, one line at a time.
+
+        Runs of bytes are split the same way as db lines, so each entry
+        matches a line of the text listing.
+        """
+
+        self.regions = classify(self.dasm)
+        disassembly = self.dasm.disassembly
+        end = self.end_rom_file()
+
+        while address < end:
+            instruction = disassembly.get(address)
+
+            if instruction is not None:
+                stop = address + instruction.size
+            else:
+                stop = self.data_end(address)
+
+            yield Entry(address, stop, instruction)
+            address = stop
+
+    def generate_disassembly_buffer(self, address: int) -> str:
+        """Create buffer structure for disassembly data."""
+
+        return "".join(self.lines(address))
 
     def generate_labels(self, address: int) -> str:
         """Iterate through all labels for the disassembly buffer."""
@@ -52,15 +148,64 @@ class Writer:
         """Iterate through all instructions for the disassembly buffer."""
 
         line = ""
+        instruction = self.dasm.disassembly.get(address)
 
-        if address in self.dasm.disassembly:
-            line = "     {}\n".format(self.dasm.disassembly[address])
-            address += 2
+        if instruction is not None:
+            line = "     {}\n".format(self.render(instruction))
+            address += instruction.size
         else:
-            address += 1
+            line, address = self.generate_data(address)
 
         return (line, address)
 
+    def generate_data(self, address: int) -> Tuple[str, int]:
+        """
+        Render a run of bytes that are not instructions as a db line.
+
+        A line holds up to DATA_WIDTH bytes, and ends early where the region
+        changes or where a label falls, so every label still starts a line.
+        Bytes that are not known to be data are marked as unknown.
+        """
+
+        stop = self.data_end(address)
+        assert self.regions is not None
+
+        first = address - self.STARTING_ADDRESS
+        last = stop - self.STARTING_ADDRESS
+        data = self.dasm.rom_data[first:last]
+        line = "     db " + ", ".join(map(HEX_BYTES.__getitem__, data))
+
+        if self.regions.kinds[address] == Region.UNKNOWN:
+            line += "  ; unknown"
+
+        return (line + "\n", stop)
+
+    def data_end(self, address: int) -> int:
+        """Return where the db line that starts at an address ends."""
+
+        if self.regions is None:
+            self.regions = classify(self.dasm)
+
+        stop = min(address + self.DATA_WIDTH, self.end_rom_file())
+        stop = self.regions.run_end(address, stop)
+        label = self.dasm.labels.find(address + 1, stop)
+
+        return stop if label == -1 else label
+
+    def render(self, instruction: Instruction) -> str:
+        """
+        Render an instruction as assembly text.
+
+        Text only depends on the opcode, so each opcode is rendered once.
+        """
+
+        text = self.rendered.get(instruction.opcode)
+
+        if text is None:
+            text = self.rendered[instruction.opcode] = instruction.text
+
+        return text
+
     def end_rom_file(self) -> int:
         """Return the length of the non-interpreter portion of ROM."""
 
@@ -0,0 +1,153 @@
+"""Cross-reference module for disassembly analysis."""
+
+from enum import IntEnum
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from chip8_dasm.instructions import Flow, Instruction
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chip8_dasm.disassembler import Disassembler
+
+REGISTERS = 16
+
+
+class XrefKind(IntEnum):
+    """How an instruction refers to an address."""
+
+    JUMP = 0
+    CALL = 1
+    LOAD = 2
+    SKIP = 3
+    INDIRECT = 4
+
+
+KINDS = {
+    Flow.JUMP: XrefKind.JUMP,
+    Flow.CALL: XrefKind.CALL,
+    Flow.NEXT: XrefKind.LOAD,
+    Flow.SKIP: XrefKind.SKIP,
+    Flow.INDIRECT: XrefKind.INDIRECT,
+}
+
+
+class CrossReferences:
+    """
+    Index of who refers to each address and who touches each register.
+
+    The disassembler already records the instructions that refer to each
+    address as it decodes, and keeps those records up to date when the ROM
+    is patched or loaded from the cache. The index groups them by the kind
+    of reference, and adds the instructions that define and use each of the
+    V registers, in a single pass over the disassembly. Every lookup after
+    that is a dictionary or list index.
+
+    The index is a snapshot. A disassembly that is patched afterwards needs
+    a new index.
+    """
+
+    def __init__(self, dasm: "Disassembler"):
+        self.referrers: Dict[int, Dict[XrefKind, List[int]]] = {}
+        self.definitions: List[List[int]] = [[] for _ in range(REGISTERS)]
+        self.uses: List[List[int]] = [[] for _ in range(REGISTERS)]
+
+        self.build(dasm)
+
+    def build(self, dasm: "Disassembler") -> None:
+        """Index the references and register accesses of a disassembly."""
+
+        for target, referrers in dasm.references.items():
+            kinds: Dict[XrefKind, List[int]] = {}
+
+            for referrer in sorted(referrers):
+                kind = KINDS[dasm.disassembly[referrer].flow]
+                kinds.setdefault(kind, []).append(referrer)
+
+            self.referrers[target] = kinds
+
+        for address in sorted(dasm.disassembly):
+            defined, used = accesses(dasm.disassembly[address])
+
+            for register in defined:
+                self.definitions[register].append(address)
+
+            for register in used:
+                self.uses[register].append(address)
+
+    def to(self, address: int, kind: Optional[XrefKind] = None) -> List[int]:
+        """Return the addresses of instructions that refer to an address."""
+
+        kinds = self.referrers.get(address)
+
+        if kinds is None:
+            return []
+
+        if kind is not None:
+            return kinds.get(kind, [])
+
+        return sorted(referrer for group in kinds.values() for referrer in group)
+
+    def kinds(self, address: int) -> Dict[XrefKind, List[int]]:
+        """Return the instructions that refer to an address, by kind."""
+
+        return self.referrers.get(address, {})
+
+    def defined(self, register: int) -> List[int]:
+        """Return the addresses of instructions that write a register."""
+
+        return self.definitions[register]
+
+    def used(self, register: int) -> List[int]:
+        """Return the addresses of instructions that read a register."""
+
+        return self.uses[register]
+
+
+@lru_cache(maxsize=None)
+def accesses(instruction: Instruction) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Return the registers an instruction writes and the ones it reads."""
+
+    spec = instruction.spec
+
+    return (
+        registers(instruction, spec.defines),
+        registers(instruction, spec.uses),
+    )
+
+
+def registers(instruction: Instruction, names: Tuple[str, ...]) -> Tuple[int, ...]:
+    """Resolve the register names of a specification for an instruction."""
+
+    opcode = instruction.opcode
+    result: List[int] = []
+
+    for name in names:
+        if name == "x":
+            result.append((opcode & 0xF00) >> 8)
+        elif name == "y":
+            result.append((opcode & 0xF0) >> 4)
+        elif name == "0-x":
+            result.extend(range(((opcode & 0xF00) >> 8) + 1))
+        elif name == "x-y":
+            first, last = sorted(((opcode & 0xF00) >> 8, (opcode & 0xF0) >> 4))
+            result.extend(range(first, last + 1))
+        else:
+            result.append(int(name, 16))
+
+    return tuple(sorted(set(result)))
+
+
+def parse_register(name: str) -> int:
+    """
+    Parse the name of a register, such as V3, VF or just 3.
+
+    Raises ValueError when it does not name one of the V registers.
+    """
+
+    digits = name[1:] if name[:1] in ("V", "v") else name
+    register = int(digits, 16)
+
+    if not 0 <= register < REGISTERS:
+        raise ValueError(f"Not a register: {name}")
+
+    return register
@@ -0,0 +1,45 @@
+from chip8_dasm.addresses import AddressSet
+from expects import be_false, be_true, equal, expect
+
+
+def test_add_deduplicates() -> None:
+    addresses = AddressSet()
+
+    expect(addresses.add(0x24E)).to(be_true)
+    expect(addresses.add(0x24E)).to(be_false)
+    expect(len(addresses)).to(equal(1))
+
+
+def test_iterates_in_order() -> None:
+    addresses = AddressSet([0x300, 0x202, 0xFFF, 0x202])
+
+    expect(list(addresses)).to(equal([0x202, 0x300, 0xFFF]))
+
+
+def test_out_of_range_addresses_are_ignored() -> None:
+    addresses = AddressSet()
+
+    expect(addresses.add(0x1000)).to(be_false)
+    expect(0x1000 in addresses).to(be_false)
+    expect(-1 in addresses).to(be_false)
+
+
+def test_discard() -> None:
+    addresses = AddressSet([0x200, 0x202])
+    addresses.discard(0x200)
+    addresses.discard(0x204)
+
+    expect(list(addresses)).to(equal([0x202]))
+    expect(len(addresses)).to(equal(1))
+
+
+def test_equality() -> None:
+    expect(AddressSet([0x200, 0x202])).to(equal(AddressSet([0x202, 0x200])))
+
+
+def test_find() -> None:
+    addresses = AddressSet([0x202, 0x300])
+
+    expect(addresses.find(0x200, 0x400)).to(equal(0x202))
+    expect(addresses.find(0x203, 0x400)).to(equal(0x300))
+    expect(addresses.find(0x203, 0x300)).to(equal(-1))
@@ -0,0 +1,65 @@
+import json
+import os.path as path
+from pathlib import Path
+import shutil
+
+from chip8_dasm import cli
+from chip8_dasm.batch import Batch
+from click.testing import CliRunner
+from expects import be_none, contain, equal, expect, start_with
+import pytest
+
+
+@pytest.fixture
+def roms(tmp_path: Path) -> Path:
+    rom = path.join(path.dirname(__file__), "fixtures", "test_opcode.ch8")
+    directory = tmp_path / "roms"
+    (directory / "nested").mkdir(parents=True)
+
+    shutil.copy(rom, directory / "b.ch8")
+    shutil.copy(rom, directory / "nested" / "a.ch8")
+    (directory / "broken.ch8").symlink_to(directory / "missing.ch8")
+    (directory / "notes.txt").write_text("not a rom")
+
+    return directory
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_results_are_ordered(roms: Path, tmp_path: Path, jobs: int) -> None:
+    results = Batch(str(roms), str(tmp_path / "out"), jobs).run()
+
+    expect([Path(result.rom_file).name for result in results]).to(
+        equal(["b.ch8", "broken.ch8", "a.ch8"])
+    )
+
+
+def test_batch_isolates_errors(roms: Path, tmp_path: Path) -> None:
+    results = Batch(str(roms), str(tmp_path / "out"), 1).run()
+    broken = results[1]
+
+    expect(broken.output_file).to(be_none)
+    expect(broken.error).to(start_with("FileNotFoundError"))
+    expect(results[0].error).to(be_none)
+    expect(results[2].error).to(be_none)
+
+
+def test_batch_writes_outputs(roms: Path, tmp_path: Path) -> None:
+    output_dir = tmp_path / "out"
+    Batch(str(roms), str(output_dir), 1).run()
+    summary = json.loads((output_dir / Batch.SUMMARY_FILE).read_text())
+
+    expect((output_dir / "b.asm").read_text()).to(start_with("start:\n"))
+    expect((output_dir / "nested" / "a.asm").exists()).to(equal(True))
+    expect(summary["roms"]).to(equal(3))
+    expect(summary["failed"]).to(equal(1))
+
+
+def test_batch_command(roms: Path, tmp_path: Path) -> None:
+    runner = CliRunner()
+    output_dir = tmp_path / "out"
+    result = runner.invoke(
+        cli.cli, ["batch", str(roms), "--output-dir", str(output_dir), "-j", "1"]
+    )
+
+    expect(result.exit_code).to(equal(1))
+    expect(result.output).to(contain("3 ROMs, 1 failed"))
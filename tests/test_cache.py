@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+from typing import List
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from expects import be_below_or_equal, be_false, be_true, equal, expect
+import pytest
+
+ROM_DATA = [0x22, 0x06, 0x61, 0x01, 0x12, 0x04, 0x00, 0xEE, 0xA2, 0x00]
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> DisassemblyCache:
+    return DisassemblyCache(str(tmp_path))
+
+
+def disassembler(rom_data: List[int]) -> Disassembler:
+    dasm = Disassembler()
+    dasm.seed_rom_data(rom_data)
+    return dasm
+
+
+def test_miss(cache: DisassemblyCache) -> None:
+    expect(cache.load(disassembler(ROM_DATA))).to(be_false)
+
+
+def test_round_trip(cache: DisassemblyCache) -> None:
+    decoded = disassembler(ROM_DATA)
+    decoded.decode()
+    cache.store(decoded)
+
+    restored = disassembler(ROM_DATA)
+
+    expect(cache.load(restored)).to(be_true)
+    expect(restored.disassembly).to(equal(decoded.disassembly))
+    expect(restored.labels).to(equal(decoded.labels))
+    expect(restored.all_contexts).to(equal(decoded.all_contexts))
+    expect(restored.visited).to(equal(decoded.visited))
+    expect(restored.references).to(equal(decoded.references))
+
+
+def test_key_depends_on_contents(cache: DisassemblyCache) -> None:
+    first = cache.key(disassembler(ROM_DATA))
+    second = cache.key(disassembler(ROM_DATA[:-2]))
+
+    expect(first == second).to(be_false)
+
+
+def test_key_depends_on_instruction_set(cache: DisassemblyCache) -> None:
+    xochip = Disassembler(isa="xochip")
+    xochip.seed_rom_data(ROM_DATA)
+
+    expect(cache.key(xochip) == cache.key(disassembler(ROM_DATA))).to(be_false)
+
+
+def test_round_trip_long_instructions(cache: DisassemblyCache) -> None:
+    rom_data = [0xF0, 0x00, 0x83, 0x00, 0x12, 0x04]
+    decoded = Disassembler(isa="xochip")
+    decoded.seed_rom_data(rom_data)
+    decoded.decode()
+    cache.store(decoded)
+
+    restored = Disassembler(isa="xochip")
+    restored.seed_rom_data(rom_data)
+
+    expect(cache.load(restored)).to(be_true)
+    expect(restored.disassembly).to(equal(decoded.disassembly))
+    expect(restored.labels).to(equal(decoded.labels))
+
+
+def test_corrupt_entry_is_a_miss(cache: DisassemblyCache) -> None:
+    dasm = disassembler(ROM_DATA)
+    dasm.decode()
+    cache.store(dasm)
+    cache.path(cache.key(dasm)).write_bytes(b"C8DC")
+
+    expect(cache.load(disassembler(ROM_DATA))).to(be_false)
+
+
+def test_stores_only_scan_past_the_limit(
+    cache: DisassemblyCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scans: List[None] = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(evict()))
+
+    for value in range(3):
+        dasm = disassembler([0x60, value])
+        dasm.decode()
+        cache.store(dasm)
+
+    expect(len(scans)).to(equal(1))
+
+    cache.max_bytes = cache.size or 0
+    dasm = disassembler([0x61, 0x00])
+    dasm.decode()
+    cache.store(dasm)
+
+    expect(len(scans)).to(equal(2))
+    expect(cache.size).to(be_below_or_equal(cache.max_bytes))
+
+
+def test_least_recently_used_entries_are_evicted(cache: DisassemblyCache) -> None:
+    roms = [[0x60, value] for value in range(3)]
+
+    for index, rom_data in enumerate(roms):
+        dasm = disassembler(rom_data)
+        dasm.decode()
+        cache.store(dasm)
+        os.utime(cache.path(cache.key(dasm)), (index, index))
+
+    cache.max_bytes = 2 * cache.path(cache.key(dasm)).stat().st_size
+    cache.evict()
+
+    expect(cache.load(disassembler(roms[0]))).to(be_false)
+    expect(cache.load(disassembler(roms[1]))).to(be_true)
+    expect(cache.load(disassembler(roms[2]))).to(be_true)
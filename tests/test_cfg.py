@@ -0,0 +1,176 @@
+import io
+import json
+
+from chip8_dasm.cfg import ControlFlowGraph, Edge, EdgeKind, Loop
+from chip8_dasm.disassembler import Disassembler
+from expects import (
+    be_false,
+    be_true,
+    contain,
+    equal,
+    expect,
+    have_key,
+    start_with,
+)
+import pytest
+
+
+def graph(rom_data: bytes) -> ControlFlowGraph:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(rom_data))
+    dasm.decode()
+    return ControlFlowGraph(dasm)
+
+
+# 0x200: LD V0, 0x00
+# 0x202: ADD V0, 0x01
+# 0x204: SE V0, 0x0a
+# 0x206: JP 0x202
+# 0x208: CALL 0x20c
+# 0x20a: JP 0x20a
+# 0x20c: RET
+LOOP = bytes(
+    [0x60, 0x00, 0x70, 0x01, 0x30, 0x0A, 0x12, 0x02, 0x22, 0x0C, 0x12, 0x0A, 0x00, 0xEE]
+)
+
+
+@pytest.fixture
+def cfg() -> ControlFlowGraph:
+    return graph(LOOP)
+
+
+def test_blocks(cfg: ControlFlowGraph) -> None:
+    spans = [(block.start, block.end) for block in cfg.blocks.values()]
+
+    expect(spans).to(
+        equal(
+            [
+                (0x200, 0x202),
+                (0x202, 0x206),
+                (0x206, 0x208),
+                (0x208, 0x20A),
+                (0x20A, 0x20C),
+                (0x20C, 0x20E),
+            ]
+        )
+    )
+    expect(cfg.block_of(0x204).start).to(equal(0x202))  # type: ignore
+    expect(cfg.block_of(0x20E)).to(equal(None))
+
+
+def test_edges(cfg: ControlFlowGraph) -> None:
+    expect(cfg.successors[0x202]).to(
+        equal(
+            [
+                Edge(0x202, 0x206, EdgeKind.FALLTHROUGH),
+                Edge(0x202, 0x208, EdgeKind.SKIP),
+            ]
+        )
+    )
+    expect(cfg.successors[0x208]).to(
+        equal([Edge(0x208, 0x20C, EdgeKind.CALL), Edge(0x208, 0x20A, EdgeKind.RETURN)])
+    )
+    expect(cfg.successors[0x20C]).to(equal([]))
+    expect([edge.source for edge in cfg.predecessors[0x202]]).to(equal([0x200, 0x206]))
+
+
+def test_dominators(cfg: ControlFlowGraph) -> None:
+    expect(cfg.dominators()).to(
+        equal(
+            {
+                0x200: 0x200,
+                0x202: 0x200,
+                0x206: 0x202,
+                0x208: 0x202,
+                0x20A: 0x208,
+                0x20C: 0x208,
+            }
+        )
+    )
+    expect(cfg.dominates(0x202, 0x20C)).to(be_true)
+    expect(cfg.dominates(0x206, 0x208)).to(be_false)
+
+
+def test_loops(cfg: ControlFlowGraph) -> None:
+    expect(cfg.loops()).to(
+        equal(
+            [
+                Loop(0x202, frozenset({0x202, 0x206})),
+                Loop(0x20A, frozenset({0x20A})),
+            ]
+        )
+    )
+
+
+def test_dead_blocks_are_not_in_loops() -> None:
+    # LD V0, 0x00; ADD V0, 0x01; SE V0, 0x0a; JP 0x202; JP 0x208; then
+    # LD V1, 0x01; JP 0x206, which nothing reaches.
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(bytes.fromhex("6000 7001 300a 1202 1208 6101 1206")))
+    dasm.decode()
+    dasm.seed([0x20A])
+    cfg = ControlFlowGraph(dasm)
+
+    expect(cfg.blocks).to(have_key(0x20A))
+    expect(cfg.loops()).to(
+        equal(
+            [
+                Loop(0x202, frozenset({0x202, 0x206})),
+                Loop(0x208, frozenset({0x208})),
+            ]
+        )
+    )
+
+
+def test_analyses_are_memoized(cfg: ControlFlowGraph) -> None:
+    expect(cfg.dominators() is cfg.dominators()).to(be_true)
+    expect(cfg.loops() is cfg.loops()).to(be_true)
+    expect(cfg.reachable()).to(equal(frozenset(cfg.blocks)))
+
+
+def test_merge_of_fallthrough_and_jump() -> None:
+    # 0x200: SE V0, 0x00
+    # 0x202: JP 0x206
+    # 0x204: LD V1, 0x01
+    # 0x206: RET
+    cfg = graph(bytes([0x30, 0x00, 0x12, 0x06, 0x61, 0x01, 0x00, 0xEE]))
+
+    expect(list(cfg.blocks)).to(equal([0x200, 0x202, 0x204, 0x206]))
+    expect(cfg.dominators()[0x206]).to(equal(0x200))
+
+
+def test_dot(cfg: ControlFlowGraph) -> None:
+    stream = io.StringIO()
+    cfg.write(stream, "dot")
+    text = stream.getvalue()
+
+    expect(text).to(start_with("digraph cfg {\n"))
+    expect(text).to(contain('"0x0202" [label="0x0202: ADD V0, 0x01\\l'))
+    expect(text).to(contain('"0x0208" -> "0x020c" [label=call, style=bold];'))
+
+
+def test_json(cfg: ControlFlowGraph) -> None:
+    stream = io.StringIO()
+    cfg.write(stream, "json")
+    document = json.loads(stream.getvalue())
+
+    expect(document["entry"]).to(equal(0x200))
+    expect(len(document["blocks"])).to(equal(6))
+    expect(document["blocks"][3]).to(
+        equal(
+            {
+                "start": 0x208,
+                "end": 0x20A,
+                "instructions": [[0x208, "CALL lbl_0x020c"]],
+                "successors": [
+                    {"target": 0x20C, "kind": "call"},
+                    {"target": 0x20A, "kind": "return"},
+                ],
+            }
+        )
+    )
+
+
+def test_unknown_format(cfg: ControlFlowGraph) -> None:
+    with pytest.raises(ValueError):
+        cfg.write(io.StringIO(), "svg")
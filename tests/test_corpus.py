@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+
+from chip8_dasm.corpus import CorpusIndex, grams, IndexUpdate, parse_pattern
+from chip8_dasm.disassembler import Disassembler
+from expects import equal, expect, raise_error
+import pytest
+
+# 0x200: LD V0, 0x05
+# 0x202: LD I, 0x20a
+# 0x204: DRW V0, V1, 0x05
+# 0x206: ADD V0, 0x08
+# 0x208: JP 0x202
+SPRITE_LOOP = bytes.fromhex("6005 a20a d015 7008 1202")
+
+# 0x200: LD V3, 0x00
+# 0x202: LD I, 0x300
+# 0x204: DRW V3, V4, 0x03
+# 0x206: JP 0x206
+OTHER = bytes.fromhex("6300 a300 d343 1206")
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> CorpusIndex:
+    roms = tmp_path / "roms"
+    (roms / "nested").mkdir(parents=True)
+    (roms / "sprite.ch8").write_bytes(SPRITE_LOOP)
+    (roms / "nested" / "other.ch8").write_bytes(OTHER)
+
+    index = CorpusIndex(str(tmp_path / "index.sqlite"), use_cache=False)
+    index.update(str(roms))
+
+    return index
+
+
+def test_search_with_wildcards(corpus: CorpusIndex, tmp_path: Path) -> None:
+    matches = corpus.search("6XNN AXXX DXYN")
+
+    expect([(Path(m.rom_file).name, m.address) for m in matches]).to(
+        equal([("other.ch8", 0x200), ("sprite.ch8", 0x200)])
+    )
+    expect(matches[1].text).to(equal("LD V0, 0x05; LD I, lbl_0x020a; DRW V0, V1, 0x05"))
+
+
+def test_search_operands(corpus: CorpusIndex) -> None:
+    expect(len(corpus.search("D??5"))).to(equal(1))
+    expect(len(corpus.search("D3?? 1???"))).to(equal(1))
+    expect(corpus.search("7??? 1202")[0].address).to(equal(0x206))
+    expect(corpus.search("8XY4")).to(equal([]))
+    expect(len(corpus.search("????", limit=3))).to(equal(3))
+
+
+def test_update_is_incremental(corpus: CorpusIndex, tmp_path: Path) -> None:
+    roms = tmp_path / "roms"
+
+    expect(corpus.update(str(roms))).to(equal(IndexUpdate(0, 0, 0, 2)))
+
+    os.utime(roms / "sprite.ch8", ns=(0, 0))
+    (roms / "nested" / "other.ch8").write_bytes(SPRITE_LOOP)
+    (roms / "new.ch8").write_bytes(OTHER)
+
+    expect(corpus.update(str(roms))).to(equal(IndexUpdate(1, 1, 0, 1)))
+    expect(len(corpus.search("6XNN AXXX DXY5"))).to(equal(2))
+
+    (roms / "sprite.ch8").unlink()
+
+    expect(corpus.update(str(roms)).removed).to(equal(1))
+    expect(len(corpus.search("6XNN AXXX DXY5"))).to(equal(1))
+
+
+def test_grams() -> None:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(SPRITE_LOOP))
+    dasm.decode()
+
+    rows = grams(dasm, 3)
+
+    expect(len(rows)).to(equal(5 + 3))
+    expect(sorted(address for gram, address in rows if gram >= 64 * 64)).to(
+        equal([0x200, 0x202, 0x204])
+    )
+
+
+def test_parse_pattern() -> None:
+    expect(parse_pattern("DXY5; 00e0")).to(equal([(0xF00F, 0xD005), (0xFFFF, 0x00E0)]))
+    expect(lambda: parse_pattern("DXY")).to(raise_error(ValueError))
+    expect(lambda: parse_pattern("DXYZ")).to(raise_error(ValueError))
+    expect(lambda: parse_pattern(" ")).to(raise_error(ValueError))
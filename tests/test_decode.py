@@ -1,5 +1,8 @@
+from typing import List
+
 from chip8_dasm.disassembler import Disassembler
-from expects import equal, expect
+from chip8_dasm.trace import Tracer
+from expects import be_false, contain, equal, expect, raise_error
 import pytest
 
 
@@ -11,27 +14,17 @@ def dasm() -> Disassembler:
 def test_decode_opcode(dasm: Disassembler) -> None:
     rom_data = [0x12, 0x4E]
     dasm.seed_rom_data(rom_data)
-    opcode = dasm.read_opcode()
-
-    expect(hex(opcode)).to(equal("0x124e"))
-
-
-def test_decode_operation(dasm: Disassembler) -> None:
-    rom_data = [0x12, 0x4E]
-    dasm.seed_rom_data(rom_data)
-    opcode = dasm.read_opcode()
-    operation = dasm.read_operation(opcode)
+    dasm.decode()
 
-    expect(hex(operation)).to(equal("0x1000"))
+    expect(hex(dasm.disassembly[0x200].opcode)).to(equal("0x124e"))
 
 
 def test_decode_address(dasm: Disassembler) -> None:
     rom_data = [0x12, 0x4E]
     dasm.seed_rom_data(rom_data)
-    opcode = dasm.read_opcode()
-    address = dasm.read_address(opcode)
+    dasm.decode()
 
-    expect(hex(address)).to(equal("0x24e"))
+    expect(dasm.disassembly[0x200].target).to(equal(0x24E))
 
 
 def test_unable_to_decode(dasm: Disassembler) -> None:
@@ -48,3 +41,141 @@ def test_unable_to_decode(dasm: Disassembler) -> None:
     # a test that tests this condition but without having the error due to
     # the fact that the current_address is incremented by two for each
     # execution of the decode() call.
+
+
+def test_decode_deep_jump_chain(dasm: Disassembler) -> None:
+    # Each jump lands on the next word, creating one context per instruction.
+    # This is deeper than the default recursion limit allows.
+    count = 1500
+    rom_data = []
+
+    for index in range(count):
+        target = Disassembler.STARTING_ADDRESS + (index + 1) * 2
+        rom_data += [0x10 | (target >> 8), target & 0xFF]
+
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    expect(len(dasm.disassembly)).to(equal(count))
+
+
+def test_decode_breadth_first() -> None:
+    # 0x200: SE V0, 0x00 -> contexts 0x204 (skip) and fallthrough to 0x202
+    # 0x202: JP 0x206
+    # 0x204: LD V1, 0x01
+    # 0x206: LD V2, 0x02
+    rom_data = [0x30, 0x00, 0x12, 0x06, 0x61, 0x01, 0x62, 0x02]
+
+    depth_first = Disassembler(traversal="dfs")
+    depth_first.seed_rom_data(rom_data)
+    depth_first.decode()
+
+    breadth_first = Disassembler(traversal="bfs")
+    breadth_first.seed_rom_data(rom_data)
+    breadth_first.decode()
+
+    expect(breadth_first.disassembly).to(equal(depth_first.disassembly))
+
+
+def test_decode_unknown_traversal() -> None:
+    with pytest.raises(ValueError):
+        Disassembler(traversal="random")
+
+
+def test_decode_without_tracing(dasm: Disassembler) -> None:
+    expect(dasm.tracer).to(equal(None))
+
+
+def test_decode_context_tracing() -> None:
+    messages: List[str] = []
+    dasm = Disassembler(tracer=Tracer(Tracer.CONTEXT, messages.append))
+    dasm.seed_rom_data([0x67, 0x03, 0x99, 0x4E])
+    dasm.decode()
+
+    expect(messages).to(
+        equal(
+            [
+                "Context: 512 (0x200)",
+                "All Contexts: [512]",
+                "Current Contexts: []",
+                "Labels: []",
+                "Unknown opcode: 0x994e at 0x202",
+            ]
+        )
+    )
+
+
+def test_decode_instruction_tracing() -> None:
+    messages: List[str] = []
+    dasm = Disassembler(tracer=Tracer.from_name("instruction", messages.append))
+    dasm.seed_rom_data([0x67, 0x03])
+    dasm.decode()
+
+    expect(messages).to(contain("Current Address: 512 (0x200)"))
+
+
+def test_decode_tracing_disabled() -> None:
+    messages: List[str] = []
+    dasm = Disassembler(tracer=Tracer.from_name("off", messages.append))
+    dasm.seed_rom_data([0x67, 0x03])
+    dasm.decode()
+
+    expect(bool(dasm.tracer)).to(be_false)
+    expect(messages).to(equal([]))
+
+
+def test_decode_long_instructions() -> None:
+    # LD I, long 0x300; SE V0, 0x00; LD I, long 0x8000; LD [I], V1-V2;
+    # JP 0x210; then EXIT.
+    dasm = Disassembler(isa="xochip")
+    dasm.seed_rom_data(
+        list(bytes.fromhex("f0000300 3000 f0008000 5122 1210 0000 00fd"))
+    )
+    dasm.decode()
+
+    expect(sorted(dasm.disassembly)).to(
+        equal([0x200, 0x204, 0x206, 0x20A, 0x20C, 0x210])
+    )
+    expect(dasm.disassembly[0x206].size).to(equal(4))
+    expect(list(dasm.labels)).to(equal([0x210, 0x300, 0x8000]))
+    expect(list(dasm.all_contexts)).to(equal([0x200, 0x20A, 0x210]))
+    expect(dasm.references[0x20A]).to(equal({0x204}))
+
+
+def test_decode_long_instruction_at_end() -> None:
+    dasm = Disassembler(isa="xochip")
+    dasm.seed_rom_data([0x60, 0x01, 0xF0, 0x00, 0x80])
+    dasm.decode()
+
+    expect(sorted(dasm.disassembly)).to(equal([0x200]))
+    expect(list(dasm.visited)).to(equal([0x200]))
+
+
+def test_decode_tracing_long_instructions() -> None:
+    messages: List[str] = []
+    dasm = Disassembler(
+        isa="xochip", tracer=Tracer.from_name("instruction", messages.append)
+    )
+    dasm.seed_rom_data([0xF0, 0x00, 0x03, 0x00, 0x12, 0x04])
+    dasm.decode()
+
+    addresses = [
+        message for message in messages if message.startswith("Current Address")
+    ]
+
+    expect(addresses).to(
+        equal(["Current Address: 512 (0x200)", "Current Address: 516 (0x204)"])
+    )
+
+
+def test_decode_chip8_stops_at_extensions() -> None:
+    dasm = Disassembler()
+    dasm.seed_rom_data([0x00, 0xFF, 0xF0, 0x00, 0x03, 0x00])
+    dasm.decode()
+
+    expect(dasm.disassembly[0x200].text).to(equal("SYS 0x0ff"))
+    expect(sorted(dasm.disassembly)).to(equal([0x200]))
+
+
+def test_decode_unknown_instruction_set() -> None:
+    expect(lambda: Disassembler(isa="chip9")).to(raise_error(ValueError))
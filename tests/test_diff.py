@@ -0,0 +1,99 @@
+from chip8_dasm.cfg import ControlFlowGraph
+from chip8_dasm.diff import ChangeKind, routines, StructuralDiff
+from chip8_dasm.disassembler import Disassembler
+from expects import equal, expect
+import pytest
+
+# 0x200: CALL 0x208
+# 0x202: CALL 0x20e
+# 0x204: JP 0x204
+# 0x208: LD V0, 0x05; ADD V0, 0x01; RET
+# 0x20e: LD V1, 0x02; SE V1, 0x02; LD V2, 0x03; RET
+OLD = "2208 220e 1204 0000 6005 7001 00ee 6102 3102 6203 00ee"
+
+# The same ROM with a call to a new routine at 0x218, which moves the other
+# routines, and LD V2, 0x07 in place of LD V2, 0x03.
+NEW = "220a 2210 2218 1206 0000 6005 7001 00ee 6102 3102 6207 00ee 00e0 00ee"
+
+
+def decoded(rom: str) -> Disassembler:
+    dasm = Disassembler()
+    dasm.rom_data = bytearray(bytes.fromhex(rom))
+    dasm.decode()
+    return dasm
+
+
+@pytest.fixture
+def structural_diff() -> StructuralDiff:
+    return StructuralDiff(decoded(OLD), decoded(NEW))
+
+
+def test_routines_start_at_calls() -> None:
+    found = routines(ControlFlowGraph(decoded(OLD)))
+
+    expect([routine.start for routine in found]).to(equal([0x200, 0x208, 0x20E]))
+    expect([block.start for block in found[2].blocks]).to(equal([0x20E, 0x212, 0x214]))
+    expect(found[2].size).to(equal(4))
+
+
+def test_changes(structural_diff: StructuralDiff) -> None:
+    changes = [
+        (
+            change.kind,
+            None if change.old is None else change.old.start,
+            None if change.new is None else change.new.start,
+        )
+        for change in structural_diff.changes
+    ]
+
+    expect(changes).to(
+        equal(
+            [
+                (ChangeKind.MODIFIED, 0x200, 0x200),
+                (ChangeKind.MOVED, 0x208, 0x20A),
+                (ChangeKind.MODIFIED, 0x20E, 0x210),
+                (ChangeKind.INSERTED, None, 0x218),
+            ]
+        )
+    )
+
+
+def test_modified_blocks(structural_diff: StructuralDiff) -> None:
+    kinds = [block.kind for block in structural_diff.changes[2].blocks]
+
+    expect(kinds).to(
+        equal([ChangeKind.UNCHANGED, ChangeKind.MODIFIED, ChangeKind.UNCHANGED])
+    )
+
+
+def test_removed_routines() -> None:
+    structural_diff = StructuralDiff(decoded(NEW), decoded(OLD))
+
+    expect(structural_diff.count(ChangeKind.REMOVED)).to(equal(1))
+    expect(structural_diff.count(ChangeKind.MODIFIED)).to(equal(2))
+
+
+def test_lines(structural_diff: StructuralDiff) -> None:
+    expect(list(structural_diff.lines())).to(
+        equal(
+            [
+                "~ modified  0x0200 -> 0x0200  (1 of 4 blocks)",
+                "    + 0x0200  CALL lbl_0x020a",
+                "~ modified  0x020e -> 0x0210  (1 of 3 blocks)",
+                "    ~ 0x0212 -> 0x0214  LD V2, 0x07",
+                "+ inserted  0x0218  (1 blocks, 2 instructions)",
+            ]
+        )
+    )
+    expect(list(structural_diff.lines(unchanged=True))[2]).to(
+        equal("> moved     0x0208 -> 0x020a")
+    )
+
+
+def test_same_rom_is_unchanged() -> None:
+    structural_diff = StructuralDiff(decoded(OLD), decoded(OLD))
+
+    expect({change.kind for change in structural_diff.changes}).to(
+        equal({ChangeKind.UNCHANGED})
+    )
+    expect(list(structural_diff.lines())).to(equal([]))
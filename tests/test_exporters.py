@@ -0,0 +1,140 @@
+import io
+import json
+from pathlib import Path
+import sqlite3
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.exporters import (
+    BinaryExporter,
+    BinaryRecord,
+    export,
+    Exporter,
+    JsonLinesExporter,
+    read_binary,
+)
+from chip8_dasm.regions import Region
+from expects import equal, expect, raise_error
+import pytest
+
+# 0x200: JP 0x206
+# 0x202: 0xff, 0xa2 unknown
+# 0x204: 0xf0, 0x90 data
+# 0x206: LD I, 0x204
+# 0x208: DRW V0, V0, 0x2
+# 0x20a: CALL 0x200
+ROM = bytes.fromhex("1206 ffa2 f090 a204 d002 2200")
+
+
+@pytest.fixture
+def dasm() -> Disassembler:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(ROM))
+    dasm.decode()
+
+    return dasm
+
+
+def test_json_lines(dasm: Disassembler) -> None:
+    stream = io.StringIO()
+    JsonLinesExporter(dasm).write(stream)
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    expect(records[0]).to(
+        equal(
+            {
+                "address": 0x200,
+                "kind": "code",
+                "label": "lbl_0x0200",
+                "opcode": 0x1206,
+                "text": "JP lbl_0x0206",
+                "target": 0x206,
+            }
+        )
+    )
+    expect(records[1:3]).to(
+        equal(
+            [
+                {"address": 0x202, "kind": "unknown", "label": None, "bytes": "ffa2"},
+                {
+                    "address": 0x204,
+                    "kind": "data",
+                    "label": "lbl_0x0204",
+                    "bytes": "f090",
+                },
+            ]
+        )
+    )
+    expect([record["address"] for record in records[3:]]).to(
+        equal([0x206, 0x208, 0x20A])
+    )
+
+
+def test_binary_round_trip(dasm: Disassembler) -> None:
+    stream = io.BytesIO()
+    BinaryExporter(dasm).write(stream)
+    entry, records = read_binary(stream.getvalue())
+
+    expect(entry).to(equal(0x200))
+    expect(list(records)).to(
+        equal(
+            [
+                BinaryRecord(0x200, Region.CODE, True, b"\x12\x06"),
+                BinaryRecord(0x202, Region.UNKNOWN, False, b"\xff\xa2"),
+                BinaryRecord(0x204, Region.DATA, True, b"\xf0\x90"),
+                BinaryRecord(0x206, Region.CODE, True, b"\xa2\x04"),
+                BinaryRecord(0x208, Region.CODE, False, b"\xd0\x02"),
+                BinaryRecord(0x20A, Region.CODE, False, b"\x22\x00"),
+            ]
+        )
+    )
+    expect(len(stream.getvalue())).to(equal(BinaryExporter.HEADER.size + 6 * 6))
+
+
+def test_binary_needs_header() -> None:
+    expect(lambda: read_binary(b"C8DL")).to(raise_error(ValueError))
+    expect(lambda: read_binary(b"XXXX\x01\x00\x00\x02\x00\x02")).to(
+        raise_error(ValueError)
+    )
+
+
+def test_sqlite(dasm: Disassembler, tmp_path: Path) -> None:
+    database = tmp_path / "listing.sqlite"
+    database.write_text("replaced")
+    export(dasm, str(database), "sqlite")
+
+    connection = sqlite3.connect(str(database))
+    listing = connection.execute(
+        "SELECT address, kind, size, opcode, text FROM listing ORDER BY address"
+    ).fetchall()
+    xrefs = connection.execute(
+        "SELECT target, source, kind FROM xrefs ORDER BY target, source"
+    ).fetchall()
+    labels = connection.execute("SELECT name FROM labels ORDER BY address").fetchall()
+    connection.close()
+
+    expect(listing[:3]).to(
+        equal(
+            [
+                (0x200, "code", 2, 0x1206, "JP lbl_0x0206"),
+                (0x202, "unknown", 2, None, None),
+                (0x204, "data", 2, None, None),
+            ]
+        )
+    )
+    expect(xrefs).to(
+        equal([(0x200, 0x20A, "call"), (0x204, 0x206, "load"), (0x206, 0x200, "jump")])
+    )
+    expect(labels).to(equal([("lbl_0x0200",), ("lbl_0x0204",), ("lbl_0x0206",)]))
+
+
+def test_unknown_format(dasm: Disassembler, tmp_path: Path) -> None:
+    expect(lambda: export(dasm, str(tmp_path / "out"), "xml")).to(
+        raise_error(ValueError)
+    )
+
+
+def test_exporters_must_export(dasm: Disassembler) -> None:
+    class Unfinished(Exporter):
+        pass
+
+    expect(lambda: Unfinished(dasm)).to(raise_error(TypeError))  # type: ignore
@@ -0,0 +1,129 @@
+import io
+import json
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.insight import Insight, InsightEvent, operation_name
+from chip8_dasm.instructions import CHIP8, UNKNOWN
+import click
+from expects import contain, equal, expect
+import pytest
+
+# 0x200: LD V1, 0x02
+# 0x202: DRW V1, V2, 0x03
+# 0x204: JP 0x204
+ROM = [0x61, 0x02, 0xD1, 0x23, 0x12, 0x04]
+
+
+def decoded(insight: Insight) -> Disassembler:
+    dasm = Disassembler(insight=insight)
+    dasm.seed_rom_data(ROM)
+    dasm.decode()
+    return dasm
+
+
+@pytest.mark.parametrize(
+    "index, name",
+    [(0, "00E0"), (2, "0NNN"), (5, "3XNN"), (7, "5XY0"), (23, "DXYN"), (24, "EX9E")],
+)
+def test_operation_name(index: int, name: str) -> None:
+    expect(operation_name(CHIP8[index])).to(equal(name))
+
+
+def test_operation_name_unknown() -> None:
+    expect(operation_name(UNKNOWN)).to(equal("UNKNOWN"))
+
+
+def test_records_every_instruction() -> None:
+    insight = Insight()
+    decoded(insight)
+
+    expect([event.address for event in insight.events]).to(equal([0x200, 0x202, 0x204]))
+    expect(insight.events[1]).to(
+        equal(
+            InsightEvent(
+                0x202,
+                0xD123,
+                "DXYN",
+                "DRW V1, V2, 0x03",
+                (
+                    ("operation", 0xF000, 0xD000),
+                    ("x", 0x0F00, 1),
+                    ("y", 0x00F0, 2),
+                    ("n", 0x000F, 3),
+                ),
+            )
+        )
+    )
+
+
+def test_records_long_instructions() -> None:
+    insight = Insight()
+    dasm = Disassembler(isa="xochip", insight=insight)
+    dasm.seed_rom_data([0xF0, 0x00, 0x03, 0x00, 0x12, 0x00])
+    dasm.decode()
+
+    expect(insight.events[0]).to(
+        equal(
+            InsightEvent(
+                0x200,
+                0xF0000300,
+                "F000",
+                "LD I, long lbl_0x0300",
+                (("operation", 0xF0000000, 0xF0000000), ("nnnn", 0xFFFF, 0x300)),
+            )
+        )
+    )
+
+    lines = [click.unstyle(line) for line in insight.render(insight.events[0])]
+
+    expect(lines[3]).to(
+        equal(
+            "\tnnnn      11110000000000000000001100000000 & "
+            "00000000000000001111111111111111      = 768 (0x300)"
+        )
+    )
+
+
+def test_selected_addresses() -> None:
+    insight = Insight(addresses=[0x204])
+    decoded(insight)
+
+    expect([event.address for event in insight.events]).to(equal([0x204]))
+
+
+@pytest.mark.parametrize("operation", ["DXYN", "dxyn", "DRW"])
+def test_selected_operations(operation: str) -> None:
+    insight = Insight(operations=[operation])
+    decoded(insight)
+
+    expect([event.address for event in insight.events]).to(equal([0x202]))
+
+
+def test_ring_buffer() -> None:
+    insight = Insight(capacity=2)
+    decoded(insight)
+
+    expect([event.address for event in insight.events]).to(equal([0x202, 0x204]))
+    expect(insight.dropped).to(equal(1))
+
+
+def test_stream() -> None:
+    stream = io.StringIO()
+    decoded(Insight(operations=["1NNN"], stream=stream))
+    lines = stream.getvalue().splitlines()
+
+    expect(len(lines)).to(equal(1))
+    expect(json.loads(lines[0])["fields"]).to(
+        equal([["operation", 0xF000, 0x1000], ["nnn", 0x0FFF, 0x204]])
+    )
+
+
+def test_render() -> None:
+    insight = Insight()
+    decoded(insight)
+    lines = [click.unstyle(line) for line in insight.render(insight.events[1])]
+
+    expect(lines[0]).to(contain("== DECODING 0x0202 =="))
+    expect(lines[3]).to(
+        equal("\tx         1101000100100011 & 0000111100000000 >> 8 = 1 (0x1)")
+    )
@@ -0,0 +1,77 @@
+from chip8_dasm.instructions import (
+    CHIP8,
+    decode_table,
+    DecodeTable,
+    Flow,
+    INSTRUCTION_SETS,
+    SCHIP,
+    XOCHIP,
+)
+from expects import be, be_none, equal, expect
+
+
+def test_table_is_shared() -> None:
+    expect(decode_table()).to(be(decode_table()))
+
+
+def test_instructions_are_cached() -> None:
+    table = DecodeTable(CHIP8)
+
+    expect(table[0x124E]).to(be(table[0x124E]))
+
+
+def test_instruction_record() -> None:
+    instruction = DecodeTable(CHIP8)[0xD347]
+
+    expect(instruction.mnemonic).to(equal("DRW"))
+    expect(instruction.operands).to(equal((3, 4, 7)))
+    expect(instruction.flow).to(equal(Flow.NEXT))
+    expect(instruction.target).to(be_none)
+
+
+def test_unknown_opcode() -> None:
+    instruction = DecodeTable(CHIP8)[0x994E]
+
+    expect(instruction.flow).to(equal(Flow.INVALID))
+
+
+def test_precompute_covers_every_opcode() -> None:
+    table = DecodeTable(CHIP8).precompute()
+    specs = {instruction.spec for instruction in table.values()}
+
+    expect(len(table)).to(equal(0x10000))
+    expect(specs.issuperset(CHIP8)).to(equal(True))
+
+
+def test_instruction_sets_share_tables() -> None:
+    for isa in INSTRUCTION_SETS.values():
+        expect(isa.table).to(be(decode_table(isa.specs)))
+
+    expect(INSTRUCTION_SETS["xochip"].memory_size).to(equal(0x10000))
+    expect(INSTRUCTION_SETS["schip"].long).to(equal(False))
+    expect(INSTRUCTION_SETS["xochip"].long).to(equal(True))
+
+
+def test_extensions_are_variant_specific() -> None:
+    expect(DecodeTable(CHIP8)[0x00FF].text).to(equal("SYS 0x0ff"))
+    expect(DecodeTable(SCHIP)[0x00FF].text).to(equal("HIGH"))
+    expect(DecodeTable(SCHIP)[0x00C4].text).to(equal("SCD 0x4"))
+    expect(DecodeTable(SCHIP)[0x00FD].flow).to(equal(Flow.RETURN))
+    expect(DecodeTable(SCHIP)[0xF385].text).to(equal("LD V3, R"))
+    expect(DecodeTable(SCHIP)[0x5122].flow).to(equal(Flow.INVALID))
+    expect(DecodeTable(XOCHIP)[0x5122].text).to(equal("LD [I], V1-V2"))
+    expect(DecodeTable(XOCHIP)[0xF201].text).to(equal("PLANE 0x2"))
+    expect(DecodeTable(XOCHIP)[0x00FF].text).to(equal("HIGH"))
+
+
+def test_wide_instruction() -> None:
+    table = DecodeTable(XOCHIP)
+    prefix = table[0xF000]
+    instruction = table.wide(prefix, 0x8123)
+
+    expect(prefix.size).to(equal(4))
+    expect(instruction).to(be(table.wide(prefix, 0x8123)))
+    expect(instruction.opcode).to(equal(0xF0008123))
+    expect(instruction.target).to(equal(0x8123))
+    expect(instruction.size).to(equal(4))
+    expect(instruction.text).to(equal("LD I, long lbl_0x8123"))
@@ -1,13 +1,21 @@
 import os
 import os.path as path
+from pathlib import Path
 from typing import Generator
 
 from chip8_dasm import __version__, cli
 from click.testing import CliRunner
-from expects import contain, equal, expect
+from expects import contain, equal, expect, start_with
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    directory = tmp_path / "cache"
+    monkeypatch.setenv("C8DASM_CACHE_DIR", str(directory))
+    return directory
+
+
 @pytest.fixture
 def runner() -> CliRunner:
     return CliRunner()
@@ -33,3 +41,197 @@ def test_startup_succeeds(runner: CliRunner, rom: str) -> None:
 
 def test_version() -> None:
     expect(__version__).to(equal("0.1.0"))
+
+
+def test_trace_option(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, [rom, "--trace", "context"])
+
+    expect(result.exit_code).to(equal(0))
+
+
+def test_output_option(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    output = tmp_path / "test_opcode.asm"
+    result = runner.invoke(cli.cli, [rom, "--output", str(output)])
+
+    expect(result.exit_code).to(equal(0))
+    expect(output.read_text()).to(start_with("start:\n             0x0200\n"))
+
+
+def test_cache_is_used(runner: CliRunner, rom: str, cache_dir: Path) -> None:
+    first = runner.invoke(cli.cli, [rom])
+    second = runner.invoke(cli.cli, [rom])
+
+    expect(len(list(cache_dir.glob("*/*.c8dc")))).to(equal(1))
+    expect(second.output).to(equal(first.output))
+
+
+def test_no_cache_option(runner: CliRunner, rom: str, cache_dir: Path) -> None:
+    result = runner.invoke(cli.cli, [rom, "--no-cache"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(cache_dir.exists()).to(equal(False))
+
+
+def test_mmap_option(runner: CliRunner, rom: str) -> None:
+    loaded = runner.invoke(cli.cli, [rom, "--no-cache"])
+    mapped = runner.invoke(cli.cli, [rom, "--no-cache", "--mmap"])
+
+    expect(mapped.exit_code).to(equal(0))
+    expect(mapped.output).to(equal(loaded.output))
+
+
+def test_graph_command(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    output = tmp_path / "rom.dot"
+    result = runner.invoke(cli.cli, ["graph", rom, "-o", str(output)])
+
+    expect(result.exit_code).to(equal(0))
+    expect(output.read_text()).to(start_with("digraph cfg {"))
+
+
+def test_stats_option(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    profile = tmp_path / "rom.prof"
+    memory = tmp_path / "rom.snapshot"
+    options = ["--stats", "--profile", str(profile), "--memory", str(memory)]
+    result = runner.invoke(cli.cli, [rom, "--no-cache", *options])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.stderr).to(contain("decode "))
+    expect(result.stderr).to(contain("op.DRW"))
+    expect(profile.exists()).to(equal(True))
+    expect(memory.exists()).to(equal(True))
+
+
+def test_insight_skips_cache(runner: CliRunner, rom: str, cache_dir: Path) -> None:
+    result = runner.invoke(cli.cli, [rom, "--insight"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(cache_dir.exists()).to(equal(False))
+
+
+def test_insight_at_option(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, [rom, "--insight-at", "0x2a0"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("== DECODING 0x02a0 =="))
+    expect(result.output.count("== DECODING")).to(equal(1))
+
+
+def test_xref_command(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, ["xref", rom, "0x24e", "-r", "V0"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("0x0200  JP lbl_0x024e"))
+    expect(result.output).to(contain("Defined V0:"))
+
+
+def test_xref_needs_query(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, ["xref", rom])
+
+    expect(result.exit_code).to(equal(2))
+
+
+def test_run_option(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, [rom, "--run", "1000", "--keys", "5."])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.stderr).to(contain("Ran 202 instructions, Endless loop"))
+
+
+def test_index_and_search(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    database = str(tmp_path / "index.sqlite")
+    directory = path.dirname(rom)
+
+    result = runner.invoke(cli.cli, ["index", directory, "--database", database])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("1 added, 0 changed, 0 removed, 0 unchanged"))
+
+    result = runner.invoke(cli.cli, ["search", "1NNN", "--database", database])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("test_opcode.ch8:0x0200  JP lbl_0x024e"))
+
+    result = runner.invoke(cli.cli, ["search", "DXYZ", "--database", database])
+
+    expect(result.exit_code).to(equal(2))
+
+
+def test_similar(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    roms = tmp_path / "roms"
+    roms.mkdir()
+    data = Path(rom).read_bytes()
+    (roms / "original.ch8").write_bytes(data)
+    (roms / "copy.ch8").write_bytes(data)
+    (roms / "other.ch8").write_bytes(bytes.fromhex("6300 a300 d343 1206"))
+
+    result = runner.invoke(cli.cli, ["similar", str(roms)])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("100%  " + str(roms / "copy.ch8")))
+    expect(result.output).to(contain("100%  " + str(roms / "original.ch8")))
+    expect(result.output).not_to(contain("other.ch8"))
+    expect(result.output).to(contain("3 ROMs, 1 groups"))
+
+
+def test_diff(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    patched = bytearray(Path(rom).read_bytes())
+    patched[0x57] = 0x33
+    (tmp_path / "patched.ch8").write_bytes(patched)
+
+    result = runner.invoke(cli.cli, ["diff", rom, str(tmp_path / "patched.ch8")])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("~ modified  0x0200 -> 0x0200"))
+    expect(result.output).to(contain("LD V5, 0x33"))
+    expect(result.output).to(contain("1 modified, 0 inserted, 0 removed"))
+
+
+def test_format_jsonl(runner: CliRunner, rom: str, tmp_path: Path) -> None:
+    output = tmp_path / "listing.jsonl"
+    result = runner.invoke(cli.cli, [rom, "-f", "jsonl", "-o", str(output)])
+
+    expect(result.exit_code).to(equal(0))
+    expect(output.read_text()).to(start_with('{"address": 512, "kind": "code"'))
+
+
+def test_format_needs_output(runner: CliRunner, rom: str) -> None:
+    result = runner.invoke(cli.cli, [rom, "--format", "binary"])
+
+    expect(result.exit_code).to(equal(2))
+    expect(result.output).to(contain("--format binary needs --output"))
+
+
+def test_instruction_set(runner: CliRunner, tmp_path: Path) -> None:
+    rom = tmp_path / "long.ch8"
+    rom.write_bytes(bytes.fromhex("f000 8000 00ff 1206"))
+
+    result = runner.invoke(cli.cli, [str(rom), "--isa", "xochip"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("LD I, long lbl_0x8000\n"))
+    expect(result.output).to(contain("HIGH\n"))
+
+    result = runner.invoke(cli.cli, [str(rom), "--isa", "schip", "--run", "10"])
+
+    expect(result.exit_code).to(equal(2))
+    expect(result.output).to(contain("--run only supports the chip8"))
+
+
+def test_insight_long_instructions(runner: CliRunner, tmp_path: Path) -> None:
+    rom = tmp_path / "long.ch8"
+    rom.write_bytes(bytes.fromhex("f000 0300 1200"))
+
+    result = runner.invoke(cli.cli, [str(rom), "--isa", "xochip", "-i"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.output).to(contain("LD I, long lbl_0x0300"))
+
+
+def test_run_rom_too_large(runner: CliRunner, tmp_path: Path) -> None:
+    rom = tmp_path / "large.ch8"
+    rom.write_bytes(bytes(0xE01))
+
+    result = runner.invoke(cli.cli, [str(rom), "--run", "10"])
+
+    expect(result.exit_code).to(equal(1))
+    expect(result.output).to(contain("Error: ROM does not fit in memory"))
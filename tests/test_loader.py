@@ -0,0 +1,71 @@
+import os.path as path
+from pathlib import Path
+import sys
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import listing
+from chip8_dasm.loader import Loader
+from expects import be_true, equal, expect
+import pytest
+
+
+@pytest.fixture
+def rom() -> str:
+    return path.join(path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+
+def test_map_matches_load(rom: str) -> None:
+    mapped = Loader.map(rom)
+
+    expect(mapped.readonly).to(be_true)
+    expect(bytes(mapped)).to(equal(bytes(Loader.load(rom))))
+
+
+def test_map_empty_file(tmp_path: Path) -> None:
+    rom = tmp_path / "empty.ch8"
+    rom.write_bytes(b"")
+
+    expect(len(Loader.map(str(rom)))).to(equal(0))
+
+
+def test_words() -> None:
+    data = bytearray([0x12, 0x4E, 0xA2, 0x02, 0xFF])
+    even = Loader.words(data)
+    odd = Loader.words(data, 1)
+
+    if sys.byteorder == "little":
+        expect(list(even)).to(equal([0x4E12, 0x02A2]))
+        expect(list(odd)).to(equal([0xA24E, 0xFF02]))
+    else:
+        expect(list(even)).to(equal([0x124E, 0xA202]))
+        expect(list(odd)).to(equal([0x4EA2, 0x02FF]))
+
+
+def test_words_share_memory() -> None:
+    data = bytearray([0x12, 0x4E])
+    words = Loader.words(data)
+    data[0] = 0x13
+
+    expect(words.tobytes()).to(equal(b"\x13\x4e"))
+
+
+def test_decode_mapped_rom(rom: str) -> None:
+    loaded = Disassembler(rom)
+    loaded.decode()
+
+    mapped = Disassembler(rom, mapped=True)
+    mapped.decode()
+
+    expect(mapped.disassembly).to(equal(loaded.disassembly))
+
+
+def test_decode_odd_address() -> None:
+    # 0x200: JP 0x203
+    # 0x203: LD V1, 0x01
+    dasm = Disassembler()
+    dasm.seed_rom_data([0x12, 0x03, 0x00, 0x61, 0x01])
+    dasm.decode()
+
+    expect(listing(dasm.disassembly)).to(
+        equal({0x200: "JP lbl_0x0203", 0x203: "LD V1, 0x01"})
+    )
@@ -0,0 +1,127 @@
+from typing import List
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.machine import Machine, random_keys, scripted_keys
+from expects import be_none, contain, equal, expect, have_key, raise_error
+import pytest
+
+
+def run(program: str, budget: int = 1000, keys: str = ".") -> Machine:
+    machine = Machine(bytes.fromhex(program), scripted_keys(keys))
+    machine.run(budget)
+    return machine
+
+
+# 0x200: LD V0, 0x04
+# 0x202: JP V0, 0x204
+# 0x204: JP 0x204
+# 0x206: JP 0x206
+# 0x208: LD V1, 0x01
+# 0x20a: JP 0x20a
+COMPUTED = "6004 b204 1204 1206 6101 120a"
+
+
+def test_arithmetic() -> None:
+    # LD V0, 0xf0; LD V1, 0x20; ADD V0, V1; LD V2, V0; SUB V2, V1; JP 0x20a
+    machine = run("60f0 6120 8014 8200 8215 120a")
+
+    expect(list(machine.registers[:3])).to(equal([0x10, 0x20, 0xF0]))
+    expect(machine.registers[15]).to(equal(0))
+    expect(machine.halted).to(contain("Endless loop at 0x020a"))
+
+
+def test_shifts_read_vy() -> None:
+    # LD V1, 0x81; SHR V0, V1; LD V2, 0x81; SHL V3, V2; JP 0x208
+    machine = run("6181 8016 6281 832e 1208")
+
+    expect(machine.registers[0]).to(equal(0x40))
+    expect(machine.registers[3]).to(equal(0x02))
+    expect(machine.registers[15]).to(equal(1))
+
+
+def test_draw_collision() -> None:
+    # LD I, font 0; DRW V0, V0, 5; DRW V0, V0, 5; JP 0x206
+    machine = run("a050 d005 d005 1206")
+
+    expect(machine.registers[15]).to(equal(1))
+    expect(machine.display[:5]).to(equal([0] * 5))
+
+
+def test_subroutines_and_memory() -> None:
+    # LD V0, 0x7b; LD I, 0x300; CALL 0x20a; LD V2, [I]; JP 0x208; 0x20a: LD B, V0; RET
+    machine = run("607b a300 220a f265 1208 f033 00ee")
+
+    expect(list(machine.registers[:3])).to(equal([1, 2, 3]))
+    expect(machine.index).to(equal(0x303))
+
+
+def test_wait_for_key() -> None:
+    # LD V0, K; JP 0x202
+    machine = run("f00a 1202", keys="..7")
+
+    expect(machine.registers[0]).to(equal(7))
+    expect(machine.frames).to(equal(2))
+
+
+def test_coverage_of_computed_jump() -> None:
+    machine = run(COMPUTED)
+
+    expect(machine.coverage.executed_addresses()).to(
+        equal([0x200, 0x202, 0x208, 0x20A])
+    )
+    expect(machine.coverage.jump_targets()).to(equal([0x208, 0x20A]))
+
+
+def test_seed_disassembly_from_coverage() -> None:
+    machine = run(COMPUTED)
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(bytes.fromhex(COMPUTED)))
+    dasm.decode()
+
+    expect(dasm.disassembly).not_to(have_key(0x208))
+
+    dasm.seed(machine.coverage.executed_addresses(), machine.coverage.jump_targets())
+
+    expect(dasm.disassembly[0x208].text).to(equal("LD V1, 0x01"))
+    expect(list(dasm.labels)).to(contain(0x208))
+
+
+@pytest.mark.parametrize(
+    "program, reason",
+    [
+        ("ffff", "Unknown opcode 0xffff at 0x0200"),
+        ("00ee", "Return with an empty stack at 0x0200"),
+        ("2200", "Stack overflow at 0x0200"),
+        ("affe f033", "Store past the end of memory at 0x0202"),
+    ],
+)
+def test_halts(program: str, reason: str) -> None:
+    expect(run(program).halted).to(equal(reason))
+
+
+def test_budget_and_timers() -> None:
+    # LD V0, 0x05; LD DT, V0; ADD V1, 0x01; JP 0x204
+    machine = Machine(bytes.fromhex("6005 f015 7101 1204"))
+
+    expect(machine.run(25)).to(equal(25))
+    expect(machine.run(25)).to(equal(25))
+    expect(machine.halted).to(be_none)
+    expect(machine.delay).to(equal(0))
+    expect(machine.frames).to(equal(5))
+
+
+def test_self_modifying_code() -> None:
+    # LD I, 0x210; CALL 0x210; LD V0, 0x61; LD V1, 0x09; LD [I], V1; LD V1, 0x00
+    # CALL 0x210; JP 0x20e; 0x210: LD V1, 0x01, stored over with LD V1, 0x09; RET
+    machine = run("a210 2210 6061 6109 f155 6100 2210 120e 6101 00ee")
+
+    expect(machine.registers[1]).to(equal(9))
+    expect(machine.halted).to(contain("0x020e"))
+
+
+def test_random_keys_are_seeded() -> None:
+    first: List[int] = [random_keys(3)(frame) for frame in range(50)]
+    second: List[int] = [random_keys(3)(frame) for frame in range(50)]
+
+    expect(first).to(equal(second))
+    expect(lambda: scripted_keys("x")).to(raise_error(ValueError))
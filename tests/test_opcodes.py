@@ -1,4 +1,5 @@
 from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import listing
 from expects import equal, expect
 import pytest
 
@@ -11,12 +12,9 @@ def dasm() -> Disassembler:
 def test_no_opcode(dasm: Disassembler) -> None:
     rom_data = [0x99, 0x4E]
     dasm.seed_rom_data(rom_data)
-    opcode = dasm.read_opcode()
-    operation = dasm.read_operation(opcode)
-    address = dasm.read_address(opcode)
-    dasm.add_to_disassembly(operation, address)
-    # This test is incomplete. It provides full coverage but does not
-    # actually provide an expectation.
+    dasm.decode()
+
+    expect(listing(dasm.disassembly)).to(equal({}))
 
 
 def test_1nnn(dasm: Disassembler) -> None:
@@ -24,7 +22,7 @@ def test_1nnn(dasm: Disassembler) -> None:
     dasm.seed_rom_data(rom_data)
     dasm.decode()
 
-    expect(dasm.disassembly).to(equal({0x200: "JP lbl_0x024e"}))
+    expect(listing(dasm.disassembly)).to(equal({0x200: "JP lbl_0x024e"}))
 
 
 def test_3xkk(dasm: Disassembler) -> None:
@@ -32,7 +30,7 @@ def test_3xkk(dasm: Disassembler) -> None:
     dasm.seed_rom_data(rom_data)
     dasm.decode()
 
-    expect(dasm.disassembly).to(equal({0x200: "SE V2, 0x0a"}))
+    expect(listing(dasm.disassembly)).to(equal({0x200: "SE V2, 0x0a"}))
 
 
 def test_6xkk(dasm: Disassembler) -> None:
@@ -40,7 +38,7 @@ def test_6xkk(dasm: Disassembler) -> None:
     dasm.seed_rom_data(rom_data)
     dasm.decode()
 
-    expect(dasm.disassembly).to(equal({0x200: "LD V7, 0x03"}))
+    expect(listing(dasm.disassembly)).to(equal({0x200: "LD V7, 0x03"}))
 
 
 def test_Annn(dasm: Disassembler) -> None:
@@ -48,7 +46,7 @@ def test_Annn(dasm: Disassembler) -> None:
     dasm.seed_rom_data(rom_data)
     dasm.decode()
 
-    expect(dasm.disassembly).to(equal({0x200: "LD I, lbl_0x0202"}))
+    expect(listing(dasm.disassembly)).to(equal({0x200: "LD I, lbl_0x0202"}))
 
 
 def test_Dxyn(dasm: Disassembler) -> None:
@@ -56,4 +54,59 @@ def test_Dxyn(dasm: Disassembler) -> None:
     dasm.seed_rom_data(rom_data)
     dasm.decode()
 
-    expect(dasm.disassembly).to(equal({0x200: "DRW V3, V4, 0x07"}))
+    expect(listing(dasm.disassembly)).to(equal({0x200: "DRW V3, V4, 0x07"}))
+
+
+@pytest.mark.parametrize(
+    "rom_data, text",
+    [
+        ([0x00, 0xE0], "CLS"),
+        ([0x00, 0xEE], "RET"),
+        ([0x01, 0x23], "SYS 0x123"),
+        ([0x23, 0x00], "CALL lbl_0x0300"),
+        ([0x45, 0x10], "SNE V5, 0x10"),
+        ([0x51, 0x20], "SE V1, V2"),
+        ([0x7A, 0xFF], "ADD V10, 0xff"),
+        ([0x81, 0x20], "LD V1, V2"),
+        ([0x81, 0x21], "OR V1, V2"),
+        ([0x81, 0x22], "AND V1, V2"),
+        ([0x81, 0x23], "XOR V1, V2"),
+        ([0x81, 0x24], "ADD V1, V2"),
+        ([0x81, 0x25], "SUB V1, V2"),
+        ([0x81, 0x26], "SHR V1, V2"),
+        ([0x81, 0x27], "SUBN V1, V2"),
+        ([0x81, 0x2E], "SHL V1, V2"),
+        ([0x91, 0x20], "SNE V1, V2"),
+        ([0xB3, 0x00], "JP V0, lbl_0x0300"),
+        ([0xC4, 0x0F], "RND V4, 0x0f"),
+        ([0xE1, 0x9E], "SKP V1"),
+        ([0xE1, 0xA1], "SKNP V1"),
+        ([0xF1, 0x07], "LD V1, DT"),
+        ([0xF1, 0x0A], "LD V1, K"),
+        ([0xF1, 0x15], "LD DT, V1"),
+        ([0xF1, 0x18], "LD ST, V1"),
+        ([0xF1, 0x1E], "ADD I, V1"),
+        ([0xF1, 0x29], "LD F, V1"),
+        ([0xF1, 0x33], "LD B, V1"),
+        ([0xF1, 0x55], "LD [I], V1"),
+        ([0xF1, 0x65], "LD V1, [I]"),
+    ],
+)
+def test_instruction_set(dasm: Disassembler, rom_data: list, text: str) -> None:
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    expect(listing(dasm.disassembly)).to(equal({0x200: text}))
+
+
+def test_call_continues_after_return(dasm: Disassembler) -> None:
+    # 0x200: CALL 0x206
+    # 0x202: LD V1, 0x01
+    # 0x204: JP 0x204
+    # 0x206: RET
+    rom_data = [0x22, 0x06, 0x61, 0x01, 0x12, 0x04, 0x00, 0xEE]
+    dasm.seed_rom_data(rom_data)
+    dasm.decode()
+
+    expect(sorted(dasm.disassembly)).to(equal([0x200, 0x202, 0x204, 0x206]))
+    expect(list(dasm.labels)).to(equal([0x204, 0x206]))
@@ -0,0 +1,109 @@
+import os.path as path
+from typing import List
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.trace import Tracer
+from expects import equal, expect
+import pytest
+
+
+def rom_example() -> bytes:
+    file_path = path.join(path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def decoded(rom_data: bytes) -> Disassembler:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(rom_data))
+    dasm.decode()
+    return dasm
+
+
+def expect_fresh(dasm: Disassembler) -> None:
+    fresh = decoded(bytes(dasm.rom_data))
+
+    expect(dasm.disassembly).to(equal(fresh.disassembly))
+    expect(dasm.labels).to(equal(fresh.labels))
+    expect(dasm.all_contexts).to(equal(fresh.all_contexts))
+    expect(dasm.visited).to(equal(fresh.visited))
+    expect(dasm.references).to(equal(fresh.references))
+
+
+def test_patch_operand() -> None:
+    # 0x200: LD V1, 0x01 -> LD V1, 0x02
+    dasm = decoded(bytes([0x61, 0x01, 0x00, 0xEE]))
+    dasm.patch(0x201, b"\x02")
+
+    expect(dasm.disassembly[0x200].text).to(equal("LD V1, 0x02"))
+    expect_fresh(dasm)
+
+
+def test_patch_jump_target() -> None:
+    # 0x200: JP 0x204 -> JP 0x206
+    # 0x204: LD V1, 0x01
+    # 0x206: LD V2, 0x02
+    dasm = decoded(bytes([0x12, 0x04, 0x00, 0x00, 0x61, 0x01, 0x62, 0x02]))
+    dasm.patch(0x200, b"\x12\x06")
+
+    expect(sorted(dasm.disassembly)).to(equal([0x200, 0x206]))
+    expect(list(dasm.labels)).to(equal([0x206]))
+    expect_fresh(dasm)
+
+
+def test_patch_unknown_opcode() -> None:
+    # 0x202: unknown -> LD V1, 0x01, after which decoding carries on.
+    dasm = decoded(bytes([0x60, 0x00, 0x99, 0x99, 0x62, 0x02]))
+    dasm.patch(0x202, b"\x61\x01")
+
+    expect(sorted(dasm.disassembly)).to(equal([0x200, 0x202, 0x204]))
+    expect_fresh(dasm)
+
+
+def test_patch_removes_orphaned_loop() -> None:
+    # 0x200: JP 0x202 -> JP 0x206
+    # 0x202: LD V1, 0x01
+    # 0x204: JP 0x202 (only reachable from the first jump)
+    # 0x206: RET
+    dasm = decoded(bytes([0x12, 0x02, 0x61, 0x01, 0x12, 0x02, 0x00, 0xEE]))
+    dasm.patch(0x201, b"\x06")
+
+    expect(sorted(dasm.disassembly)).to(equal([0x200, 0x206]))
+    expect_fresh(dasm)
+
+
+@pytest.mark.parametrize(
+    "address, data",
+    [
+        (0x200, b"\x12\x4e"),
+        (0x24E, b"\x00\xee"),
+        (0x2A1, b"\x13"),
+        (0x300, b"\x99\x99"),
+    ],
+)
+def test_patch_matches_full_decode(address: int, data: bytes) -> None:
+    dasm = decoded(rom_example())
+    dasm.patch(address, data)
+
+    expect_fresh(dasm)
+
+
+def test_patch_decodes_only_what_changed() -> None:
+    messages: List[str] = []
+    dasm = Disassembler(tracer=Tracer(Tracer.INSTRUCTION, messages.append))
+    dasm.seed_rom_data([0x61, 0x01] * 64 + [0x00, 0xEE])
+    dasm.decode()
+    messages.clear()
+
+    dasm.patch(0x241, b"\x02")
+    decoded = [message for message in messages if message.startswith("Current Add")]
+
+    expect(decoded).to(equal(["Current Address: 576 (0x240)"]))
+
+
+def test_patch_outside_rom() -> None:
+    dasm = decoded(bytes([0x61, 0x01]))
+
+    with pytest.raises(ValueError):
+        dasm.patch(0x201, b"\x00\x00")
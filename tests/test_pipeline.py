@@ -0,0 +1,35 @@
+import io
+import os
+from pathlib import Path
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.pipeline import decode, write
+from chip8_dasm.writer import Writer
+from expects import be_true, equal, expect
+
+
+def rom_example() -> str:
+    return os.path.join(os.path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+
+def test_decode_stores_in_cache(tmp_path: Path) -> None:
+    dasm = Disassembler(rom_example())
+    decode(dasm, str(tmp_path))
+
+    cached = Disassembler(rom_example())
+
+    expect(DisassemblyCache(str(tmp_path)).load(cached)).to(be_true)
+    expect(cached.disassembly).to(equal(dasm.disassembly))
+
+
+def test_write_to_file(tmp_path: Path) -> None:
+    dasm = Disassembler(rom_example())
+    decode(dasm, no_cache=True)
+    output = tmp_path / "out.asm"
+    write(dasm, str(output))
+
+    stream = io.StringIO()
+    Writer(dasm).generate(stream)
+
+    expect(output.read_text()).to(equal(stream.getvalue()))
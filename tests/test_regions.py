@@ -0,0 +1,54 @@
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.regions import classify, Region, RegionMap
+from expects import equal, expect
+
+
+def regions(rom_data: bytes, isa: str = "chip8") -> RegionMap:
+    dasm = Disassembler(isa=isa)
+    dasm.seed_rom_data(list(rom_data))
+    dasm.decode()
+    return classify(dasm)
+
+
+def test_sprite_height_marks_data() -> None:
+    # LD I, 0x20a; SE V0, 0x00; DRW V0, V1, 3; JP 0x208; then data.
+    code = [0xA2, 0x0A, 0x30, 0x00, 0xD0, 0x13, 0x12, 0x08, 0x12, 0x08]
+    found = regions(bytes(code + [0x18, 0x3C, 0x7E, 0xFF]))
+
+    expect([found[address] for address in range(0x208, 0x20F)]).to(
+        equal([Region.CODE] * 2 + [Region.DATA] * 3 + [Region.UNKNOWN] * 2)
+    )
+    expect(found.count(Region.DATA)).to(equal(3))
+    expect(found.run_end(0x20A, 0x20E)).to(equal(0x20D))
+
+
+def test_register_loads_mark_data() -> None:
+    # LD I, 0x208; LD V2, [I]; LD B, V0; JP 0x206; then data.
+    found = regions(bytes([0xA2, 0x08, 0xF2, 0x65, 0xF0, 0x33, 0x12, 0x06, 1, 2, 3]))
+
+    expect(found.count(Region.DATA)).to(equal(3))
+
+
+def test_large_sprites_mark_data() -> None:
+    # LD I, 0x206; DRW V0, V1, 0; JP 0x204; then a 16x16 sprite.
+    rom_data = bytes([0xA2, 0x06, 0xD0, 0x10, 0x12, 0x04] + [0xFF] * 32)
+
+    expect(regions(rom_data).count(Region.DATA)).to(equal(0))
+    expect(regions(rom_data, "schip").count(Region.DATA)).to(equal(32))
+    expect(regions(rom_data, "xochip").count(Region.DATA)).to(equal(32))
+
+
+def test_code_wins_over_data() -> None:
+    # LD I, 0x200; DRW V0, V1, 4; JP 0x204.
+    found = regions(bytes([0xA2, 0x00, 0xD0, 0x14, 0x12, 0x04]))
+
+    expect(found.count(Region.DATA)).to(equal(0))
+    expect(found.count(Region.CODE)).to(equal(6))
+
+
+def test_map_covers_large_roms() -> None:
+    found = regions(bytes([0x12, 0x00]) + bytes(0x1000))
+
+    expect(len(found.kinds)).to(equal(0x1202))
+    expect(found[0x1100]).to(equal(Region.UNKNOWN))
+    expect(found.count(Region.UNKNOWN)).to(equal(0x1200))
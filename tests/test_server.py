@@ -0,0 +1,245 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+from pathlib import Path
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+from typing import Generator
+
+from chip8_dasm import cli
+from chip8_dasm.client import parse_address, request
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.server import DisassemblyServer
+from chip8_dasm.writer import Writer
+from click.testing import CliRunner
+from expects import be_false, be_true, contain, equal, expect
+import pytest
+
+
+def rom_example() -> str:
+    return os.path.join(os.path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+
+@pytest.fixture
+def rom(tmp_path: Path) -> str:
+    path = tmp_path / "rom.ch8"
+    shutil.copyfile(rom_example(), path)
+    return str(path)
+
+
+@pytest.fixture
+def address(tmp_path: Path) -> Generator[str, None, None]:
+    server = DisassemblyServer(str(tmp_path / "c8.sock"), use_cache=False)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    server.ready.wait(5)
+
+    yield server.address
+
+    request(server.address, {"command": "shutdown"})
+    thread.join(5)
+
+
+def listing(rom_file: str) -> str:
+    dasm = Disassembler(rom_file)
+    dasm.decode()
+    stream = io.StringIO()
+    Writer(dasm).write(stream)
+    return stream.getvalue()
+
+
+def test_parse_address() -> None:
+    expect(parse_address("localhost:8000")).to(equal(("localhost", 8000)))
+    expect(parse_address(":8000")).to(equal(("127.0.0.1", 8000)))
+    expect(parse_address("/tmp/c8dasm.sock")).to(equal("/tmp/c8dasm.sock"))
+
+
+def test_disassemble(address: str, rom: str) -> None:
+    response = request(address, {"command": "disassemble", "rom": rom})
+
+    expect(response["ok"]).to(be_true)
+    expect(response["output"]).to(equal(listing(rom)))
+
+
+def test_results_are_kept(address: str, rom: str) -> None:
+    for _ in range(3):
+        request(address, {"command": "disassemble", "rom": rom})
+
+    status = request(address, {"command": "status"})
+
+    expect(status["roms"]).to(equal([os.path.realpath(rom)]))
+    expect((status["hits"], status["misses"])).to(equal((2, 1)))
+
+
+def test_changed_rom_is_decoded_again(address: str, rom: str) -> None:
+    request(address, {"command": "disassemble", "rom": rom})
+
+    with open(rom, "r+b") as file:
+        file.write(b"\x00\xee")
+
+    response = request(address, {"command": "lookup", "rom": rom, "address": 0x200})
+
+    expect(response["instruction"]).to(equal("RET"))
+    expect(request(address, {"command": "status"})["misses"]).to(equal(2))
+
+
+def test_touched_rom_is_not_decoded_again(address: str, rom: str) -> None:
+    request(address, {"command": "disassemble", "rom": rom})
+    status = os.stat(rom)
+    os.utime(rom, ns=(status.st_atime_ns, status.st_mtime_ns + 10**9))
+    request(address, {"command": "disassemble", "rom": rom})
+
+    expect(request(address, {"command": "status"})["misses"]).to(equal(1))
+
+
+def test_lookup(address: str, rom: str) -> None:
+    response = request(address, {"command": "lookup", "rom": rom, "address": 0x24E})
+
+    expect(response["instruction"]).to(equal("LD V8, 0x01"))
+    expect(response["label"]).to(be_true)
+
+
+def test_concurrent_requests(address: str, rom: str) -> None:
+    message = {"command": "disassemble", "rom": rom}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: request(address, message), range(16)))
+
+    expect(all(response["ok"] for response in responses)).to(be_true)
+
+
+@pytest.mark.parametrize(
+    "message, error",
+    [
+        ({"rom": "rom.ch8"}, "Malformed request"),
+        ({"command": "assemble"}, "Unknown command: assemble"),
+        ({"command": "disassemble"}, "No ROM file given"),
+        ({"command": "disassemble", "rom": "/missing.ch8"}, "FileNotFoundError"),
+        ({"command": "disassemble", "rom": 123}, "ROM file must be a string"),
+        (
+            {"command": "lookup", "rom": "rom.ch8", "address": "0x200"},
+            "Address must be an integer",
+        ),
+        ({"command": "lookup", "rom": "rom.ch8", "timeout": None}, "Timeout must"),
+        ({"command": "lookup", "rom": "rom.ch8", "timeout": "1"}, "Timeout must"),
+        ({"command": "lookup", "rom": "rom.ch8", "timeout": 0}, "Timeout must"),
+        ({"command": "lookup", "rom": "rom.ch8", "timeout": 31}, "Timeout must"),
+    ],
+)
+def test_errors(address: str, message: dict, error: str) -> None:
+    response = request(address, message)
+
+    expect(response["ok"]).to(be_false)
+    expect(response["error"]).to(contain(error))
+
+
+def test_root(tmp_path: Path, rom: str) -> None:
+    server = DisassemblyServer(
+        str(tmp_path / "c8.sock"), use_cache=False, root=str(tmp_path)
+    )
+
+    expect(server.execute("disassemble", {"rom": rom})["ok"]).to(be_true)
+
+    response = server.execute("disassemble", {"rom": rom_example()})
+
+    expect(response["ok"]).to(be_false)
+    expect(response["error"]).to(contain("PermissionError"))
+
+
+def test_stale_socket_is_replaced(tmp_path: Path, rom: str) -> None:
+    path = str(tmp_path / "c8.sock")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+
+    server = DisassemblyServer(path, use_cache=False)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    expect(server.ready.wait(5)).to(be_true)
+    expect(request(path, {"command": "ping"})["ok"]).to(be_true)
+
+    request(path, {"command": "shutdown"})
+    thread.join(5)
+
+
+def test_address_in_use(address: str, tmp_path: Path) -> None:
+    other = tmp_path / "file"
+    other.write_text("keep")
+
+    errors = {address: "already listening", str(other): "is not a socket"}
+
+    for path, error in errors.items():
+        result = CliRunner().invoke(cli.cli, ["serve", "-a", path, "--no-cache"])
+
+        expect(result.exit_code).to(equal(1))
+        expect(result.output).to(contain(error))
+
+    expect(other.read_text()).to(equal("keep"))
+    expect(request(address, {"command": "ping"})["ok"]).to(be_true)
+
+
+def test_timeout(address: str, rom: str) -> None:
+    message = {"command": "disassemble", "rom": rom, "timeout": 1e-6}
+    response = request(address, message)
+
+    expect(response["error"]).to(equal("Timed out after 1e-06 seconds"))
+
+
+def test_server_option(address: str, rom: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("C8DASM_SERVER", address)
+    local = CliRunner().invoke(cli.cli, [rom, "--no-cache"])
+    remote = CliRunner().invoke(cli.cli, [rom, "--server"])
+
+    expect(remote.exit_code).to(equal(0))
+    expect(remote.output).to(equal(local.output))
+
+
+def test_server_option_reports_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = tmp_path / "roms"
+    root.mkdir()
+    server = DisassemblyServer(
+        str(tmp_path / "c8.sock"), use_cache=False, root=str(root)
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    server.ready.wait(5)
+    monkeypatch.setenv("C8DASM_SERVER", server.address)
+
+    result = CliRunner().invoke(cli.cli, [rom_example(), "--server"])
+    request(server.address, {"command": "shutdown"})
+    thread.join(5)
+
+    expect(result.exit_code).to(equal(1))
+    expect(result.output).to(contain("Error: PermissionError"))
+
+
+def test_server_option_falls_back(
+    rom: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("C8DASM_SERVER", str(tmp_path / "missing.sock"))
+    monkeypatch.setenv("C8DASM_CACHE_DIR", str(tmp_path / "cache"))
+    result = CliRunner().invoke(cli.cli, [rom, "--server"])
+
+    expect(result.exit_code).to(equal(0))
+    expect(result.stderr).to(contain("is not available"))
+    expect(result.stdout).to(contain("start:\n"))
+
+
+def test_fast_path_uses_server(address: str, rom: str) -> None:
+    result = subprocess.run(
+        [sys.executable, "-m", "chip8_dasm", rom, "--server"],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env={"C8DASM_SERVER": address, "PATH": ""},
+        check=True,
+    )
+    local = CliRunner().invoke(cli.cli, [rom, "--no-cache"])
+
+    expect(result.stdout).to(equal("\nCHIP-8 Disassembler\n\n" + local.output))
+    expect(request(address, {"command": "status"})["misses"]).to(equal(1))
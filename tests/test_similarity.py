@@ -0,0 +1,153 @@
+from pathlib import Path
+
+from chip8_dasm.cache import DisassemblyCache
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.similarity import (
+    Fingerprinter,
+    group,
+    LshIndex,
+    MinHash,
+    SignatureCache,
+    similarity,
+)
+from expects import be_above, be_below, be_none, equal, expect, have_len
+import pytest
+
+TEST_ROM = Path(__file__).parent / "fixtures" / "test_opcode.ch8"
+
+
+def decoded(data: bytes) -> Disassembler:
+    dasm = Disassembler()
+    dasm.rom_data = bytearray(data)
+    dasm.decode()
+    return dasm
+
+
+@pytest.fixture
+def original() -> bytes:
+    return TEST_ROM.read_bytes()
+
+
+@pytest.fixture
+def patched(original: bytes) -> bytes:
+    # Change the constant of LD V5, 0x2a, which the signature ignores, and the
+    # register of DRW V8, V11, 0x04, which it does not.
+    data = bytearray(original)
+    data[0x57] = 0x33
+    data[0x5C] = 0xD7
+    return bytes(data)
+
+
+def test_shingles_ignore_operands() -> None:
+    minhash = MinHash(shingle=2)
+
+    first = minhash.shingles(decoded(bytes.fromhex("6005 a20a d015 1206")))
+    second = minhash.shingles(decoded(bytes.fromhex("6042 a300 d015 1206")))
+    other = minhash.shingles(decoded(bytes.fromhex("6105 a20a d015 1206")))
+
+    expect(first).to(equal(second))
+    expect(first).to(have_len(3))
+    expect(len(first & other)).to(equal(2))
+
+
+def test_short_runs_are_shingles() -> None:
+    minhash = MinHash()
+
+    expect(minhash.shingles(decoded(bytes.fromhex("1200")))).to(equal({0x1000}))
+
+
+def test_signatures_estimate_similarity(original: bytes, patched: bytes) -> None:
+    minhash = MinHash()
+    first = minhash.fingerprint(decoded(original))
+    second = minhash.fingerprint(decoded(patched))
+    unrelated = minhash.fingerprint(decoded(bytes.fromhex("6300 a300 d343 1206")))
+
+    expect(first).to(have_len(MinHash.BINS))
+    expect(similarity(first, first)).to(equal(1.0))
+    expect(similarity(first, second)).to(be_above(0.8))
+    expect(similarity(first, second)).to(be_below(1.0))
+    expect(similarity(first, unrelated)).to(be_below(0.1))
+
+
+def test_empty_bins_are_filled() -> None:
+    signature = MinHash().signature({1, 2, 3})
+
+    expect(signature.count(MinHash().empty)).to(equal(0))
+    expect(len(set(signature))).to(equal(MinHash.BINS))
+
+
+def test_candidates_share_a_band() -> None:
+    index = LshIndex(bands=2)
+    index.add(0, (1, 2, 3, 4))
+    index.add(1, (1, 2, 5, 6))
+    index.add(2, (7, 8, 3, 4))
+    index.add(3, (9, 9, 9, 9))
+
+    expect(sorted(index.candidates())).to(equal([(0, 1), (0, 2)]))
+
+
+def test_group_near_duplicates(original: bytes, patched: bytes) -> None:
+    minhash = MinHash()
+    signatures = {
+        "a.ch8": minhash.fingerprint(decoded(original)),
+        "b.ch8": minhash.fingerprint(decoded(patched)),
+        "c.ch8": minhash.fingerprint(decoded(original)),
+        "d.ch8": minhash.fingerprint(decoded(bytes.fromhex("6300 a300 d343 1206"))),
+    }
+
+    groups = group(signatures, 0.8)
+
+    expect(groups).to(have_len(1))
+    expect([member.rom_file for member in groups[0]]).to(
+        equal(["a.ch8", "b.ch8", "c.ch8"])
+    )
+    expect(groups[0][2].similarity).to(equal(1.0))
+    expect(group(signatures, 1.0)[0]).to(have_len(2))
+
+
+def test_data_is_not_similar(tmp_path: Path) -> None:
+    minhash = MinHash()
+    data = decoded(bytes.fromhex("ffff 1234 5678"))
+    signatures = {
+        "a.ch8": minhash.fingerprint(data),
+        "b.ch8": minhash.fingerprint(decoded(bytes.fromhex("ffff 9abc"))),
+    }
+
+    expect(signatures["a.ch8"]).to(equal(()))
+    expect(similarity(signatures["a.ch8"], signatures["b.ch8"])).to(equal(0.0))
+    expect(group(signatures, 0.5)).to(equal([]))
+
+    stored = SignatureCache(DisassemblyCache(str(tmp_path)), minhash)
+    stored.store(data, ())
+
+    expect(stored.load(data)).to(equal(()))
+
+
+def test_signatures_are_cached(tmp_path: Path, original: bytes) -> None:
+    roms = tmp_path / "roms"
+    roms.mkdir()
+    (roms / "test.ch8").write_bytes(original)
+    (roms / "broken.ch8").mkdir()
+
+    fingerprinter = Fingerprinter(cache_dir=str(tmp_path / "cache"))
+    signatures, errors = fingerprinter.fingerprint_all(str(roms))
+
+    expect(list(signatures)).to(equal([str(roms / "test.ch8")]))
+    expect(errors).to(equal([]))
+
+    cache = DisassemblyCache(str(tmp_path / "cache"))
+    stored = SignatureCache(cache, MinHash()).load(decoded(original))
+
+    expect(stored).to(equal(signatures[str(roms / "test.ch8")]))
+    expect(SignatureCache(cache, MinHash(bins=64)).load(decoded(original))).to(be_none)
+
+
+def test_signatures_are_evicted_with_entries(tmp_path: Path, original: bytes) -> None:
+    cache = DisassemblyCache(str(tmp_path), max_bytes=0)
+    signatures = SignatureCache(cache, MinHash())
+    dasm = decoded(original)
+
+    signatures.store(dasm, MinHash().fingerprint(dasm))
+    cache.store(dasm)
+
+    expect(list(tmp_path.glob("*/*"))).to(equal([]))
@@ -0,0 +1,95 @@
+import os.path as path
+from pathlib import Path
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from chip8_dasm import __main__, cli
+from click.testing import CliRunner
+from expects import be_below, be_false, contain, equal, expect
+import pytest
+
+# Generous enough for a slow machine, but well short of what importing the
+# command line interface adds.
+IMPORT_BUDGET = 0.1
+
+SLOW_MODULES = (
+    "click",
+    "logging",
+    "concurrent.futures",
+    "chip8_dasm.cli",
+    "chip8_dasm.insight",
+    "chip8_dasm.stats",
+    "chip8_dasm.trace",
+)
+
+
+def rom_example() -> str:
+    return path.join(path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+
+def import_times(*arguments: str, cache_dir: Path) -> Tuple[str, List[str]]:
+    """Run the disassembler and return its output and importtime report."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "chip8_dasm", *arguments],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env={"C8DASM_CACHE_DIR": str(cache_dir), "PATH": ""},
+        check=True,
+    )
+
+    return result.stdout, result.stderr.splitlines()
+
+
+def imported(report: List[str]) -> Dict[str, float]:
+    """Return the cumulative seconds taken by each import after startup."""
+
+    modules: Dict[str, float] = {}
+    started = False
+
+    for line in report:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        if name.strip() == "runpy":
+            started = True
+        elif started and cumulative.strip().isdigit():
+            modules[name.rstrip()] = int(cumulative) / 1e6
+
+    return modules
+
+
+@pytest.mark.parametrize("arguments", [[], ["--no-cache"]])
+def test_fast_path_imports(arguments: List[str], tmp_path: Path) -> None:
+    _, report = import_times(rom_example(), *arguments, cache_dir=tmp_path)
+    modules = imported(report)
+    names = {name.strip() for name in modules}
+
+    for module in SLOW_MODULES:
+        expect(names).not_to(contain(module))
+
+    top_level = [seconds for name, seconds in modules.items() if name[1] != " "]
+
+    expect(sum(top_level)).to(be_below(IMPORT_BUDGET))
+
+
+def test_fast_path_output(tmp_path: Path) -> None:
+    output, _ = import_times(rom_example(), cache_dir=tmp_path)
+    result = CliRunner().invoke(cli.cli, [rom_example(), "--no-cache"])
+
+    expect(output).to(equal("\nCHIP-8 Disassembler\n\n" + result.output))
+
+
+def test_fast_path_declines(tmp_path: Path) -> None:
+    expect(__main__.disassemble_fast([])).to(be_false)
+    expect(__main__.disassemble_fast(["graph", rom_example()])).to(be_false)
+    expect(__main__.disassemble_fast([rom_example(), "-i"])).to(be_false)
+    expect(__main__.disassemble_fast([str(tmp_path / "missing.ch8")])).to(be_false)
+
+
+def test_commands_are_known() -> None:
+    expect(set(__main__.COMMANDS)).to(equal(set(cli.cli.commands)))
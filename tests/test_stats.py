@@ -0,0 +1,74 @@
+import io
+from typing import List, Tuple
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.stats import Stats
+from chip8_dasm.writer import Writer
+from expects import be_above, equal, expect
+
+# 0x200: CALL 0x206
+# 0x202: LD I, 0x208
+# 0x204: JP 0x204
+# 0x206: RET
+ROM = [0x22, 0x06, 0xA2, 0x08, 0x12, 0x04, 0x00, 0xEE]
+
+
+def decoded(stats: Stats) -> Disassembler:
+    dasm = Disassembler(stats=stats)
+    dasm.seed_rom_data(ROM)
+    dasm.decode()
+    return dasm
+
+
+def test_decode_is_measured() -> None:
+    stats = Stats()
+    decoded(stats)
+
+    expect(stats.timers["decode"].count).to(equal(1))
+    expect(stats.timers["context"].count).to(equal(3))
+    expect(stats.counters).to(equal({"instructions": 4, "labels": 3}))
+
+
+def test_render_is_measured() -> None:
+    stats = Stats()
+    Writer(decoded(stats)).generate(io.StringIO())
+
+    expect(stats.timers["render"].count).to(equal(1))
+    expect(stats.counters["lines"]).to(equal(11))
+
+
+def test_hooks() -> None:
+    calls: List[Tuple[str, float]] = []
+    stats = Stats()
+    stats.add_hook(lambda name, seconds: calls.append((name, seconds)))
+    decoded(stats)
+
+    expect([name for name, _ in calls]).to(
+        equal(["context", "context", "context", "decode"])
+    )
+    expect(calls[-1][1]).to(be_above(0))
+
+
+def test_classify() -> None:
+    stats = Stats()
+    stats.classify(decoded(Stats()).disassembly)
+
+    expect(stats.counters).to(
+        equal({"op.CALL": 1, "op.LD": 1, "op.JP": 1, "op.RET": 1})
+    )
+
+
+def test_report() -> None:
+    stats = Stats()
+    stats.record("load", 0.002)
+    stats.count("labels", 3)
+
+    expect(list(stats.report())).to(
+        equal(
+            [
+                "load                   1 x      2.000 ms   longest    2.000 ms",
+                "labels                 3",
+            ]
+        )
+    )
+    expect(stats.as_dict()["counters"]).to(equal({"labels": 3}))
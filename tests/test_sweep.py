@@ -0,0 +1,65 @@
+import os.path as path
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.instructions import listing
+from chip8_dasm.sweep import LinearSweep
+from expects import equal, expect
+import pytest
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def rom() -> str:
+    return path.join(path.dirname(__file__), "fixtures", "test_opcode.ch8")
+
+
+def test_fields() -> None:
+    linear = LinearSweep(bytearray([0xD3, 0x47]))
+
+    expect(int(linear.x[0])).to(equal(3))
+    expect(int(linear.y[0])).to(equal(4))
+    expect(int(linear.n[0])).to(equal(7))
+    expect(int(linear.nn[0])).to(equal(0x47))
+    expect(int(linear.nnn[0])).to(equal(0x347))
+
+
+def test_disassembly() -> None:
+    linear = LinearSweep(bytearray([0x12, 0x4E, 0x99, 0x4E, 0x00, 0xE0]))
+
+    expect(listing(linear.disassembly())).to(
+        equal({0x200: "JP lbl_0x024e", 0x204: "CLS"})
+    )
+
+
+def test_unaligned() -> None:
+    linear = LinearSweep(bytearray([0x12, 0x61, 0x01]), unaligned=True)
+
+    expect(list(linear.addresses)).to(equal([0x200, 0x201]))
+    expect(linear.disassembly()[0x201].text).to(equal("LD V1, 0x01"))
+
+
+def test_statistics() -> None:
+    linear = LinearSweep(bytearray([0x60, 0x01, 0x61, 0x02, 0x99, 0x4E]))
+
+    expect(linear.statistics()).to(equal({"unknown": 1, "LD": 2}))
+
+
+def test_unknown_regions() -> None:
+    rom_data = bytearray([0x60, 0x01, 0x99, 0x4E, 0x91, 0x21, 0x60, 0x01, 0x99, 0x4E])
+    linear = LinearSweep(rom_data)
+
+    expect(linear.unknown_regions()).to(equal([(0x202, 0x206)]))
+    expect(linear.unknown_regions(minimum=1)).to(
+        equal([(0x202, 0x206), (0x208, 0x20A)])
+    )
+
+
+def test_agrees_with_traversal(rom: str) -> None:
+    dasm = Disassembler(rom)
+    dasm.decode()
+    comparison = LinearSweep(dasm.rom_data).compare(dasm)
+
+    expect(comparison["differ"]).to(equal([]))
+    expect(comparison["traversal_only"]).to(equal([]))
+    expect(len(comparison["agree"])).to(equal(len(dasm.disassembly)))
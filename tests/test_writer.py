@@ -0,0 +1,59 @@
+import io
+
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.writer import Writer
+from expects import equal, expect
+import pytest
+
+
+@pytest.fixture
+def writer() -> Writer:
+    dasm = Disassembler()
+    dasm.seed_rom_data([0x12, 0x04, 0xFF, 0xA2, 0x00])
+    dasm.decode()
+
+    return Writer(dasm)
+
+
+def test_lines(writer: Writer) -> None:
+    expect(list(writer.lines())).to(
+        equal(
+            [
+                "start:\n",
+                "             0x0200\n",
+                "     JP lbl_0x0204\n",
+                "             0x0202\n",
+                "     db 0xff, 0xa2  ; unknown\n",
+                "lbl_0x0204:\n",
+                "             0x0204\n",
+                "     db 0x00  ; unknown\n",
+            ]
+        )
+    )
+
+
+def test_write_to_stream(writer: Writer) -> None:
+    stream = io.StringIO()
+    writer.write(stream)
+
+    expect(stream.getvalue()).to(
+        equal(writer.generate_disassembly_buffer(Writer.STARTING_ADDRESS))
+    )
+
+
+def test_data_lines() -> None:
+    dasm = Disassembler()
+    dasm.seed_rom_data([0xA2, 0x06, 0xD0, 0x12, 0x12, 0x04, 0xF0, 0x90, 0xAB])
+    dasm.decode()
+
+    expect(list(Writer(dasm).lines())[-5:]).to(
+        equal(
+            [
+                "lbl_0x0206:\n",
+                "             0x0206\n",
+                "     db 0xf0, 0x90\n",
+                "             0x0208\n",
+                "     db 0xab  ; unknown\n",
+            ]
+        )
+    )
@@ -0,0 +1,91 @@
+from chip8_dasm.disassembler import Disassembler
+from chip8_dasm.xref import accesses, CrossReferences, parse_register, XrefKind
+from expects import equal, expect, raise_error
+import pytest
+
+
+def index(rom_data: bytes) -> CrossReferences:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(rom_data))
+    dasm.decode()
+    return CrossReferences(dasm)
+
+
+# 0x200: LD V0, 0x00
+# 0x202: ADD V0, 0x01
+# 0x204: SE V0, 0x0a
+# 0x206: JP 0x202
+# 0x208: CALL 0x20e
+# 0x20a: LD I, 0x202
+# 0x20c: JP 0x20c
+# 0x20e: LD V3, [I]
+# 0x210: RET
+ROM = bytes(
+    [
+        *(0x60, 0x00, 0x70, 0x01, 0x30, 0x0A, 0x12, 0x02, 0x22, 0x0E),
+        *(0xA2, 0x02, 0x12, 0x0C, 0xF3, 0x65, 0x00, 0xEE),
+    ]
+)
+
+
+@pytest.fixture
+def xrefs() -> CrossReferences:
+    return index(ROM)
+
+
+def test_references_by_kind(xrefs: CrossReferences) -> None:
+    expect(xrefs.to(0x202)).to(equal([0x206, 0x20A]))
+    expect(xrefs.to(0x202, XrefKind.JUMP)).to(equal([0x206]))
+    expect(xrefs.to(0x202, XrefKind.LOAD)).to(equal([0x20A]))
+    expect(xrefs.to(0x202, XrefKind.CALL)).to(equal([]))
+    expect(xrefs.kinds(0x20E)).to(equal({XrefKind.CALL: [0x208]}))
+    expect(xrefs.kinds(0x208)).to(equal({XrefKind.SKIP: [0x204]}))
+    expect(xrefs.to(0x300)).to(equal([]))
+
+
+def test_registers(xrefs: CrossReferences) -> None:
+    expect(xrefs.defined(0)).to(equal([0x200, 0x202, 0x20E]))
+    expect(xrefs.used(0)).to(equal([0x202, 0x204]))
+    expect(xrefs.defined(3)).to(equal([0x20E]))
+    expect(xrefs.used(3)).to(equal([]))
+
+
+def test_index_follows_patch() -> None:
+    dasm = Disassembler()
+    dasm.seed_rom_data(list(ROM))
+    dasm.decode()
+    dasm.patch(0x208, bytes([0x12, 0x0E]))
+
+    xrefs = CrossReferences(dasm)
+
+    expect(xrefs.kinds(0x20E)).to(equal({XrefKind.JUMP: [0x208]}))
+
+
+@pytest.mark.parametrize(
+    "opcode, defined, used",
+    [
+        (0x8124, (1, 0xF), (1, 2)),
+        (0xD123, (0xF,), (1, 2)),
+        (0xB300, (), (0,)),
+        (0xF255, (), (0, 1, 2)),
+        (0x00E0, (), ()),
+    ],
+)
+def test_accesses(opcode: int, defined: tuple, used: tuple) -> None:
+    instruction = Disassembler().table[opcode]
+
+    expect(accesses(instruction)).to(equal((defined, used)))
+
+
+def test_register_ranges() -> None:
+    table = Disassembler(isa="xochip").table
+
+    expect(accesses(table[0x5242])).to(equal(((), (2, 3, 4))))
+    expect(accesses(table[0x5423])).to(equal(((2, 3, 4), ())))
+
+
+def test_parse_register() -> None:
+    expect(parse_register("V3")).to(equal(3))
+    expect(parse_register("vf")).to(equal(15))
+    expect(parse_register("a")).to(equal(10))
+    expect(lambda: parse_register("V10")).to(raise_error(ValueError))